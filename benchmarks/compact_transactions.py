@@ -0,0 +1,100 @@
+"""
+Memory footprint of CompactTransactionStore against a plain list of Transaction models.
+
+    PYTHONPATH=. python benchmarks/compact_transactions.py --count 200000
+
+Transactions are synthetic but shaped like real Pluggy data: a few currencies,
+statuses and categories, a few hundred merchants, and paymentData /
+creditCardMetadata on a share of the rows.
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from pluggy_py.models.transactions import Transaction
+from pluggy_py.storage.compact import CompactTransactionStore
+
+CATEGORIES = [(f"0{n}000000", name) for n, name in enumerate(
+    ["Shopping", "Groceries", "Restaurants", "Transfers", "Taxi and ride-hailing", "Services", "Salary", "Bills"]
+)]
+
+
+def make_payload(i: int, rng: random.Random) -> dict:
+    category_id, category = rng.choice(CATEGORIES)
+    merchant = rng.randrange(300)
+    payload = {
+        "id": f"{rng.getrandbits(128):032x}",
+        "description": f"Compra {merchant}",
+        "descriptionRaw": f"COMPRA CARTAO {merchant:04d}",
+        "currencyCode": rng.choice(("BRL", "BRL", "BRL", "USD")),
+        "amount": round(rng.uniform(-900, 900), 2),
+        "date": (datetime(2023, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=17 * i)).isoformat(),
+        "type": rng.choice(("DEBIT", "CREDIT")),
+        "balance": round(rng.uniform(0, 20_000), 2),
+        "status": rng.choice(("POSTED", "POSTED", "PENDING")),
+        "category": category,
+        "categoryId": category_id,
+        "accountId": f"account-{i % 8}",
+        "merchant": {
+            "name": f"Loja {merchant}",
+            "businessName": f"LOJA {merchant} COMERCIO LTDA",
+            "cnpj": f"{merchant:014d}",
+            "category": category,
+        },
+    }
+    if i % 3 == 0:
+        payload["paymentData"] = {
+            "payer": {"name": "Fulano de Tal", "documentNumber": {"type": "CPF", "value": "882.937.076-23"}},
+            "receiver": {"name": f"Loja {merchant}", "documentNumber": {"type": "CNPJ", "value": f"{merchant:014d}"}},
+            "paymentMethod": "PIX",
+            "referenceNumber": f"E{rng.getrandbits(64):016x}",
+        }
+    if i % 2 == 0:
+        payload["creditCardMetadata"] = {
+            "installmentNumber": 1 + i % 10,
+            "totalInstallments": 10,
+            "totalAmount": 1000.0,
+            "billId": f"bill-{i % 12}",
+        }
+    return payload
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    payloads = [make_payload(i, rng) for i in range(args.count)]
+
+    models, model_bytes, model_seconds = measure(lambda: [Transaction(**p) for p in payloads])
+    store, store_bytes, store_seconds = measure(lambda: CompactTransactionStore(models))
+
+    assert store[len(store) // 2].to_transaction() == models[len(models) // 2]
+
+    print(f"{args.count} transactions")
+    print(f"  Transaction models     {model_bytes / args.count:8.0f} bytes/transaction"
+          f"  ({model_bytes / 2**20:7.1f} MiB, built in {model_seconds:.2f}s)")
+    print(f"  CompactTransactionStore{store_bytes / args.count:8.0f} bytes/transaction"
+          f"  ({store_bytes / 2**20:7.1f} MiB, built in {store_seconds:.2f}s)")
+    print(f"  ratio                  {model_bytes / store_bytes:8.1f}x smaller")
+    print(f"  store.nbytes() estimate {store.nbytes() / args.count:7.0f} bytes/transaction")
+
+
+if __name__ == "__main__":
+    main()
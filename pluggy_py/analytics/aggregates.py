@@ -0,0 +1,137 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from pluggy_py.models.transactions import Transaction
+
+# (accountId, "YYYY-MM", categoryId, currencyCode)
+AggregateKey = Tuple[Optional[str], str, Optional[str], Optional[str]]
+
+
+class MonthlyAggregate(BaseModel):
+    """Sum and count of the transactions of one account, month, category and currency."""
+    account_id: Optional[str] = None
+    month: str = Field(..., description="YYYY-MM")
+    category_id: Optional[str] = None
+    category: Optional[str] = Field(None, description="Last category name seen for category_id")
+    currency: Optional[str] = None
+    total: float = 0.0
+    count: int = 0
+
+
+def _cents(amount: float) -> int:
+    return round(amount * 100)
+
+
+class MonthlyAggregates:
+    """
+    Materialized spend per account x month x category x currency.
+
+    apply() folds transactions in incrementally. For every transaction id the store
+    remembers which bucket it was counted in and for how much, so re-applying a
+    transaction whose category, amount or date changed first reverses its old
+    contribution - dashboards read the buckets and never rescan transactions.
+    Amounts are accumulated as integer cents, so reversals leave no float residue.
+
+    Passed to PluggyClient(aggregates=...), every transaction the TransactionsResource
+    fetches or updates (listed, processed, synced, backfilled or retrieved by id) is
+    applied automatically; transactions obtained by other means (e.g. read back from a
+    DiskTransactionStore) go through apply():
+
+        client = PluggyClient(client_id, client_secret, aggregates=MonthlyAggregates())
+        client.authenticate()
+        client.transactions.process_all_transactions(account_ids, save_to_db)
+        client.aggregates.query(account_id=account_id, month="2024-05")
+    """
+
+    def __init__(self, transactions: Iterable[Transaction] = ()):
+        self._lock = threading.Lock()
+        self._buckets: Dict[AggregateKey, List[int]] = {}
+        self._contributions: Dict[str, Tuple[AggregateKey, int]] = {}
+        self._category_names: Dict[str, str] = {}
+        self.apply(transactions)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    @staticmethod
+    def key(transaction: Transaction) -> AggregateKey:
+        return (
+            transaction.accountId,
+            f"{transaction.date.year:04d}-{transaction.date.month:02d}",
+            transaction.categoryId,
+            transaction.currencyCode,
+        )
+
+    def apply(self, transactions: Iterable[Transaction]) -> int:
+        """Adds new transactions and re-buckets changed ones. Returns how many buckets changed."""
+        changed = 0
+        with self._lock:
+            for transaction in transactions:
+                key = self.key(transaction)
+                cents = _cents(transaction.amount)
+                if transaction.categoryId and transaction.category:
+                    self._category_names[transaction.categoryId] = transaction.category
+
+                previous = self._contributions.get(transaction.id)
+                if previous == (key, cents):
+                    continue
+                if previous is not None:
+                    self._add(*previous, sign=-1)
+                self._add(key, cents, sign=1)
+                self._contributions[transaction.id] = (key, cents)
+                changed += 1
+        return changed
+
+    def remove(self, transaction_ids: Iterable[str]) -> int:
+        """Reverses the contribution of deleted transactions. Returns how many were known."""
+        removed = 0
+        with self._lock:
+            for transaction_id in transaction_ids:
+                previous = self._contributions.pop(transaction_id, None)
+                if previous is not None:
+                    self._add(*previous, sign=-1)
+                    removed += 1
+        return removed
+
+    def query(
+        self,
+        account_id: Optional[str] = None,
+        month: Optional[str] = None,
+        category_id: Optional[str] = None,
+        currency: Optional[str] = None,
+    ) -> List[MonthlyAggregate]:
+        """Buckets matching every filter given, ordered by account, month and category."""
+        with self._lock:
+            rows = [
+                MonthlyAggregate(
+                    account_id=key[0],
+                    month=key[1],
+                    category_id=key[2],
+                    category=self._category_names.get(key[2]) if key[2] else None,
+                    currency=key[3],
+                    total=cents / 100,
+                    count=count,
+                )
+                for key, (cents, count) in self._buckets.items()
+                if (account_id is None or key[0] == account_id)
+                and (month is None or key[1] == month)
+                and (category_id is None or key[2] == category_id)
+                and (currency is None or key[3] == currency)
+            ]
+        rows.sort(key=lambda row: (row.account_id or "", row.month, row.category_id or ""))
+        return rows
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._contributions.clear()
+            self._category_names.clear()
+
+    def _add(self, key: AggregateKey, cents: int, sign: int) -> None:
+        bucket = self._buckets.setdefault(key, [0, 0])
+        bucket[0] += sign * cents
+        bucket[1] += sign
+        if bucket[1] == 0:
+            del self._buckets[key]
@@ -0,0 +1,142 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from pluggy_py.models.consents import Consent
+from pluggy_py.models.webhooks import WebhookEvent
+from pluggy_py.resources.consents import ConsentsResource
+
+_IndexKey = Tuple[float, str]
+
+
+def _timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class ConsentExpiryIndex:
+    """
+    Consents of many items, indexed by expiration date.
+
+    scan() fetches the consents of every item not indexed yet (or marked as changed)
+    concurrently, and keeps active consents - those with an expiresAt and no revokedAt -
+    in a list sorted by expiration. expiring_within() then answers "what expires in the
+    next N days" with two binary searches, whatever the number of items.
+
+    Refreshes are incremental: mark_changed() (or handle_webhook_event() for item
+    webhooks) flags items whose consents must be re-read, and refresh() re-fetches only
+    those.
+    """
+
+    def __init__(self, consents: ConsentsResource, max_workers: int = 8):
+        self._consents = consents
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._sorted: List[_IndexKey] = []
+        self._by_id: Dict[str, Consent] = {}
+        self._by_item: Dict[str, Set[str]] = {}
+        # item id -> number of times it was marked as changed, so that a fetch only
+        # clears the mark if the item was not marked again while it ran.
+        self._stale: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    @property
+    def item_ids(self) -> List[str]:
+        return list(self._by_item)
+
+    def scan(self, item_ids: Iterable[str]) -> int:
+        """
+        Indexes the consents of the given items, fetching only items that are new to
+        the index or marked as changed. Returns the number of items fetched.
+        """
+        with self._lock:
+            to_fetch = [i for i in dict.fromkeys(item_ids) if i not in self._by_item or i in self._stale]
+        return self._fetch(to_fetch)
+
+    def refresh(self) -> int:
+        """Re-fetches the consents of every item marked as changed. Returns the number of items fetched."""
+        with self._lock:
+            to_fetch = list(self._stale)
+        return self._fetch(to_fetch)
+
+    def mark_changed(self, item_id: str) -> None:
+        with self._lock:
+            self._stale[item_id] = self._stale.get(item_id, 0) + 1
+
+    def handle_webhook_event(self, event: Union[WebhookEvent, Dict[str, Any]]) -> bool:
+        """Marks the item of an item/* webhook as changed. Returns True if it was marked."""
+        if not isinstance(event, WebhookEvent):
+            event = WebhookEvent(**event)
+        if not event.itemId or not event.event.startswith("item/"):
+            return False
+        if event.event == "item/deleted":
+            self.remove_item(event.itemId)
+            return True
+        self.mark_changed(event.itemId)
+        return True
+
+    def remove_item(self, item_id: str) -> None:
+        with self._lock:
+            self._replace_item(item_id, [])
+            self._by_item.pop(item_id, None)
+            self._stale.pop(item_id, None)
+
+    def expiring_within(self, days: float, now: Optional[datetime] = None) -> List[Consent]:
+        """Active consents expiring between now and now + days, soonest first."""
+        now = now or datetime.now(timezone.utc)
+        return self.expiring_between(now, now + timedelta(days=days))
+
+    def expiring_between(self, start: datetime, end: datetime) -> List[Consent]:
+        """Active consents whose expiresAt falls in [start, end], soonest first."""
+        with self._lock:
+            lo = bisect_left(self._sorted, (_timestamp(start), ""))
+            hi = bisect_right(self._sorted, (_timestamp(end), "\uffff"))
+            return [self._by_id[consent_id] for _, consent_id in self._sorted[lo:hi]]
+
+    def _fetch(self, item_ids: List[str]) -> int:
+        if not item_ids:
+            return 0
+
+        with self._lock:
+            marks = {item_id: self._stale.get(item_id) for item_id in item_ids}
+
+        def fetch(item_id: str) -> Tuple[str, List[Consent]]:
+            return item_id, self._consents.list_all_consents(item_id)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(item_ids)))) as executor:
+            for item_id, consents in executor.map(fetch, item_ids):
+                with self._lock:
+                    self._replace_item(item_id, consents)
+                    if self._stale.get(item_id) == marks[item_id]:
+                        self._stale.pop(item_id, None)
+        return len(item_ids)
+
+    def _replace_item(self, item_id: str, consents: List[Consent]) -> None:
+        for consent_id in self._by_item.get(item_id, ()):
+            self._drop(consent_id)
+
+        active = set()
+        # The last copy wins if a listing returns the same consent twice.
+        for consent in {consent.id: consent for consent in consents}.values():
+            if consent.expiresAt is None or consent.revokedAt is not None:
+                continue
+            # Indexed once even if another item listed it too.
+            self._drop(consent.id)
+            self._by_id[consent.id] = consent
+            insort(self._sorted, (_timestamp(consent.expiresAt), consent.id))
+            active.add(consent.id)
+        self._by_item[item_id] = active
+
+    def _drop(self, consent_id: str) -> None:
+        consent = self._by_id.pop(consent_id, None)
+        if consent is None:
+            return
+        key = (_timestamp(consent.expiresAt), consent_id)
+        position = bisect_left(self._sorted, key)
+        if position < len(self._sorted) and self._sorted[position] == key:
+            del self._sorted[position]
@@ -0,0 +1,185 @@
+import math
+from array import array
+from datetime import datetime, timezone
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from pluggy_py.models.investments import Investment, InvestmentTransaction
+from pluggy_py.resources.investments import InvestmentsResource
+from pluggy_py.utils.batching import map_concurrently, unique_ids
+
+# How investment transactions are split into money put in and money taken out.
+# `type` decides when present; otherwise movementType (CREDIT into the investment).
+CONTRIBUTION_TYPES = ("BUY",)
+WITHDRAWAL_TYPES = ("SELL",)
+
+UNKNOWN_CURRENCY = "UNKNOWN"
+
+
+class PositionTotals(BaseModel):
+    """Positions of one investment type (or currency)."""
+    count: int = 0
+    balance: float = Field(0.0, description="Sum of net balances")
+    amount: float = Field(0.0, description="Sum of gross amounts")
+    profit: float = Field(0.0, description="Sum of amountProfit")
+
+
+class FlowTotals(BaseModel):
+    """Money moved in and out of investments, in one currency."""
+    contributions: float = Field(0.0, description="Sum of BUY (or CREDIT) transaction amounts")
+    withdrawals: float = Field(0.0, description="Sum of SELL (or DEBIT) transaction amounts")
+    net: float = Field(0.0, description="contributions - withdrawals")
+    transactions: int = 0
+
+
+class PortfolioSnapshot(BaseModel):
+    """Investments of one or many items with their transactions and aggregates."""
+    generated_at: datetime
+    item_ids: List[str]
+    investments: List[Investment]
+    transactions: Dict[str, List[InvestmentTransaction]] = Field(
+        default_factory=dict, description="Transactions by investment id"
+    )
+    by_type: Dict[str, PositionTotals] = Field(default_factory=dict)
+    by_currency: Dict[str, PositionTotals] = Field(default_factory=dict)
+    flows_by_currency: Dict[str, FlowTotals] = Field(default_factory=dict)
+
+
+def _group_sums(keys: List[str], columns: Dict[str, array]) -> Dict[str, Dict[str, float]]:
+    """
+    Column-wise grouped sums: each column is one float64 array aligned with `keys`.
+    The columns are permuted once so that every group is a contiguous slice, and each
+    slice is summed with math.fsum so large portfolios do not accumulate rounding.
+    """
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    ordered = {name: array("d", map(column.__getitem__, order)) for name, column in columns.items()}
+    sums: Dict[str, Dict[str, float]] = {}
+    start = 0
+    for key, group in groupby(map(keys.__getitem__, order)):
+        stop = start + sum(1 for _ in group)
+        sums[key] = {
+            "count": stop - start,
+            **{name: math.fsum(column[start:stop]) for name, column in ordered.items()},
+        }
+        start = stop
+    return sums
+
+
+def _direction(transaction: InvestmentTransaction) -> int:
+    """1 for a contribution, -1 for a withdrawal, 0 for anything else (taxes, interest...)."""
+    kind = (transaction.type or "").upper()
+    if kind in CONTRIBUTION_TYPES:
+        return 1
+    if kind in WITHDRAWAL_TYPES:
+        return -1
+    if not kind:
+        movement = (transaction.movementType or "").upper()
+        if movement == "CREDIT":
+            return 1
+        if movement == "DEBIT":
+            return -1
+    return 0
+
+
+def aggregate_positions(investments: Iterable[Investment]) -> Tuple[Dict[str, PositionTotals], Dict[str, PositionTotals]]:
+    """Positions grouped by investment type and by currency."""
+    investments = list(investments)
+    columns = {
+        "balance": array("d", (i.balance for i in investments)),
+        "amount": array("d", (i.amount or 0.0 for i in investments)),
+        "profit": array("d", (i.amountProfit or 0.0 for i in investments)),
+    }
+    by_type = _group_sums([i.type for i in investments], columns)
+    by_currency = _group_sums([i.currencyCode or UNKNOWN_CURRENCY for i in investments], columns)
+    return (
+        {key: PositionTotals(**totals) for key, totals in by_type.items()},
+        {key: PositionTotals(**totals) for key, totals in by_currency.items()},
+    )
+
+
+def aggregate_flows(
+    investments: Iterable[Investment],
+    transactions: Dict[str, List[InvestmentTransaction]],
+) -> Dict[str, FlowTotals]:
+    """Contributions and withdrawals by currency (the currency of each transaction's investment)."""
+    currencies = {i.id: i.currencyCode or UNKNOWN_CURRENCY for i in investments}
+    keys: List[str] = []
+    contributions = array("d")
+    withdrawals = array("d")
+    for investment_id, rows in transactions.items():
+        currency = currencies.get(investment_id, UNKNOWN_CURRENCY)
+        for transaction in rows:
+            value = abs(transaction.netAmount if transaction.netAmount is not None else transaction.amount or 0.0)
+            direction = _direction(transaction)
+            keys.append(currency)
+            contributions.append(value if direction > 0 else 0.0)
+            withdrawals.append(value if direction < 0 else 0.0)
+
+    flows = {}
+    for currency, totals in _group_sums(keys, {"contributions": contributions, "withdrawals": withdrawals}).items():
+        flows[currency] = FlowTotals(
+            contributions=totals["contributions"],
+            withdrawals=totals["withdrawals"],
+            net=totals["contributions"] - totals["withdrawals"],
+            transactions=totals["count"],
+        )
+    return flows
+
+
+class PortfolioBuilder:
+    """
+    Builds a PortfolioSnapshot for one or many items.
+
+    Investments of all items are listed concurrently, then the transactions of every
+    investment are fetched concurrently as well, each with full paging - instead of a
+    serial loop over investments x pages. Aggregates (positions by type and currency,
+    contributions/withdrawals by currency) are computed column-wise over the result.
+
+    Usage:
+        snapshot = PortfolioBuilder(client.investments).build([item_id])
+        snapshot.by_type["FIXED_INCOME"].balance
+    """
+
+    def __init__(self, investments: InvestmentsResource, max_workers: int = 8):
+        self._investments = investments
+        self.max_workers = max_workers
+
+    def build(
+        self,
+        item_ids: Iterable[str],
+        type: Optional[str] = None,
+        include_transactions: bool = True,
+    ) -> PortfolioSnapshot:
+        """
+        :param type: Only investments of this type (e.g. "FIXED_INCOME").
+        :param include_transactions: Set to False to skip transactions (and flows) and
+            only aggregate positions.
+        """
+        item_ids = unique_ids(item_ids)
+        per_item = map_concurrently(
+            lambda item_id: self._investments.list_all_investments(item_id, type=type),
+            item_ids,
+            max_workers=self.max_workers,
+        )
+        investments = [investment for rows in per_item for investment in rows]
+
+        transactions: Dict[str, List[InvestmentTransaction]] = {}
+        if include_transactions and investments:
+            ids = unique_ids(investment.id for investment in investments)
+            fetched = map_concurrently(
+                self._investments.list_all_investment_transactions, ids, max_workers=self.max_workers
+            )
+            transactions = {investment_id: list(rows) for investment_id, rows in zip(ids, fetched)}
+
+        by_type, by_currency = aggregate_positions(investments)
+        return PortfolioSnapshot(
+            generated_at=datetime.now(timezone.utc),
+            item_ids=item_ids,
+            investments=investments,
+            transactions=transactions,
+            by_type=by_type,
+            by_currency=by_currency,
+            flows_by_currency=aggregate_flows(investments, transactions) if include_transactions else {},
+        )
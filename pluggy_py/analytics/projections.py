@@ -0,0 +1,274 @@
+from array import array
+from datetime import date, datetime, timezone
+from itertools import repeat
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from pydantic import BaseModel, Field
+
+from pluggy_py.models.loans import Loan
+from pluggy_py.models.transactions import Transaction
+
+CARD_INSTALLMENTS = "card_installments"
+LOAN_INSTALLMENTS = "loan_installments"
+BALLOON_PAYMENTS = "balloon_payments"
+SOURCES = (CARD_INSTALLMENTS, LOAN_INSTALLMENTS, BALLOON_PAYMENTS)
+
+# Months between two loan installments, by Loan.installmentPeriodicity.
+PERIODICITY_MONTHS = {
+    "MONTHLY": 1,
+    "MENSAL": 1,
+    "BIMONTHLY": 2,
+    "QUARTERLY": 3,
+    "TRIMESTRAL": 3,
+    "SEMIANNUAL": 6,
+    "SEMESTRAL": 6,
+    "ANNUAL": 12,
+    "YEARLY": 12,
+    "ANUAL": 12,
+}
+YEARLY_RATE_PERIODICITIES = ("YEARLY", "ANNUAL", "ANUAL", "AA")
+
+
+class CashFlowProjection(BaseModel):
+    """Projected outflows per month, per account (or loan) and per source."""
+    months: List[str] = Field(..., description="Months of the horizon as YYYY-MM")
+    by_account: Dict[str, List[float]] = Field(
+        default_factory=dict, description="Amount due per month, by account id (loan id for loans)"
+    )
+    by_source: Dict[str, List[float]] = Field(
+        default_factory=dict, description="Amount due per month, by source (card_installments, ...)"
+    )
+    totals: List[float] = Field(default_factory=list, description="Amount due per month, all accounts")
+    outside_horizon: float = Field(0.0, description="Projected amounts falling after the last month")
+
+
+def _month_ordinal(value: Union[date, datetime]) -> int:
+    return value.year * 12 + value.month - 1
+
+
+def _as_date(value: Union[date, datetime]) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _month_label(ordinal: int) -> str:
+    year, month = divmod(ordinal, 12)
+    return f"{year:04d}-{month + 1:02d}"
+
+
+def _latest_installments(transactions: Iterable[Transaction]) -> List[Transaction]:
+    """
+    Each installment of a purchase shows up as its own transaction on its own bill;
+    keep only the most recent installment of every purchase. A purchase is identified
+    by its card, purchase date, number of installments and total amount - not by its
+    description, which carries the installment number ("PARC 02/10").
+    """
+    latest: Dict[Tuple, Transaction] = {}
+    for transaction in transactions:
+        metadata = transaction.creditCardMetadata
+        if metadata is None or not metadata.totalInstallments or not metadata.installmentNumber:
+            continue
+        purchase = (
+            transaction.accountId,
+            metadata.cardNumber,
+            metadata.purchaseDate,
+            metadata.totalInstallments,
+            metadata.totalAmount,
+        )
+        current = latest.get(purchase)
+        if current is None or metadata.installmentNumber > current.creditCardMetadata.installmentNumber:
+            latest[purchase] = transaction
+    return list(latest.values())
+
+
+def _period_rate(loan: Loan, step: int) -> float:
+    """Interest rate per installment period from the loan's pre-fixed rate (1 = 100%)."""
+    for rate in loan.interestRates or ():
+        if rate.preFixedRate is None:
+            continue
+        yearly = (rate.taxPeriodicity or "").upper() in YEARLY_RATE_PERIODICITIES
+        monthly = (1 + rate.preFixedRate) ** (1 / 12) - 1 if yearly else rate.preFixedRate
+        return (1 + monthly) ** step - 1
+    return 0.0
+
+
+def _remaining_installments(loan: Loan) -> int:
+    installments = loan.installments
+    if installments is None:
+        return 0
+    if installments.dueInstallments is not None:
+        return installments.dueInstallments
+    if installments.contractRemainingNumber is not None and (installments.typeContractRemaining or "MONTH") == "MONTH":
+        return installments.contractRemainingNumber
+    if installments.totalNumberOfInstallments is not None:
+        return max(0, installments.totalNumberOfInstallments - (installments.paidInstallments or 0))
+    return 0
+
+
+class ProjectionEngine:
+    """
+    Expands remaining credit card installments and loan schedules into monthly cash
+    flows, for any number of accounts in one batch.
+
+    Flows are kept in typed array columns (account index, month, source, amount), and
+    every purchase or loan schedule is appended to them as one batch (a month range
+    and its amounts) rather than flow by flow. project() folds the columns into one
+    flat account x month array in a single pass, so the cost is linear in the number
+    of flows however many accounts are involved.
+
+      - Card installments: for the latest installment n of N seen for a purchase, the
+        remaining N - n installments of the same amount fall in the following months.
+      - Loans: the remaining installments (dueInstallments) of the outstanding balance
+        net of balloon payments, from the next due date at installmentPeriodicity, using
+        the SAC schedule when amortizationScheduled is "SAC" and PRICE otherwise, with
+        the pre-fixed rate of interestRates. Balloon payments fall on their own dueDate;
+        only those not yet due are netted out of the outstanding balance.
+
+    Amounts are positive outflows.
+
+    Usage:
+        engine = ProjectionEngine(months=12)
+        engine.add_card_transactions(card_transactions)
+        engine.add_loans(client.loans.list_all_loans(item_id))
+        projection = engine.project()
+    """
+
+    def __init__(self, months: int = 12, start: Optional[Union[date, datetime]] = None):
+        """
+        :param months: Length of the horizon.
+        :param start: First month of the horizon; defaults to next month, since the
+            current month's installments are normally already on the open bill.
+        """
+        if months < 1:
+            raise ValueError("months must be at least 1")
+        now = datetime.now(timezone.utc)
+        self.today = now.date()
+        self.months = months
+        self.start = _month_ordinal(start) if start is not None else _month_ordinal(now) + 1
+        self._accounts: List[str] = []
+        self._account_index: Dict[str, int] = {}
+        self._flow_account = array("I")
+        self._flow_month = array("i")
+        self._flow_source = array("b")
+        self._flow_amount = array("d")
+
+    def add_card_transactions(self, transactions: Iterable[Transaction]) -> int:
+        """Adds the remaining installments of card purchases. Returns the number of purchases projected."""
+        purchases = _latest_installments(transactions)
+        for transaction in purchases:
+            metadata = transaction.creditCardMetadata
+            posted = _month_ordinal(transaction.date)
+            remaining = metadata.totalInstallments - metadata.installmentNumber
+            self._add(
+                transaction.accountId or "",
+                range(posted + 1, posted + remaining + 1),
+                CARD_INSTALLMENTS,
+                repeat(abs(transaction.amount), remaining),
+            )
+        return len(purchases)
+
+    def add_loans(self, loans: Iterable[Loan]) -> int:
+        """Adds the remaining schedule of each loan, keyed by loan id. Returns the number of loans projected."""
+        projected = 0
+        for loan in loans:
+            if self._add_loan(loan):
+                projected += 1
+        return projected
+
+    def project(self) -> CashFlowProjection:
+        months = self.months
+        # Row-major account x month grid; by_source is the same grid over SOURCES.
+        grid = array("d", bytes(8 * months * len(self._accounts)))
+        by_source = array("d", bytes(8 * months * len(SOURCES)))
+        outside = 0.0
+        start, end = self.start, self.start + months
+        for account, month, source, amount in zip(
+            self._flow_account, self._flow_month, self._flow_source, self._flow_amount
+        ):
+            if month >= end:
+                outside += amount
+            elif month >= start:
+                grid[account * months + month - start] += amount
+                by_source[source * months + month - start] += amount
+
+        sources = [by_source[k * months:(k + 1) * months].tolist() for k in range(len(SOURCES))]
+        return CashFlowProjection(
+            months=[_month_label(start + offset) for offset in range(months)],
+            by_account={
+                account: grid[k * months:(k + 1) * months].tolist() for k, account in enumerate(self._accounts)
+            },
+            by_source=dict(zip(SOURCES, sources)),
+            totals=[sum(column) for column in zip(*sources)],
+            outside_horizon=outside,
+        )
+
+    def _add(self, account: str, months: Iterable[int], source: str, amounts: Iterable[float]) -> None:
+        """Appends one batch of flows of an account and source: one amount per month."""
+        added = len(self._flow_month)
+        self._flow_month.extend(months)
+        self._flow_amount.extend(amounts)
+        count = len(self._flow_month) - added
+        if not count:
+            return
+        position = self._account_index.get(account)
+        if position is None:
+            position = self._account_index[account] = len(self._accounts)
+            self._accounts.append(account)
+        self._flow_account.extend(repeat(position, count))
+        self._flow_source.extend(repeat(SOURCES.index(source), count))
+
+    def _add_loan(self, loan: Loan) -> bool:
+        remaining = _remaining_installments(loan)
+        balloons = [
+            b for b in (loan.installments.balloonPayments or () if loan.installments else ())
+            if b.dueDate is not None and b.amount is not None and b.amount.value
+        ]
+        outstanding = loan.payments.contractOutstandingBalance if loan.payments else None
+        if outstanding is None:
+            outstanding = loan.contractAmount
+        if outstanding is None or (remaining <= 0 and not balloons):
+            return False
+
+        self._add(
+            loan.id,
+            [_month_ordinal(balloon.dueDate) for balloon in balloons],
+            BALLOON_PAYMENTS,
+            [balloon.amount.value for balloon in balloons],
+        )
+
+        future_balloons = sum(b.amount.value for b in balloons if _as_date(b.dueDate) >= self.today)
+        principal = max(0.0, outstanding - future_balloons)
+        if remaining <= 0 or principal == 0:
+            return True
+
+        step = PERIODICITY_MONTHS.get((loan.installmentPeriodicity or "").upper(), 1)
+        rate = _period_rate(loan, step)
+        paid = loan.installments.paidInstallments or 0
+        if loan.firstInstallmentDueDate is not None:
+            first_due = _month_ordinal(loan.firstInstallmentDueDate) + paid * step
+        else:
+            first_due = self.start
+        first_due = max(first_due, self.start)
+
+        if (loan.amortizationScheduled or "").upper() == "SAC":
+            amortization = principal / remaining
+            payments = [amortization + (principal - amortization * k) * rate for k in range(remaining)]
+        elif rate > 0:
+            payments = [principal * rate / (1 - (1 + rate) ** -remaining)] * remaining
+        else:
+            payments = [principal / remaining] * remaining
+
+        self._add(loan.id, range(first_due, first_due + remaining * step, step), LOAN_INSTALLMENTS, payments)
+        return True
+
+
+def project_cash_flows(
+    transactions: Iterable[Transaction] = (),
+    loans: Iterable[Loan] = (),
+    months: int = 12,
+    start: Optional[Union[date, datetime]] = None,
+) -> CashFlowProjection:
+    """One-call batch projection of card installments and loan schedules."""
+    engine = ProjectionEngine(months=months, start=start)
+    engine.add_card_transactions(transactions)
+    engine.add_loans(loans)
+    return engine.project()
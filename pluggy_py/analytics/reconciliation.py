@@ -0,0 +1,210 @@
+import math
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from pluggy_py.models.bills import Bill
+from pluggy_py.models.transactions import Transaction
+from pluggy_py.resources.bills import BillsResource
+from pluggy_py.resources.transactions import TransactionsResource
+from pluggy_py.utils.batching import map_concurrently, unique_ids
+
+# How far before its due date the first known bill of an account covers transactions
+# without a billId; later bills cover the time since the previous bill's due date.
+FIRST_BILL_WINDOW = timedelta(days=31)
+
+
+class BillReconciliation(BaseModel):
+    """How the transactions pointing to one bill add up against the bill's total."""
+    bill_id: str
+    account_id: Optional[str] = None
+    due_date: Optional[datetime] = None
+    bill_total: Optional[float] = Field(None, description="Bill.totalAmount")
+    transactions_total: float = Field(0.0, description="Net sum of the bill's transaction amounts")
+    transaction_count: int = 0
+    dated_count: int = Field(0, description="Transactions without a billId assigned to the bill by date")
+    finance_charges_total: float = Field(0.0, description="Sum of Bill.financeCharges amounts")
+    difference: Optional[float] = Field(
+        None,
+        description="|transactions_total| + finance_charges_total - |bill_total|; None when the bill has no totalAmount",
+    )
+    matched: bool = Field(False, description="True when |difference| is within the tolerance")
+
+
+class ReconciliationReport(BaseModel):
+    """Result of reconciling the bills and transactions of one or many credit card accounts."""
+    bills: List[BillReconciliation] = Field(default_factory=list)
+    unmatched_transactions: List[Transaction] = Field(
+        default_factory=list,
+        description="Transactions whose billId is not among the bills, or without a billId and outside every bill's window",
+    )
+    unknown_bill_ids: List[str] = Field(
+        default_factory=list, description="billIds referenced by transactions but missing from the bills"
+    )
+
+    @property
+    def mismatched(self) -> List[BillReconciliation]:
+        return [bill for bill in self.bills if not bill.matched]
+
+
+def index_by_bill(transactions: Iterable[Transaction]) -> Tuple[Dict[str, List[Transaction]], List[Transaction]]:
+    """
+    One pass over `transactions`: a billId -> transactions index, plus the transactions
+    that carry no billId.
+    """
+    by_bill: Dict[str, List[Transaction]] = {}
+    unassigned: List[Transaction] = []
+    for transaction in transactions:
+        metadata = transaction.creditCardMetadata
+        bill_id = metadata.billId if metadata is not None else None
+        if bill_id is None:
+            unassigned.append(transaction)
+        else:
+            by_bill.setdefault(bill_id, []).append(transaction)
+    return by_bill, unassigned
+
+
+def _timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def assign_by_due_date(
+    bills: Iterable[Bill], transactions: Iterable[Transaction]
+) -> Tuple[Dict[str, List[Transaction]], List[Transaction]]:
+    """
+    Assigns transactions that carry no billId to a bill of their account by date: a
+    bill covers the transactions after the previous bill's due date up to its own (the
+    first bill, FIRST_BILL_WINDOW before its due date). Returns a billId -> transactions
+    index, plus the transactions that fall outside every bill's window (e.g. on the
+    still open bill).
+    """
+    due_dates: Dict[Optional[str], List[Tuple[float, str]]] = {}
+    for bill in bills:
+        if bill.dueDate is not None:
+            due_dates.setdefault(bill.accountId, []).append((_timestamp(bill.dueDate), bill.id))
+    for dates in due_dates.values():
+        dates.sort()
+
+    by_bill: Dict[str, List[Transaction]] = {}
+    unassigned: List[Transaction] = []
+    for transaction in transactions:
+        dates = due_dates.get(transaction.accountId, ())
+        when = _timestamp(transaction.date)
+        position = bisect_left(dates, (when, ""))
+        if position == len(dates) or (
+            position == 0 and when <= dates[0][0] - FIRST_BILL_WINDOW.total_seconds()
+        ):
+            unassigned.append(transaction)
+            continue
+        by_bill.setdefault(dates[position][1], []).append(transaction)
+    return by_bill, unassigned
+
+
+def _amount(transaction: Transaction) -> float:
+    # Bills are stated in the account's currency.
+    if transaction.amountInAccountCurrency is not None:
+        return transaction.amountInAccountCurrency
+    return transaction.amount
+
+
+def reconcile(
+    bills: Iterable[Bill],
+    transactions: Iterable[Transaction],
+    tolerance: float = 0.01,
+) -> ReconciliationReport:
+    """
+    Joins bills with their transactions through creditCardMetadata.billId, using a hash
+    index built in a single pass, so the cost is linear in bills + transactions.
+    Transactions without a billId are assigned by date (see assign_by_due_date).
+
+    Institutions disagree on the sign of card purchases and bill totals, so bills are
+    compared in absolute value. Finance charges are part of the bill's total without
+    being transactions: difference = |sum of amounts| + finance charges - |totalAmount|.
+    """
+    unique_bills: Dict[str, Bill] = {}
+    for bill in bills:
+        unique_bills.setdefault(bill.id, bill)
+    seen_bills = unique_bills.keys()
+
+    by_bill, unassigned = index_by_bill(transactions)
+    dated, unmatched = assign_by_due_date(unique_bills.values(), unassigned)
+
+    report = ReconciliationReport()
+    for bill in unique_bills.values():
+        rows = by_bill.get(bill.id, []) + dated.get(bill.id, [])
+        total = math.fsum(_amount(transaction) for transaction in rows)
+        charges = math.fsum(charge.amount or 0.0 for charge in bill.financeCharges or ())
+        difference = None
+        if bill.totalAmount is not None:
+            difference = abs(total) + charges - abs(bill.totalAmount)
+        report.bills.append(BillReconciliation(
+            bill_id=bill.id,
+            account_id=bill.accountId,
+            due_date=bill.dueDate,
+            bill_total=bill.totalAmount,
+            transactions_total=total,
+            transaction_count=len(rows),
+            dated_count=len(dated.get(bill.id, ())),
+            finance_charges_total=charges,
+            difference=difference,
+            matched=difference is not None and abs(difference) <= tolerance,
+        ))
+
+    for bill_id, rows in by_bill.items():
+        if bill_id not in seen_bills:
+            report.unknown_bill_ids.append(bill_id)
+            unmatched.extend(rows)
+    report.unmatched_transactions = unmatched
+    return report
+
+
+class BillReconciler:
+    """
+    Reconciles many credit card accounts at once: each account's bills and transactions
+    are fetched and reconciled on a thread pool, and the per-account reports are merged.
+    Accounts are independent, so memory holds one account's transactions per worker.
+
+    Usage:
+        report = BillReconciler(client.bills, client.transactions).reconcile_accounts(card_account_ids)
+        for bill in report.mismatched:
+            print(bill.bill_id, bill.difference)
+    """
+
+    def __init__(
+        self,
+        bills: BillsResource,
+        transactions: TransactionsResource,
+        max_workers: int = 8,
+        tolerance: float = 0.01,
+    ):
+        self._bills = bills
+        self._transactions = transactions
+        self.max_workers = max_workers
+        self.tolerance = tolerance
+
+    def reconcile_account(self, account_id: str, from_date: Optional[str] = None) -> ReconciliationReport:
+        """
+        :param from_date: Only transactions on/after this date; bills reaching outside the
+            range will then show up as mismatched.
+        """
+        bills = self._bills.list_all_bills(account_id)
+        transactions = self._transactions.list_all_transactions(account_id, from_date=from_date)
+        return reconcile(bills, transactions, tolerance=self.tolerance)
+
+    def reconcile_accounts(self, account_ids: Iterable[str], from_date: Optional[str] = None) -> ReconciliationReport:
+        reports = map_concurrently(
+            lambda account_id: self.reconcile_account(account_id, from_date),
+            unique_ids(account_ids),
+            max_workers=self.max_workers,
+        )
+        merged = ReconciliationReport()
+        for report in reports:
+            merged.bills.extend(report.bills)
+            merged.unmatched_transactions.extend(report.unmatched_transactions)
+            merged.unknown_bill_ids.extend(report.unknown_bill_ids)
+        merged.unknown_bill_ids = unique_ids(merged.unknown_bill_ids)
+        return merged
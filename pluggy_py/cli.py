@@ -0,0 +1,227 @@
+"""
+Command line interface for pluggy_py.
+
+    pluggy-py export --items-file items.yaml --out ./dump --format ndjson
+
+Credentials are read from --client-id/--client-secret or from the
+PLUGGY_CLIENT_ID / PLUGGY_CLIENT_SECRET environment variables. In CSV output,
+nested objects and lists (e.g. a transaction's merchant) are JSON-encoded cells.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Type
+
+from pydantic import BaseModel
+
+from pluggy_py.config import BASE_URL
+from pluggy_py.client import PluggyClient
+from pluggy_py.utils.http_client import HttpClient
+from pluggy_py.utils.pagination import iter_pages
+from pluggy_py.models.accounts import Account, PageResponseAccounts
+from pluggy_py.models.transactions import Transaction
+from pluggy_py.models.investments import Investment, PageResponseInvestments
+from pluggy_py.models.loans import Loan, PageResponseLoans
+from pluggy_py.models.bills import Bill, PageResponseBills
+
+RESOURCES = ("accounts", "transactions", "investments", "loans", "bills")
+
+MODELS: Dict[str, Type[BaseModel]] = {
+    "accounts": Account,
+    "transactions": Transaction,
+    "investments": Investment,
+    "loans": Loan,
+    "bills": Bill,
+}
+
+
+def _csv_row(item_id: str, record: BaseModel) -> dict:
+    """One CSV row per record: top-level fields as columns, nested objects and lists as JSON."""
+    row = {"_itemId": item_id}
+    for key, value in record.model_dump(mode="json").items():
+        row[key] = json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+    return row
+
+
+class _RecordWriter:
+    """Appends records of one resource to a single NDJSON or CSV file, one page at a time."""
+
+    def __init__(self, path: str, fmt: str, model: Type[BaseModel]):
+        self.path = path
+        self.fmt = fmt
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=["_itemId"] + list(model.model_fields))
+            self._csv.writeheader()
+
+    def write_page(self, item_id: str, records: List[BaseModel]) -> None:
+        if not records:
+            return
+        if self._csv is not None:
+            rows = [_csv_row(item_id, r) for r in records]
+        else:
+            lines = "".join(
+                json.dumps({"_itemId": item_id, **r.model_dump(mode="json")}, ensure_ascii=False) + "\n"
+                for r in records
+            )
+        with self._lock:
+            if self._csv is not None:
+                self._csv.writerows(rows)
+            else:
+                self._file.write(lines)
+            self._file.flush()
+            self.count += len(records)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _export_item(
+    client: PluggyClient,
+    http: HttpClient,
+    item_id: str,
+    resources: List[str],
+    writers: Dict[str, _RecordWriter],
+    from_date: Optional[str],
+    to_date: Optional[str],
+) -> None:
+    """Writes every listing of the item page by page, as each page arrives."""
+    headers = {"X-API-KEY": client.api_key}
+
+    def stream(resource: str, path: str, params: dict, page_model: Type[BaseModel]) -> List[BaseModel]:
+        """Writes the pages of one listing; returns the rows only for accounts, which later listings need."""
+        kept: List[BaseModel] = []
+        for page_response in iter_pages(http, path, params, headers, page_model):
+            if resource in writers:
+                writers[resource].write_page(item_id, page_response.results)
+            if resource == "accounts":
+                kept.extend(page_response.results)
+        return kept
+
+    accounts = []
+    if any(r in resources for r in ("accounts", "transactions", "bills")):
+        accounts = stream("accounts", "/accounts", {"itemId": item_id}, PageResponseAccounts)
+
+    if "transactions" in resources and accounts:
+        client.transactions.process_all_transactions(
+            [account.id for account in accounts],
+            lambda page: writers["transactions"].write_page(item_id, page),
+            from_date=from_date,
+            to_date=to_date,
+            fetchers=1,
+        )
+
+    if "bills" in resources:
+        for account in accounts:
+            if account.type == "CREDIT":
+                stream("bills", "/bills", {"accountId": account.id}, PageResponseBills)
+
+    if "investments" in resources:
+        stream("investments", "/investments", {"itemId": item_id}, PageResponseInvestments)
+
+    if "loans" in resources:
+        stream("loans", "/loans", {"itemId": item_id}, PageResponseLoans)
+
+
+def export(args: argparse.Namespace) -> int:
+    client_id = args.client_id or os.environ.get("PLUGGY_CLIENT_ID")
+    client_secret = args.client_secret or os.environ.get("PLUGGY_CLIENT_SECRET")
+    if not client_id or not client_secret:
+        print("error: missing credentials (--client-id/--client-secret or PLUGGY_CLIENT_ID/PLUGGY_CLIENT_SECRET)",
+              file=sys.stderr)
+        return 2
+
+    resources = [r.strip() for r in args.resources.split(",") if r.strip()]
+    unknown = set(resources) - set(RESOURCES)
+    if unknown:
+        print(f"error: unknown resources: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    http = HttpClient(args.base_url, pool_maxsize=max(10, args.workers))
+    client = PluggyClient(client_id, client_secret, base_url=args.base_url, http_client=http)
+    client.authenticate()
+
+    item_ids = list(args.item or [])
+    if args.items_file:
+        item_ids.extend(entry["id"] for entry in client.items.retrieve_yaml_items(args.items_file))
+    if not item_ids:
+        print("error: no items given (--item or --items-file)", file=sys.stderr)
+        return 2
+
+    os.makedirs(args.out, exist_ok=True)
+    writers = {
+        resource: _RecordWriter(os.path.join(args.out, f"{resource}.{args.format}"), args.format, MODELS[resource])
+        for resource in resources
+    }
+
+    started = time.monotonic()
+    failed = 0
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = {
+                executor.submit(
+                    _export_item, client, http, item_id, resources, writers, args.from_date, args.to_date
+                ): item_id
+                for item_id in item_ids
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                item_id = futures[future]
+                try:
+                    future.result()
+                    status = "ok"
+                except Exception as exc:
+                    failed += 1
+                    status = f"failed: {exc}"
+                print(f"[{done}/{len(item_ids)}] item {item_id} {status}", file=sys.stderr)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    elapsed = time.monotonic() - started
+    print(f"Exported {len(item_ids) - failed}/{len(item_ids)} items in {elapsed:.1f}s", file=sys.stderr)
+    for resource, writer in writers.items():
+        print(f"  {resource:<13} {writer.count:>10} records -> {writer.path}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="pluggy-py", description="Pluggy API command line tools")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    exp = subcommands.add_parser(
+        "export",
+        help="Stream item data to NDJSON/CSV files",
+        description="Streams accounts, transactions, investments, loans and bills of the given "
+                    "items to one file per resource, writing each page as it arrives.",
+    )
+    exp.add_argument("--item", action="append", help="Item id to export (repeatable)")
+    exp.add_argument("--items-file", help="items.yaml file in the 'name: id' format")
+    exp.add_argument("--out", default=".", help="Output directory (default: current directory)")
+    exp.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    exp.add_argument("--resources", default=",".join(RESOURCES),
+                     help=f"Comma-separated subset of: {','.join(RESOURCES)}")
+    exp.add_argument("--workers", type=int, default=4, help="Items exported in parallel (default: 4)")
+    exp.add_argument("--from", dest="from_date", help="Only transactions on/after this date (YYYY-MM-DD)")
+    exp.add_argument("--to", dest="to_date", help="Only transactions on/before this date (YYYY-MM-DD)")
+    exp.add_argument("--client-id")
+    exp.add_argument("--client-secret")
+    exp.add_argument("--base-url", default=BASE_URL)
+    exp.set_defaults(func=export)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,11 @@
+import time
+from typing import Iterable, Optional, Type
+from pydantic import BaseModel
 from .config import BASE_URL
 from pluggy_py.utils.http_client import HttpClient
+from pluggy_py.utils.entity_cache import EntityCache
+from pluggy_py.utils.warm_up import WarmUpReport, warm_up_models
+from pluggy_py.analytics.aggregates import MonthlyAggregates
 from pluggy_py.resources.auth import AuthResource
 from pluggy_py.models.auth import AuthRequest
 from pluggy_py.resources.items import ItemsResource
@@ -15,14 +21,34 @@ from pluggy_py.resources.bills import BillsResource
 from pluggy_py.resources.webhooks import WebhooksResource
 
 class PluggyClient:
-    def __init__(self, client_id: str, client_secret: str, base_url: str = BASE_URL):
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        base_url: str = BASE_URL,
+        http_client: Optional[HttpClient] = None,
+        entity_cache: Optional[EntityCache] = None,
+        aggregates: Optional[MonthlyAggregates] = None,
+    ):
         self.client_id = client_id
         self.client_secret = client_secret
         self.base_url = base_url
         self.api_key = None
 
-        # Create a shared HttpClient
-        self._http = HttpClient(self.base_url)
+        # Optional cache for items, accounts, identity, loans and bills.
+        # Feed Pluggy webhook payloads to entity_cache.handle_webhook_event()
+        # so cached data is dropped when an item finishes updating.
+        # Entries are scoped by client_id, so a cache shared between clients
+        # with different credentials never serves one client's data to another.
+        self.entity_cache = entity_cache
+
+        # Optional materialized monthly aggregates, kept up to date with the
+        # transactions listed and re-categorized through this client.
+        self.aggregates = aggregates
+
+        # Create a shared HttpClient, unless a pre-configured one was supplied
+        # (e.g. HttpClient(base_url, coalesce_gets=True))
+        self._http = http_client or HttpClient(self.base_url)
 
     def authenticate(self):
         auth_resource = AuthResource(self._http)
@@ -33,14 +59,31 @@ class PluggyClient:
         self.api_key = auth_response.apiKey
 
         # Once we have the api_key, instantiate the resources
-        self.items = ItemsResource(self._http, self.api_key)
+        cache = self.entity_cache.scoped(self.client_id) if self.entity_cache is not None else None
+        self.items = ItemsResource(self._http, self.api_key, cache)
         self.consents = ConsentsResource(self._http, self.api_key)
-        self.accounts = AccountsResource(self._http, self.api_key)
-        self.transactions = TransactionsResource(self._http, self.api_key)
+        self.accounts = AccountsResource(self._http, self.api_key, cache)
+        self.transactions = TransactionsResource(self._http, self.api_key, self.aggregates)
         self.investments = InvestmentsResource(self._http, self.api_key)
-        self.identity = IdentityResource(self._http, self.api_key)
+        self.identity = IdentityResource(self._http, self.api_key, cache)
         self.categories = CategoriesResource(self._http, self.api_key)
-        self.loans = LoansResource(self._http, self.api_key)
+        self.loans = LoansResource(self._http, self.api_key, cache)
         self.benefits = BenefitsResource(self._http, self.api_key)
-        self.bills = BillsResource(self._http, self.api_key)
+        self.bills = BillsResource(self._http, self.api_key, cache)
         self.webhooks = WebhooksResource(self._http, self.api_key)
+
+    def warm_up(self, connections: int = 4, models: Iterable[Type[BaseModel]] = ()) -> WarmUpReport:
+        """
+        Opt-in startup step, typically called right after authenticate() in services
+        where the first request's latency matters. Opens `connections` pooled
+        connections to base_url (see HttpClient.preconnect) and builds the validators
+        of the models the service will parse, e.g.
+            client.warm_up(8, models=[PageResponseTransactions, Account])
+        """
+        started = time.monotonic()
+        report = WarmUpReport()
+        if connections:
+            report.connections = self._http.preconnect(connections)
+        report.models = warm_up_models(models)
+        report.seconds = time.monotonic() - started
+        return report
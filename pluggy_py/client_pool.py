@@ -0,0 +1,285 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from .config import BASE_URL
+from pluggy_py.client import PluggyClient
+from pluggy_py.exceptions import TenantRemovedError
+from pluggy_py.utils.http_client import HttpClient
+
+
+class TenantQuota(BaseModel):
+    """Limits applied to one tenant of a PluggyClientPool."""
+    max_concurrency: int = Field(4, description="Requests of this tenant allowed in flight at once")
+    requests_per_second: Optional[float] = Field(None, description="Sustained request rate; None for unlimited")
+    burst: int = Field(1, description="Requests that may be sent back-to-back before the rate applies")
+
+
+class TenantUsage(BaseModel):
+    """Snapshot of one tenant's usage, as returned by PluggyClientPool.stats()."""
+    requests: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    waiting: int = 0
+    queue_wait_seconds: float = Field(0.0, description="Time spent waiting for a concurrency slot")
+    throttle_wait_seconds: float = Field(0.0, description="Time spent waiting on the rate quota")
+    busy_seconds: float = Field(0.0, description="Time spent in requests")
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Blocks until a token is available; returns the time spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class _Tenant:
+    def __init__(self, tenant_id: str, quota: TenantQuota):
+        self.tenant_id = tenant_id
+        self.quota = quota
+        self.bucket = _TokenBucket(quota.requests_per_second, quota.burst) if quota.requests_per_second else None
+        self.queue: Deque[list] = deque()
+        self.usage = TenantUsage()
+        self.client: Optional[PluggyClient] = None
+        self.auth_lock = threading.Lock()
+        self.removed = False
+
+
+class _FairScheduler:
+    """
+    Hands out the pool's global concurrency slots round-robin across tenants that have
+    requests waiting, never exceeding a tenant's own max_concurrency. A tenant issuing a
+    flood of requests therefore only delays other tenants by at most one slot each turn.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self._cond = threading.Condition()
+        self._order: List[_Tenant] = []
+        self._cursor = 0
+
+    def register(self, tenant: _Tenant) -> None:
+        with self._cond:
+            self._order.append(tenant)
+
+    def unregister(self, tenant: _Tenant) -> None:
+        """Removes the tenant; its queued requests are woken up and fail with TenantRemovedError."""
+        with self._cond:
+            self._order.remove(tenant)
+            self._cursor = self._cursor % len(self._order) if self._order else 0
+            tenant.removed = True
+            self._cond.notify_all()
+
+    def acquire(self, tenant: _Tenant) -> float:
+        """Blocks until the tenant is granted a slot; returns the time spent queued."""
+        started = time.monotonic()
+        ticket = [False]
+        with self._cond:
+            if tenant.removed:
+                raise TenantRemovedError(tenant.tenant_id)
+            tenant.queue.append(ticket)
+            tenant.usage.waiting += 1
+            self._dispatch()
+            while not ticket[0]:
+                if tenant.removed:
+                    tenant.queue.remove(ticket)
+                    tenant.usage.waiting -= 1
+                    raise TenantRemovedError(tenant.tenant_id)
+                self._cond.wait()
+            tenant.usage.waiting -= 1
+        return time.monotonic() - started
+
+    def release(self, tenant: _Tenant) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            tenant.usage.in_flight -= 1
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        granted = False
+        while self.in_flight < self.max_concurrency and self._order:
+            for step in range(len(self._order)):
+                tenant = self._order[(self._cursor + step) % len(self._order)]
+                if tenant.queue and tenant.usage.in_flight < tenant.quota.max_concurrency:
+                    tenant.queue.popleft()[0] = True
+                    tenant.usage.in_flight += 1
+                    self.in_flight += 1
+                    self._cursor = (self._cursor + step + 1) % len(self._order)
+                    granted = True
+                    break
+            else:
+                break
+        if granted:
+            self._cond.notify_all()
+
+
+class _TenantHttpClient:
+    """
+    HttpClient facade handed to one tenant's PluggyClient: every call goes through the
+    tenant's rate quota and the pool's fair scheduler, then onto the shared HttpClient.
+    """
+
+    def __init__(self, shared: HttpClient, tenant: _Tenant, scheduler: _FairScheduler):
+        self._shared = shared
+        self._tenant = tenant
+        self._scheduler = scheduler
+
+    @property
+    def timeout(self):
+        return self._shared.timeout
+
+    @property
+    def metrics(self):
+        return getattr(self._shared, "metrics", None)
+
+    def preconnect(self, connections: int = 4, timeout: Optional[float] = None) -> int:
+        # Warms the shared connection pool; not subject to the tenant's quota.
+        return self._shared.preconnect(connections, timeout=timeout)
+
+    def _call(self, fn: Callable, *args, **kwargs):
+        usage = self._tenant.usage
+        if self._tenant.bucket is not None:
+            throttled = self._tenant.bucket.acquire()
+            with self._scheduler._cond:
+                usage.throttle_wait_seconds += throttled
+            if self.metrics is not None:
+                self.metrics.observe_rate_limit_wait(self._tenant.tenant_id, throttled)
+
+        queued = self._scheduler.acquire(self._tenant)
+        started = time.monotonic()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            with self._scheduler._cond:
+                usage.errors += 1
+            raise
+        finally:
+            with self._scheduler._cond:
+                usage.requests += 1
+                usage.queue_wait_seconds += queued
+                usage.busy_seconds += time.monotonic() - started
+            self._scheduler.release(self._tenant)
+
+    def get(self, *args, **kwargs):
+        return self._call(self._shared.get, *args, **kwargs)
+
+    def post(self, *args, **kwargs):
+        return self._call(self._shared.post, *args, **kwargs)
+
+    def put(self, *args, **kwargs):
+        return self._call(self._shared.put, *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._call(self._shared.delete, *args, **kwargs)
+
+    def patch(self, *args, **kwargs):
+        return self._call(self._shared.patch, *args, **kwargs)
+
+
+class PluggyClientPool:
+    """
+    Serves several Pluggy client_id/client_secret pairs ("tenants") from one process.
+
+    All tenants share a single HttpClient - and so one keep-alive connection pool - while
+    each keeps its own API key. Requests are admitted by a fair scheduler: at most
+    max_concurrency requests are in flight across the pool, slots rotate between tenants
+    with pending work, and each tenant is held to its TenantQuota (concurrency and rate).
+
+    Usage:
+        pool = PluggyClientPool(max_concurrency=16)
+        pool.add_tenant("acme", ACME_ID, ACME_SECRET, TenantQuota(max_concurrency=4))
+        accounts = pool.client("acme").accounts.list_all_accounts(item_id)
+        print(pool.stats()["acme"])
+    """
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        max_concurrency: int = 16,
+        default_quota: Optional[TenantQuota] = None,
+        http_client: Optional[HttpClient] = None,
+    ):
+        self.base_url = base_url
+        self.default_quota = default_quota or TenantQuota()
+        self._http = http_client or HttpClient(base_url, pool_maxsize=max_concurrency, thread_safe=True)
+        self._scheduler = _FairScheduler(max_concurrency)
+        self._tenants: Dict[str, _Tenant] = {}
+        self._lock = threading.Lock()
+
+    def add_tenant(
+        self,
+        tenant_id: str,
+        client_id: str,
+        client_secret: str,
+        quota: Optional[TenantQuota] = None,
+        **client_options,
+    ) -> PluggyClient:
+        """
+        Registers a tenant and returns its (not yet authenticated) PluggyClient.
+        Extra keyword arguments (e.g. entity_cache) are passed to PluggyClient. An
+        entity_cache shared between tenants is scoped by each tenant's client_id.
+        """
+        with self._lock:
+            if tenant_id in self._tenants:
+                raise ValueError(f"Tenant '{tenant_id}' is already registered")
+            tenant = _Tenant(tenant_id, quota or self.default_quota)
+            tenant.client = PluggyClient(
+                client_id,
+                client_secret,
+                base_url=self.base_url,
+                http_client=_TenantHttpClient(self._http, tenant, self._scheduler),
+                **client_options,
+            )
+            self._tenants[tenant_id] = tenant
+            self._scheduler.register(tenant)
+        return tenant.client
+
+    def remove_tenant(self, tenant_id: str) -> None:
+        """
+        Unregisters a tenant. Its requests still waiting for a slot raise
+        TenantRemovedError; requests already in flight complete normally.
+        """
+        with self._lock:
+            tenant = self._tenants.pop(tenant_id)
+            self._scheduler.unregister(tenant)
+
+    def client(self, tenant_id: str) -> PluggyClient:
+        """Returns the tenant's PluggyClient, authenticating it on first use."""
+        tenant = self._tenants[tenant_id]
+        with tenant.auth_lock:
+            if tenant.client.api_key is None:
+                tenant.client.authenticate()
+        return tenant.client
+
+    def __getitem__(self, tenant_id: str) -> PluggyClient:
+        return self.client(tenant_id)
+
+    @property
+    def tenant_ids(self) -> List[str]:
+        return list(self._tenants)
+
+    def stats(self) -> Dict[str, TenantUsage]:
+        """Per-tenant usage snapshot."""
+        with self._scheduler._cond:
+            return {tid: tenant.usage.model_copy() for tid, tenant in self._tenants.items()}
@@ -1 +1,4 @@
 BASE_URL = "https://api.pluggy.ai"
+
+# Largest pageSize accepted by Pluggy's list endpoints
+MAX_PAGE_SIZE = 500
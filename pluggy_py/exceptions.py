@@ -33,3 +33,34 @@ class ConflictError(GlobalErrorResponse):
 class InternalServerError(GlobalErrorResponse):
     """Raised when HTTP 500 occurs."""
     pass
+
+class CircuitOpenError(PluggyAPIError):
+    """
+    Raised without contacting the API when the circuit breaker for an endpoint family
+    (e.g. /investments) is open after repeated upstream failures.
+    """
+    def __init__(self, endpoint: str, retry_after: float):
+        super().__init__(
+            f"Circuit open for '{endpoint}' after repeated failures; retry in {retry_after:.1f}s"
+        )
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+class PipelineError(Exception):
+    """
+    Raised by PagePipeline.run() with the first exception raised while fetching pages
+    (stage "fetch") or inside a consumer callback (stage "consume").
+    """
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"Pipeline {stage} failed: {error!r}")
+        self.stage = stage
+        self.error = error
+
+class TenantRemovedError(Exception):
+    """
+    Raised for requests of a PluggyClientPool tenant that was removed while they were
+    waiting for a slot, or that were issued after its removal.
+    """
+    def __init__(self, tenant_id: str):
+        super().__init__(f"Tenant '{tenant_id}' was removed from the pool")
+        self.tenant_id = tenant_id
@@ -101,6 +101,15 @@ class PageResponseTransactions(BaseModel):
     results: List[Transaction] = Field(..., description="List of retrieved transactions")
 
 
+class BatchTransactionsResult(BaseModel):
+    """
+    Returned by TransactionsResource.retrieve_transactions:
+    transactions in the order their ids were requested, plus the ids that were not found.
+    """
+    results: List[Transaction] = Field(..., description="Transactions found, in input order")
+    missing: List[str] = Field(default_factory=list, description="Requested ids not returned by the API")
+
+
 class UpdateTransaction(BaseModel):
     """
     Model for PATCH /transactions/{id} to update the transaction category.
@@ -1,4 +1,4 @@
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -36,3 +36,20 @@ class PageResponseWebhooks(BaseModel):
     total: int
     totalPages: int
     results: List[Webhook] = Field(..., description="List of Webhooks")
+
+class WebhookEvent(BaseModel):
+    """
+    Payload Pluggy POSTs to a registered webhook URL, e.g.
+    {
+      "event": "item/updated",
+      "eventId": "...",
+      "itemId": "...",
+      "triggeredBy": "CLIENT"
+    }
+    """
+    event: str = Field(..., description="Event name, e.g. 'item/updated', 'item/error', etc.")
+    eventId: Optional[str] = Field(None, description="Unique identifier of this notification")
+    itemId: Optional[str] = Field(None, description="Item the event refers to, if any")
+    clientUserId: Optional[str] = Field(None, description="Client user reference attached to the item")
+    triggeredBy: Optional[str] = Field(None, description="Who triggered the event (CLIENT, USER, SYNC, INTERNAL)")
+    error: Optional[Dict[str, Any]] = Field(None, description="Error details for error events")
@@ -1,10 +1,15 @@
 from typing import Optional, List
 from pluggy_py.models.accounts import Account, PageResponseAccounts
+from pluggy_py.utils.entity_cache import EntityCache
+from pluggy_py.utils.pagination import PagedResult, iter_pages
+from pluggy_py.utils.deadline import Deadline
+from pluggy_py.utils.profiling import parse_model
 
 class AccountsResource:
-    def __init__(self, http_client, api_key: str):
+    def __init__(self, http_client, api_key: str, cache: Optional[EntityCache] = None):
         self._http = http_client
         self._api_key = api_key
+        self._cache = cache
 
     def list_accounts(
         self,
@@ -22,47 +27,51 @@ class AccountsResource:
             params["type"] = account_type
         resp = self._http.get("/accounts", params=params, headers=headers)
         data = resp.json()
-        return PageResponseAccounts(**data)
+        return parse_model(PageResponseAccounts, data)
 
     def retrieve_account(self, account_id: str) -> Account:
         """
         Existing method to retrieve a single account by ID.
+        Served from the entity cache, when one is configured, until the item is updated.
         """
+        if self._cache is not None:
+            cached = self._cache.get("accounts", account_id)
+            if cached is not None:
+                return cached
+
         headers = {"X-API-KEY": self._api_key}
         resp = self._http.get(f"/accounts/{account_id}", headers=headers)
         data = resp.json()
-        return Account(**data)
+        account = parse_model(Account, data)
+        if self._cache is not None:
+            self._cache.set("accounts", account_id, account, item_id=account.itemId, account_id=account_id)
+        return account
 
     def list_all_accounts(
         self,
         item_id: str,
         account_type: Optional[str] = None,
-        page_size: int = 50
-    ) -> List[Account]:
+        page_size: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        resume_token: Optional[str] = None,
+    ) -> PagedResult[Account]:
         """
         Method that returns ALL accounts from all pages, looping internally until
-        totalPages is reached.
+        totalPages is reached. Leave page_size as None to let the page size adapt
+        to observed latency.
         """
         headers = {"X-API-KEY": self._api_key}
         all_accounts: List[Account] = []
 
-        page = 1
-        while True:
-            # Fetch one page
-            params = {"itemId": item_id, "page": page, "pageSize": page_size}
-            if account_type:
-                params["type"] = account_type
-
-            resp = self._http.get("/accounts", params=params, headers=headers)
-            data = resp.json()
-            page_response = PageResponseAccounts(**data)
+        params = {"itemId": item_id}
+        if account_type:
+            params["type"] = account_type
 
-            # Add the results to our all_accounts list
+        pages = iter_pages(
+            self._http, "/accounts", params, headers, PageResponseAccounts, page_size,
+            deadline=deadline, resume_token=resume_token,
+        )
+        for page_response in pages:
             all_accounts.extend(page_response.results)
 
-            # Check if we've reached the last page
-            if page >= page_response.totalPages:
-                break
-            page += 1
-
-        return all_accounts
+        return pages.result(all_accounts)
@@ -1,5 +1,6 @@
 from pluggy_py.models.auth import AuthRequest, AuthResponse
 from pluggy_py.utils.http_client import HttpClient
+from pluggy_py.utils.profiling import parse_model
 from requests import Response
 
 
@@ -28,4 +29,4 @@ class AuthResource:
         response: Response = self._http_client.post(
             "/auth", json=auth_request.dict(exclude_none=True)
         )
-        return AuthResponse(**response.json())
+        return parse_model(AuthResponse, response.json())
@@ -1,7 +1,10 @@
-from typing import List
+from typing import List, Optional
 from pluggy_py.models.benefits import Benefit, PageResponseBenefits
 from pluggy_py.utils.http_client import HttpClient
 from pluggy_py.exceptions import PluggyAPIError
+from pluggy_py.utils.pagination import PagedResult, iter_pages
+from pluggy_py.utils.deadline import Deadline
+from pluggy_py.utils.profiling import parse_model
 
 class BenefitsResource:
     """
@@ -28,33 +31,31 @@ class BenefitsResource:
         params = {"itemId": item_id, "page": page, "pageSize": page_size}
 
         response = self._http.get("/benefits", params=params, headers=headers)
-        return PageResponseBenefits(**response.json())
+        return parse_model(PageResponseBenefits, response.json())
 
     def list_all_benefits(
         self, 
         item_id: str, 
-        page_size: int = 50
-    ) -> List[Benefit]:
+        page_size: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        resume_token: Optional[str] = None,
+    ) -> PagedResult[Benefit]:
         """
         Fetches *all* benefits by paging internally until the last page is reached.
-        Returns a list of Benefit objects.
+        Returns a list of Benefit objects. page_size=None adapts the page size.
         """
         headers = {"X-API-KEY": self._api_key}
         all_benefits: List[Benefit] = []
-        page = 1
+        params = {"itemId": item_id}
 
-        while True:
-            params = {"itemId": item_id, "page": page, "pageSize": page_size}
-            response = self._http.get("/benefits", params=params, headers=headers)
-            page_response = PageResponseBenefits(**response.json())
+        pages = iter_pages(
+            self._http, "/benefits", params, headers, PageResponseBenefits, page_size,
+            deadline=deadline, resume_token=resume_token,
+        )
+        for page_response in pages:
             all_benefits.extend(page_response.results)
 
-            if page >= page_response.totalPages:
-                break
-
-            page += 1
-
-        return all_benefits
+        return pages.result(all_benefits)
 
     def retrieve_benefit(self, benefit_id: str) -> Benefit:
         """
@@ -63,4 +64,4 @@ class BenefitsResource:
         """
         headers = {"X-API-KEY": self._api_key}
         response = self._http.get(f"/benefits/{benefit_id}", headers=headers)
-        return Benefit(**response.json())
+        return parse_model(Benefit, response.json())
@@ -2,6 +2,10 @@ from typing import Optional, List
 from requests import Response
 from pluggy_py.utils.http_client import HttpClient
 from pluggy_py.models.bills import Bill, PageResponseBills
+from pluggy_py.utils.entity_cache import EntityCache
+from pluggy_py.utils.pagination import PagedResult, iter_pages
+from pluggy_py.utils.deadline import Deadline
+from pluggy_py.utils.profiling import parse_model
 
 class BillsResource:
     """
@@ -11,9 +15,10 @@ class BillsResource:
       - List ALL bills (list_all_bills).
     """
 
-    def __init__(self, http_client: HttpClient, api_key: str):
+    def __init__(self, http_client: HttpClient, api_key: str, cache: Optional[EntityCache] = None):
         self._http_client = http_client
         self._api_key = api_key
+        self._cache = cache
 
     def list_bills(
         self,
@@ -34,40 +39,47 @@ class BillsResource:
             params["pageSize"] = page_size
 
         response: Response = self._http_client.get("/bills", params=params, headers=headers)
-        return PageResponseBills(**response.json())
+        return parse_model(PageResponseBills, response.json())
 
     def retrieve_bill(self, bill_id: str) -> Bill:
         """
         GET /bills/{id}
         Retrieve a single bill by its primary identifier.
+        Bills carry no itemId, so cached bills are dropped with their account's item
+        only once that account has been seen by the cache (or via invalidate_account).
         """
+        if self._cache is not None:
+            cached = self._cache.get("bills", bill_id)
+            if cached is not None:
+                return cached
+
         headers = {"X-API-KEY": self._api_key}
         response: Response = self._http_client.get(f"/bills/{bill_id}", headers=headers)
-        return Bill(**response.json())
+        bill = parse_model(Bill, response.json())
+        if self._cache is not None:
+            self._cache.set("bills", bill_id, bill, account_id=bill.accountId)
+        return bill
 
     def list_all_bills(
         self,
         account_id: str,
-        page_size: int = 50,
-    ) -> List[Bill]:
+        page_size: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        resume_token: Optional[str] = None,
+    ) -> PagedResult[Bill]:
         """
         Returns ALL bills for the given account_id, by paging internally 
-        until the last page is reached.
+        until the last page is reached. page_size=None adapts the page size.
         """
         all_bills: List[Bill] = []
-        page = 1
-
-        while True:
-            params = {"accountId": account_id, "page": page, "pageSize": page_size}
-            headers = {"X-API-KEY": self._api_key}
-            resp: Response = self._http_client.get("/bills", params=params, headers=headers)
-            page_data = PageResponseBills(**resp.json())
+        params = {"accountId": account_id}
+        headers = {"X-API-KEY": self._api_key}
 
+        pages = iter_pages(
+            self._http_client, "/bills", params, headers, PageResponseBills, page_size,
+            deadline=deadline, resume_token=resume_token,
+        )
+        for page_data in pages:
             all_bills.extend(page_data.results)
 
-            if page >= page_data.totalPages:
-                break
-
-            page += 1
-
-        return all_bills
+        return pages.result(all_bills)
@@ -1,6 +1,8 @@
 from requests import Response
 from typing import Optional, List
 from pluggy_py.utils.http_client import HttpClient
+from pluggy_py.utils.pagination import PagedResult, iter_pages
+from pluggy_py.utils.deadline import Deadline
 from pluggy_py.models.categories import (
     Category,
     PageResponseCategories,
@@ -8,6 +10,7 @@ from pluggy_py.models.categories import (
     PageResponseCategoryRules,
     CreateClientCategoryRule,
 )
+from pluggy_py.utils.profiling import parse_model
 
 class CategoriesResource:
     """
@@ -39,36 +42,33 @@ class CategoriesResource:
             params["parentId"] = parent_id
 
         response: Response = self._http.get("/categories", params=params, headers=headers)
-        return PageResponseCategories(**response.json())
+        return parse_model(PageResponseCategories, response.json())
 
     def list_all_categories(
         self, 
         parent_id: Optional[str] = None, 
-        page_size: int = 50
-    ) -> List[Category]:
+        page_size: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        resume_token: Optional[str] = None,
+    ) -> PagedResult[Category]:
         """
         Fetches *all* categories by paging internally until the last page is reached.
-        Returns a list of Category objects.
+        Returns a list of Category objects. page_size=None adapts the page size.
         """
         headers = {"X-API-KEY": self._api_key}
         all_categories: List[Category] = []
-        page = 1
-
-        while True:
-            params = {"page": page, "pageSize": page_size}
-            if parent_id:
-                params["parentId"] = parent_id
+        params = {}
+        if parent_id:
+            params["parentId"] = parent_id
 
-            response: Response = self._http.get("/categories", params=params, headers=headers)
-            page_response = PageResponseCategories(**response.json())
+        pages = iter_pages(
+            self._http, "/categories", params, headers, PageResponseCategories, page_size,
+            deadline=deadline, resume_token=resume_token,
+        )
+        for page_response in pages:
             all_categories.extend(page_response.results)
 
-            if page >= page_response.totalPages:
-                break
-
-            page += 1
-
-        return all_categories
+        return pages.result(all_categories)
 
     def retrieve_category(self, category_id: str) -> Category:
         """
@@ -77,7 +77,7 @@ class CategoriesResource:
         """
         headers = {"X-API-KEY": self._api_key}
         response: Response = self._http.get(f"/categories/{category_id}", headers=headers)
-        return Category(**response.json())
+        return parse_model(Category, response.json())
 
     def list_category_rules(self) -> PageResponseCategoryRules:
         """
@@ -86,7 +86,7 @@ class CategoriesResource:
         """
         headers = {"X-API-KEY": self._api_key}
         response: Response = self._http.get("/categories/rules", headers=headers)
-        return PageResponseCategoryRules(**response.json())
+        return parse_model(PageResponseCategoryRules, response.json())
 
     def create_category_rule(self, rule_data: CreateClientCategoryRule) -> ClientCategoryRule:
         """
@@ -99,4 +99,4 @@ class CategoriesResource:
             json=rule_data.dict(exclude_none=True),
             headers=headers
         )
-        return ClientCategoryRule(**response.json())
+        return parse_model(ClientCategoryRule, response.json())
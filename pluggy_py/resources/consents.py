@@ -1,7 +1,10 @@
 from requests import Response
 from typing import Optional, List
 from pluggy_py.utils.http_client import HttpClient
+from pluggy_py.utils.pagination import PagedResult, iter_pages
+from pluggy_py.utils.deadline import Deadline
 from pluggy_py.models.consents import PageResponseConsents, Consent
+from pluggy_py.utils.profiling import parse_model
 
 class ConsentsResource:
     """
@@ -22,29 +25,31 @@ class ConsentsResource:
         headers = {"X-API-KEY": self._api_key}
         params = {"itemId": item_id, "page": page, "pageSize": page_size}
         response: Response = self._http.get("/consents", params=params, headers=headers)
-        return PageResponseConsents(**response.json())
-
-    def list_all_consents(self, item_id: str, page_size: int = 50) -> List[Consent]:
+        return parse_model(PageResponseConsents, response.json())
+
+    def list_all_consents(
+        self,
+        item_id: str,
+        page_size: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        resume_token: Optional[str] = None,
+    ) -> PagedResult[Consent]:
         """
         Fetches *all* consents by paging internally until the last page is reached.
-        Returns a list of Consent objects.
+        Returns a list of Consent objects. page_size=None adapts the page size.
         """
         headers = {"X-API-KEY": self._api_key}
         all_consents: List[Consent] = []
-        page = 1
+        params = {"itemId": item_id}
 
-        while True:
-            params = {"itemId": item_id, "page": page, "pageSize": page_size}
-            response: Response = self._http.get("/consents", params=params, headers=headers)
-            page_response = PageResponseConsents(**response.json())
+        pages = iter_pages(
+            self._http, "/consents", params, headers, PageResponseConsents, page_size,
+            deadline=deadline, resume_token=resume_token,
+        )
+        for page_response in pages:
             all_consents.extend(page_response.results)
 
-            if page >= page_response.totalPages:
-                break
-
-            page += 1
-
-        return all_consents
+        return pages.result(all_consents)
 
     def retrieve_consent(self, consent_id: str) -> Consent:
         """
@@ -53,5 +58,5 @@ class ConsentsResource:
         """
         headers = {"X-API-KEY": self._api_key}
         response: Response = self._http.get(f"/consents/{consent_id}", headers=headers)
-        return Consent(**response.json())
+        return parse_model(Consent, response.json())
 
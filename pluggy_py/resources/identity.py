@@ -2,6 +2,8 @@ from typing import Optional
 from requests import Response
 from pluggy_py.utils.http_client import HttpClient
 from pluggy_py.models.identity import Identity
+from pluggy_py.utils.entity_cache import EntityCache
+from pluggy_py.utils.profiling import parse_model
 
 class IdentityResource:
     """
@@ -10,25 +12,42 @@ class IdentityResource:
       - GET /identity/{id}
     """
 
-    def __init__(self, http_client: HttpClient, api_key: str):
+    def __init__(self, http_client: HttpClient, api_key: str, cache: Optional[EntityCache] = None):
         self._http = http_client
         self._api_key = api_key
+        self._cache = cache
 
     def find_by_item(self, item_id: str) -> Identity:
         """
         GET /identity?itemId={item_id}
         Recovers the identity of an item if available.
         """
+        if self._cache is not None:
+            cached = self._cache.get("identity_by_item", item_id)
+            if cached is not None:
+                return cached
+
         headers = {"X-API-KEY": self._api_key}
         params = {"itemId": item_id}
         response: Response = self._http.get("/identity", params=params, headers=headers)
-        return Identity(**response.json())
+        identity = parse_model(Identity, response.json())
+        if self._cache is not None:
+            self._cache.set("identity_by_item", item_id, identity, item_id=item_id)
+        return identity
 
     def retrieve_identity(self, identity_id: str) -> Identity:
         """
         GET /identity/{id}
         Recovers the identity resource by its id.
         """
+        if self._cache is not None:
+            cached = self._cache.get("identity", identity_id)
+            if cached is not None:
+                return cached
+
         headers = {"X-API-KEY": self._api_key}
         response: Response = self._http.get(f"/identity/{identity_id}", headers=headers)
-        return Identity(**response.json())
+        identity = parse_model(Identity, response.json())
+        if self._cache is not None:
+            self._cache.set("identity", identity_id, identity, item_id=identity.itemId)
+        return identity
@@ -2,11 +2,15 @@ from typing import Optional, List
 from requests import Response
 
 from pluggy_py.utils.http_client import HttpClient
+from pluggy_py.utils.pagination import PagedResult, iter_pages
+from pluggy_py.utils.deadline import Deadline
 from pluggy_py.models.investments import (
     Investment,
+    InvestmentTransaction,
     PageResponseInvestments,
     PageResponseInvestmentTransactions
 )
+from pluggy_py.utils.profiling import parse_model
 
 
 class InvestmentsResource:
@@ -16,6 +20,7 @@ class InvestmentsResource:
       - Retrieve a single investment by ID (GET /investments/{id})
       - List all transactions for a given investment (GET /investments/{id}/transactions)
       - NEW: list_all_investments to fetch all pages internally.
+      - NEW: list_all_investment_transactions to fetch all pages of an investment's transactions.
     """
 
     def __init__(self, http_client: HttpClient, api_key: str):
@@ -34,10 +39,8 @@ class InvestmentsResource:
         Returns a single page of investments for the given query parameters.
         """
         headers = {"X-API-KEY": self._api_key}
-        params = {"itemId": item_id}
+        params = self._investment_params(item_id, type)
 
-        if type:
-            params["type"] = type
         if page_size is not None:
             params["pageSize"] = page_size
         if page is not None:
@@ -45,7 +48,7 @@ class InvestmentsResource:
 
         # _http.get now raises if non-2xx, so we do not need try/except or raise_for_status().
         response: Response = self._http_client.get("/investments", params=params, headers=headers)
-        return PageResponseInvestments(**response.json())
+        return parse_model(PageResponseInvestments, response.json())
 
     def retrieve_investment(self, investment_id: str) -> Investment:
         """
@@ -54,7 +57,7 @@ class InvestmentsResource:
         """
         headers = {"X-API-KEY": self._api_key}
         response: Response = self._http_client.get(f"/investments/{investment_id}", headers=headers)
-        return Investment(**response.json())
+        return parse_model(Investment, response.json())
 
     def list_investment_transactions(
         self,
@@ -78,34 +81,64 @@ class InvestmentsResource:
             params=params,
             headers=headers
         )
-        return PageResponseInvestmentTransactions(**response.json())
+        return parse_model(PageResponseInvestmentTransactions, response.json())
 
     def list_all_investments(
         self,
         item_id: str,
         type: Optional[str] = None,
-        page_size: int = 50
-    ) -> List[Investment]:
+        page_size: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        resume_token: Optional[str] = None,
+    ) -> PagedResult[Investment]:
         """
         NEW METHOD:
         Fetches all investments for the given itemId (and optional type) by paging
         internally until the last page is reached. Returns a list of Investment objects.
+        page_size=None adapts the page size.
         """
+        headers = {"X-API-KEY": self._api_key}
         all_investments: List[Investment] = []
-        page = 1
-
-        while True:
-            page_response = self.list_investments(
-                item_id=item_id,
-                type=type,
-                page_size=page_size,
-                page=page,
-            )
+        params = self._investment_params(item_id, type)
+
+        pages = iter_pages(
+            self._http_client, "/investments", params, headers, PageResponseInvestments, page_size,
+            deadline=deadline, resume_token=resume_token,
+        )
+        for page_response in pages:
             all_investments.extend(page_response.results)
 
-            if page >= page_response.totalPages:
-                break
-            page += 1
+        return pages.result(all_investments)
+
+    def list_all_investment_transactions(
+        self,
+        investment_id: str,
+        page_size: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        resume_token: Optional[str] = None,
+    ) -> PagedResult[InvestmentTransaction]:
+        """
+        Fetches every transaction of one investment by paging internally until the last
+        page is reached. page_size=None adapts the page size (tuned once for all
+        investments).
+        """
+        headers = {"X-API-KEY": self._api_key}
+        all_transactions: List[InvestmentTransaction] = []
+
+        pages = iter_pages(
+            self._http_client, f"/investments/{investment_id}/transactions", {}, headers,
+            PageResponseInvestmentTransactions, page_size,
+            endpoint="/investments/{id}/transactions", deadline=deadline, resume_token=resume_token,
+        )
+        for page_response in pages:
+            all_transactions.extend(page_response.results)
+
+        return pages.result(all_transactions)
 
-        return all_investments
+    @staticmethod
+    def _investment_params(item_id: str, type: Optional[str]) -> dict:
+        params = {"itemId": item_id}
+        if type:
+            params["type"] = type
+        return params
 
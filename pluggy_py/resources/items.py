@@ -1,15 +1,17 @@
 import os
 import sys
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from requests import Response
 
 from pluggy_py.utils.http_client import HttpClient
+from pluggy_py.utils.entity_cache import EntityCache
 from pluggy_py.models.items import (
     CreateItemRequest,
     UpdateItemRequest,
     Item,
     ICountResponse,
 )
+from pluggy_py.utils.profiling import parse_model
 
 class ItemsResource:
     """
@@ -21,13 +23,15 @@ class ItemsResource:
       - Send MFA (POST /items/{id}/mfa)
     """
 
-    def __init__(self, http_client: HttpClient, api_key: str):
+    def __init__(self, http_client: HttpClient, api_key: str, cache: Optional[EntityCache] = None):
         """
         :param http_client: An HttpClient instance for making requests
         :param api_key: The API key obtained via authentication
+        :param cache: Optional EntityCache serving retrieve_item between item updates
         """
         self.http_client = http_client
         self.api_key = api_key
+        self.cache = cache
 
     def create_item(self, create_data: CreateItemRequest) -> Item:
         """
@@ -41,19 +45,27 @@ class ItemsResource:
             headers=headers,
         )
         # Let the _http client handle exceptions if the response is not 2xx.
-        return Item(**response.json())
+        return parse_model(Item, response.json())
 
     def retrieve_item(self, item_id: str) -> Item:
         """
         GET /items/{id}
         Retrieves the item resource by its ID.
         """
+        if self.cache is not None:
+            cached = self.cache.get("items", item_id)
+            if cached is not None:
+                return cached
+
         headers = {"X-API-KEY": self.api_key}
         response: Response = self.http_client.get(
             f"/items/{item_id}",
             headers=headers,
         )
-        return Item(**response.json())
+        item = parse_model(Item, response.json())
+        if self.cache is not None:
+            self.cache.set("items", item_id, item, item_id=item_id)
+        return item
 
     def retrieve_yaml_items(self, yaml_path: str = None) -> list[dict[str, str]]:
         """
@@ -92,7 +104,9 @@ class ItemsResource:
             json=update_data.dict(exclude_none=True),
             headers=headers,
         )
-        return Item(**response.json())
+        if self.cache is not None:
+            self.cache.invalidate_item(item_id)
+        return parse_model(Item, response.json())
 
     def delete_item(self, item_id: str) -> ICountResponse:
         """
@@ -105,7 +119,9 @@ class ItemsResource:
             f"/items/{item_id}",
             headers=headers,
         )
-        return ICountResponse(**response.json())
+        if self.cache is not None:
+            self.cache.invalidate_item(item_id)
+        return parse_model(ICountResponse, response.json())
 
     def send_mfa(self, item_id: str, mfa_values: Dict[str, Any]) -> Item:
         """
@@ -118,4 +134,6 @@ class ItemsResource:
             json=mfa_values,
             headers=headers,
         )
-        return Item(**response.json())
+        if self.cache is not None:
+            self.cache.invalidate_item(item_id)
+        return parse_model(Item, response.json())
@@ -2,6 +2,10 @@ from typing import Optional, List
 from requests import Response
 from pluggy_py.utils.http_client import HttpClient
 from pluggy_py.models.loans import Loan, PageResponseLoans
+from pluggy_py.utils.entity_cache import EntityCache
+from pluggy_py.utils.pagination import PagedResult, iter_pages
+from pluggy_py.utils.deadline import Deadline
+from pluggy_py.utils.profiling import parse_model
 
 class LoansResource:
     """
@@ -11,9 +15,10 @@ class LoansResource:
       - List ALL loans across multiple pages (list_all_loans).
     """
 
-    def __init__(self, http_client: HttpClient, api_key: str):
+    def __init__(self, http_client: HttpClient, api_key: str, cache: Optional[EntityCache] = None):
         self._http_client = http_client
         self._api_key = api_key
+        self._cache = cache
 
     def list_loans(
         self,
@@ -34,40 +39,46 @@ class LoansResource:
 
         # No need for a try/except here; _http_client.get() will raise on non-2xx
         resp: Response = self._http_client.get("/loans", params=params, headers=headers)
-        return PageResponseLoans(**resp.json())
+        return parse_model(PageResponseLoans, resp.json())
 
     def retrieve_loan(self, loan_id: str) -> Loan:
         """
         GET /loans/{id}
         Retrieve a single loan by its primary identifier.
         """
+        if self._cache is not None:
+            cached = self._cache.get("loans", loan_id)
+            if cached is not None:
+                return cached
+
         headers = {"X-API-KEY": self._api_key}
         resp: Response = self._http_client.get(f"/loans/{loan_id}", headers=headers)
-        return Loan(**resp.json())
+        loan = parse_model(Loan, resp.json())
+        if self._cache is not None:
+            self._cache.set("loans", loan_id, loan, item_id=loan.itemId)
+        return loan
 
     def list_all_loans(
         self,
         item_id: str,
-        page_size: int = 50
-    ) -> List[Loan]:
+        page_size: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        resume_token: Optional[str] = None,
+    ) -> PagedResult[Loan]:
         """
         Returns ALL loans for the given item_id, by paging internally until the last page.
+        page_size=None adapts the page size.
         """
         headers = {"X-API-KEY": self._api_key}
         all_loans: List[Loan] = []
-        page = 1
-
-        while True:
-            params = {"itemId": item_id, "page": page, "pageSize": page_size}
-            resp: Response = self._http_client.get("/loans", params=params, headers=headers)
-            page_data = PageResponseLoans(**resp.json())
+        params = {"itemId": item_id}
 
+        pages = iter_pages(
+            self._http_client, "/loans", params, headers, PageResponseLoans, page_size,
+            deadline=deadline, resume_token=resume_token,
+        )
+        for page_data in pages:
             all_loans.extend(page_data.results)
 
-            if page >= page_data.totalPages:
-                break
-
-            page += 1
-
-        return all_loans
+        return pages.result(all_loans)
 
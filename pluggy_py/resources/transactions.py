@@ -1,8 +1,31 @@
-from typing import Optional, List
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Dict, Optional, List, Iterator, Set, Tuple
 from requests import Response
 from pluggy_py.utils.http_client import HttpClient
 from pluggy_py.exceptions import PluggyAPIError
-from pluggy_py.models.transactions import Transaction, PageResponseTransactions, UpdateTransaction
+from pluggy_py.utils.batching import chunk_ids, map_concurrently, unique_ids
+from pluggy_py.utils.date_windows import DateWindow, month_windows, merge_windows_by_density
+from pluggy_py.utils.pagination import (
+    PagedResult,
+    iter_pages,
+    query_fingerprint,
+    encode_resume_token,
+    decode_resume_token,
+)
+from pluggy_py.utils.deadline import Deadline
+from pluggy_py.utils.checkpoints import CheckpointStore
+from pluggy_py.utils.pipeline import PagePipeline, PipelineStats
+from pluggy_py.analytics.aggregates import MonthlyAggregates
+from pluggy_py.storage.disk_store import DiskTransactionStore
+from pluggy_py.models.transactions import (
+    Transaction,
+    PageResponseTransactions,
+    UpdateTransaction,
+    BatchTransactionsResult,
+)
+from pluggy_py.utils.profiling import parse_model
 
 class TransactionsResource:
     """
@@ -11,11 +34,18 @@ class TransactionsResource:
       - GET /transactions/{id}
       - PATCH /transactions/{id}
       - NEW: list_all_transactions to fetch all pages at once.
+      - NEW: retrieve_transactions to fetch many known ids through the ids filter.
+      - NEW: backfill_transactions / iter_backfill_transactions to fetch long date
+        ranges as parallel date windows.
+      - NEW: process_all_transactions to hand pages to callbacks while the next
+        pages are being fetched.
+      - NEW: sync_transactions to write pages straight into a DiskTransactionStore.
     """
 
-    def __init__(self, http_client: HttpClient, api_key: str):
+    def __init__(self, http_client: HttpClient, api_key: str, aggregates: Optional[MonthlyAggregates] = None):
         self._http_client = http_client
         self._api_key = api_key
+        self._aggregates = aggregates
 
     def list_transactions(
         self,
@@ -33,25 +63,18 @@ class TransactionsResource:
         GET /transactions?accountId=xxx
         """
         headers = {"X-API-KEY": self._api_key}
-        params = {"accountId": account_id}
+        params = self._transaction_params(account_id, ids, from_date, to_date, bill_id, created_at_from)
 
-        if ids:
-            params["ids"] = ",".join(ids)
-        if from_date:
-            params["from"] = from_date
-        if to_date:
-            params["to"] = to_date
         if page_size:
             params["pageSize"] = page_size
         if page:
             params["page"] = page
-        if bill_id:
-            params["billId"] = bill_id
-        if created_at_from:
-            params["createdAtFrom"] = created_at_from
 
         response: Response = self._http_client.get("/transactions", params=params, headers=headers)
-        return PageResponseTransactions(**response.json())
+        page_response = parse_model(PageResponseTransactions, response.json())
+        if self._aggregates is not None:
+            self._aggregates.apply(page_response.results)
+        return page_response
 
     def list_all_transactions(
         self,
@@ -61,35 +84,311 @@ class TransactionsResource:
         to_date: Optional[str] = None,
         bill_id: Optional[str] = None,
         created_at_from: Optional[str] = None,
-        page_size: int = 50,
-    ) -> List[Transaction]:
+        page_size: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        resume_token: Optional[str] = None,
+    ) -> PagedResult[Transaction]:
         """
         Fetches *all* transactions by paging internally until the last page is reached.
-        Returns a list of Transaction objects.
+        Returns a list of Transaction objects. page_size=None adapts the page size.
         """
+        headers = {"X-API-KEY": self._api_key}
         all_transactions: List[Transaction] = []
-        page = 1
+        params = self._transaction_params(account_id, ids, from_date, to_date, bill_id, created_at_from)
+
+        pages = iter_pages(
+            self._http_client, "/transactions", params, headers, PageResponseTransactions, page_size,
+            deadline=deadline, resume_token=resume_token,
+        )
+        for page_response in pages:
+            all_transactions.extend(page_response.results)
+            if self._aggregates is not None:
+                self._aggregates.apply(page_response.results)
+
+        return pages.result(all_transactions)
+
+    def process_all_transactions(
+        self,
+        account_ids: List[str],
+        consumer: Callable[[List[Transaction]], None],
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        consumers: int = 1,
+        max_pending_pages: int = 4,
+        fetchers: int = 4,
+        page_size: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        resume_tokens: Optional[Dict[str, str]] = None,
+    ) -> PipelineStats:
+        """
+        Streams every transaction of the given accounts through `consumer`, one page
+        (a list of Transaction) per call, via a PagePipeline: pages are fetched in the
+        background (one walk per account, up to `fetchers` accounts at once) while
+        `consumers` threads process earlier ones. At most max_pending_pages pages are
+        held in memory; fetching pauses while consumers catch up.
+        Raises PipelineError if a request or the consumer fails.
+
+        With a deadline, accounts not fully fetched before it expired are listed in
+        stats.resume_tokens (account id -> token). To continue, call again with
+        account_ids=list(stats.resume_tokens) and resume_tokens=stats.resume_tokens.
+        """
+        headers = {"X-API-KEY": self._api_key}
+        resume_tokens = resume_tokens or {}
+        if self._aggregates is not None:
+            aggregates, deliver = self._aggregates, consumer
+
+            def consumer(page: List[Transaction]) -> None:
+                aggregates.apply(page)
+                deliver(page)
+
+        walks = {
+            account_id: iter_pages(
+                self._http_client,
+                "/transactions",
+                self._transaction_params(account_id, None, from_date, to_date, None, None),
+                headers,
+                PageResponseTransactions,
+                page_size,
+                deadline=deadline,
+                resume_token=resume_tokens.get(account_id),
+            )
+            for account_id in dict.fromkeys(account_ids)
+        }
+        pipeline = PagePipeline(consumer, consumers=consumers, max_pending=max_pending_pages, fetchers=fetchers)
+        return pipeline.run(walks)
+
+    def sync_transactions(
+        self,
+        account_id: str,
+        store: DiskTransactionStore,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        page_size: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        buffer_rows: int = 10_000,
+    ) -> PagedResult:
+        """
+        Writes the account's transactions into `store` without keeping the whole
+        listing in memory: pages are buffered up to `buffer_rows` rows, each buffer is
+        staged in the store as a sorted run, and the runs are appended oldest-first
+        once the walk ends, so pages arriving newest-first are not merged into the
+        columns over and over.
+
+        By default only transactions from the day of the newest row stored by the last
+        complete sync are fetched; rows already stored for that day are replaced, not
+        duplicated. An interrupted sync does not advance that mark, so it never leaves
+        a gap. With a checkpoint_store, progress is checkpointed each time a buffer is
+        staged, and a sync interrupted by a crash continues after the last staged page.
+        Returns an empty PagedResult carrying the walk's complete/resume_token.
+        """
+        if from_date is None:
+            synced = store.synced_through(account_id)
+            from_date = synced.date().isoformat() if synced is not None else None
+
+        headers = {"X-API-KEY": self._api_key}
+        params = self._transaction_params(account_id, None, from_date, to_date, None, None)
+        pages = iter_pages(
+            self._http_client, "/transactions", params, headers, PageResponseTransactions, page_size,
+            deadline=deadline, checkpoint_store=checkpoint_store, checkpoint_each_page=False,
+        )
+        if not pages.resumed:
+            store.discard_staged(account_id, pages.fingerprint)
+        pending: List[Transaction] = []
+        try:
+            for page_response in pages:
+                pending.extend(page_response.results)
+                if self._aggregates is not None:
+                    self._aggregates.apply(page_response.results)
+                if len(pending) >= buffer_rows:
+                    store.stage(account_id, pages.fingerprint, pending)
+                    pending = []
+                    pages.checkpoint()
+            store.stage(account_id, pages.fingerprint, pending)
+        finally:
+            # Rows staged before a failure are stored too; the checkpoint already covers them.
+            store.commit_staged(account_id, pages.fingerprint, buffer_rows)
+        pages.checkpoint()
+
+        if pages.complete and to_date is None:
+            last = store.last_date(account_id)
+            if last is not None:
+                store.mark_synced(account_id, last)
+        return pages.result([])
+
+    @staticmethod
+    def _transaction_params(
+        account_id: str,
+        ids: Optional[List[str]] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        bill_id: Optional[str] = None,
+        created_at_from: Optional[str] = None,
+    ) -> dict:
+        params = {"accountId": account_id}
+        if ids:
+            params["ids"] = ",".join(ids)
+        if from_date:
+            params["from"] = from_date
+        if to_date:
+            params["to"] = to_date
+        if bill_id:
+            params["billId"] = bill_id
+        if created_at_from:
+            params["createdAtFrom"] = created_at_from
+        return params
+
+    def backfill_transactions(
+        self,
+        account_id: str,
+        from_date: str,
+        to_date: str,
+        window: str = "month",
+        max_workers: int = 4,
+        target_rows_per_window: int = 2000,
+        page_size: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        resume_token: Optional[str] = None,
+    ) -> PagedResult[Transaction]:
+        """
+        Fetches every transaction between from_date and to_date (inclusive) by sharding
+        the range into date windows fetched in parallel. Returns them oldest first.
+        See iter_backfill_transactions for the parameters.
+
+        With a deadline, only the windows fully fetched before it expired are returned,
+        with complete=False and a resume_token that restarts from the first missing window.
+        """
+        fingerprint = query_fingerprint("/transactions#backfill", {
+            "accountId": account_id, "to": to_date, "window": window,
+        })
+        if resume_token:
+            from_date = decode_resume_token(resume_token, fingerprint)["from"]
+
+        rows: List[Transaction] = []
+        for date_window, window_rows, window_complete in self._walk_backfill_windows(
+            account_id, from_date, to_date, window, max_workers, target_rows_per_window, page_size, deadline
+        ):
+            if not window_complete:
+                token = encode_resume_token(fingerprint, **{"from": date_window[0].isoformat()})
+                return PagedResult(rows, complete=False, resume_token=token)
+            rows.extend(window_rows)
+
+        return PagedResult(rows)
+
+    def iter_backfill_transactions(
+        self,
+        account_id: str,
+        from_date: str,
+        to_date: str,
+        window: str = "month",
+        max_workers: int = 4,
+        target_rows_per_window: int = 2000,
+        page_size: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Iterator[Transaction]:
+        """
+        Streams every transaction between from_date and to_date (inclusive), oldest first.
 
-        while True:
-            page_response = self.list_transactions(
+        The range is split into date windows whose pages are walked concurrently by
+        max_workers threads; windows are yielded in date order as soon as each one
+        (and every window before it) has arrived, so at most ~2 * max_workers windows
+        are held in memory. Rows repeated at the edge of two windows are yielded once.
+
+        :param window: "month" for calendar-month windows, or "adaptive" to first probe
+            each month's row count and merge sparse months up to target_rows_per_window.
+        :param deadline: Optional Deadline; the stream ends quietly once it expires.
+        """
+        for _, window_rows, window_complete in self._walk_backfill_windows(
+            account_id, from_date, to_date, window, max_workers, target_rows_per_window, page_size, deadline
+        ):
+            if not window_complete:
+                return
+            yield from window_rows
+
+    def _walk_backfill_windows(
+        self,
+        account_id: str,
+        from_date: str,
+        to_date: str,
+        window: str,
+        max_workers: int,
+        target_rows_per_window: int,
+        page_size: Optional[int],
+        deadline: Optional[Deadline],
+    ) -> Iterator[Tuple[DateWindow, List[Transaction], bool]]:
+        """
+        Yields (window, deduplicated rows, complete) in date order; stops after the
+        first window left incomplete by the deadline.
+        """
+        windows = month_windows(from_date, to_date)
+        if window == "adaptive":
+            windows = self._merge_sparse_windows(account_id, windows, target_rows_per_window, max_workers)
+        elif window != "month":
+            raise ValueError(f"Unknown window strategy '{window}', expected 'month' or 'adaptive'")
+
+        def fetch_window(date_window: DateWindow) -> PagedResult:
+            start, end = date_window
+            rows = self.list_all_transactions(
                 account_id=account_id,
-                ids=ids,
-                from_date=from_date,
-                to_date=to_date,
-                bill_id=bill_id,
-                created_at_from=created_at_from,
+                from_date=start.isoformat(),
+                to_date=end.isoformat(),
                 page_size=page_size,
-                page=page,
+                deadline=deadline,
             )
+            rows.sort(key=lambda transaction: (transaction.date, transaction.id))
+            return rows
 
-            all_transactions.extend(page_response.results)
+        executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        try:
+            remaining = iter(windows)
+            pending = deque(
+                (w, executor.submit(fetch_window, w)) for w in islice(remaining, 2 * max(1, max_workers))
+            )
+            previous_ids: Set[str] = set()
+
+            while pending:
+                date_window, future = pending.popleft()
+                rows = future.result()
+                if not rows.complete:
+                    yield date_window, [], False
+                    return
+
+                next_window = next(remaining, None)
+                if next_window is not None:
+                    pending.append((next_window, executor.submit(fetch_window, next_window)))
 
-            if page >= page_response.totalPages:
-                break
+                window_ids: Set[str] = set()
+                unique_rows: List[Transaction] = []
+                for transaction in rows:
+                    if transaction.id in previous_ids or transaction.id in window_ids:
+                        continue
+                    window_ids.add(transaction.id)
+                    unique_rows.append(transaction)
+                previous_ids = window_ids
+                yield date_window, unique_rows, True
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
-            page += 1
+    def _merge_sparse_windows(
+        self,
+        account_id: str,
+        windows: List[DateWindow],
+        target_rows: int,
+        max_workers: int,
+    ) -> List[DateWindow]:
+        """Probes each window with a 1-row page to read its total, then merges sparse neighbours."""
+        def count_rows(date_window: DateWindow) -> int:
+            start, end = date_window
+            return self.list_transactions(
+                account_id=account_id,
+                from_date=start.isoformat(),
+                to_date=end.isoformat(),
+                page_size=1,
+                page=1,
+            ).total
 
-        return all_transactions
+        counts = map_concurrently(count_rows, windows, max_workers=max_workers)
+        return merge_windows_by_density(windows, counts, target_rows)
 
     def retrieve_transaction(self, transaction_id: str) -> Transaction:
         """
@@ -99,7 +398,39 @@ class TransactionsResource:
         response: Response = self._http_client.get(
             f"/transactions/{transaction_id}", headers=headers
         )
-        return Transaction(**response.json())
+        transaction = parse_model(Transaction, response.json())
+        if self._aggregates is not None:
+            self._aggregates.apply([transaction])
+        return transaction
+
+    def retrieve_transactions(
+        self,
+        account_id: str,
+        ids: List[str],
+        chunk_size: int = 100,
+        max_workers: int = 4,
+    ) -> BatchTransactionsResult:
+        """
+        Retrieves many transactions of one account by id using GET /transactions?ids=...
+        instead of one GET /transactions/{id} per id. Ids are split into URL-safe chunks
+        that are fetched concurrently; results come back in input order and ids the API
+        did not return are listed in `missing`.
+        """
+        ids = unique_ids(ids)
+        chunks = chunk_ids(ids, max_count=chunk_size)
+
+        def fetch_chunk(chunk: List[str]) -> List[Transaction]:
+            return self.list_all_transactions(account_id=account_id, ids=chunk, page_size=len(chunk))
+
+        found = {}
+        for transactions in map_concurrently(fetch_chunk, chunks, max_workers=max_workers):
+            for transaction in transactions:
+                found[transaction.id] = transaction
+
+        return BatchTransactionsResult(
+            results=[found[id_] for id_ in ids if id_ in found],
+            missing=[id_ for id_ in ids if id_ not in found],
+        )
 
     def update_transaction_category(self, transaction_id: str, category_id: str) -> Transaction:
         """
@@ -113,4 +444,8 @@ class TransactionsResource:
             json=update_model.dict(),
             headers=headers,
         )
-        return Transaction(**response.json())
+        transaction = parse_model(Transaction, response.json())
+        if self._aggregates is not None:
+            # Moves the transaction's amount from its old category bucket to the new one.
+            self._aggregates.apply([transaction])
+        return transaction
@@ -1,11 +1,14 @@
 from typing import Optional, List
 from pluggy_py.utils.http_client import HttpClient
+from pluggy_py.utils.pagination import PagedResult, iter_pages
+from pluggy_py.utils.deadline import Deadline
 from pluggy_py.models.webhooks import (
     Webhook,
     CreateWebhookRequest,
     PageResponseWebhooks,
 )
 from pluggy_py.models.items import ICountResponse  # Reuse for DELETE response
+from pluggy_py.utils.profiling import parse_model
 
 class WebhooksResource:
     def __init__(self, http_client: HttpClient, api_key: str):
@@ -19,24 +22,29 @@ class WebhooksResource:
         headers = {"X-API-KEY": self._api_key}
         params = {"page": page, "pageSize": page_size}
         response = self._http.get("/webhooks", params=params, headers=headers)
-        return PageResponseWebhooks(**response.json())
+        return parse_model(PageResponseWebhooks, response.json())
 
-    def list_all_webhooks(self, page_size: int = 50) -> List[Webhook]:
+    def list_all_webhooks(
+        self,
+        page_size: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        resume_token: Optional[str] = None,
+    ) -> PagedResult[Webhook]:
         """
         Returns ALL webhooks, paging internally until the last page is reached.
+        page_size=None adapts the page size.
         """
+        headers = {"X-API-KEY": self._api_key}
         all_hooks: List[Webhook] = []
-        page = 1
 
-        while True:
-            page_response = self.list_webhooks(page=page, page_size=page_size)
+        pages = iter_pages(
+            self._http, "/webhooks", {}, headers, PageResponseWebhooks, page_size,
+            deadline=deadline, resume_token=resume_token,
+        )
+        for page_response in pages:
             all_hooks.extend(page_response.results)
 
-            if page >= page_response.totalPages:
-                break
-            page += 1
-
-        return all_hooks
+        return pages.result(all_hooks)
 
     def create_webhook(self, data: CreateWebhookRequest) -> Webhook:
         """
@@ -44,7 +52,7 @@ class WebhooksResource:
         """
         headers = {"X-API-KEY": self._api_key}
         response = self._http.post("/webhooks", json=data.dict(exclude_none=True), headers=headers)
-        return Webhook(**response.json())
+        return parse_model(Webhook, response.json())
 
     def retrieve_webhook(self, webhook_id: str) -> Webhook:
         """
@@ -53,7 +61,7 @@ class WebhooksResource:
         headers = {"X-API-KEY": self._api_key}
         url = f"/webhooks/{webhook_id}"
         response = self._http.get(url, headers=headers)
-        return Webhook(**response.json())
+        return parse_model(Webhook, response.json())
 
     def update_webhook(self, webhook_id: str, data: CreateWebhookRequest) -> Webhook:
         """
@@ -62,7 +70,7 @@ class WebhooksResource:
         headers = {"X-API-KEY": self._api_key}
         url = f"/webhooks/{webhook_id}"
         response = self._http.patch(url, json=data.dict(exclude_none=True), headers=headers)
-        return Webhook(**response.json())
+        return parse_model(Webhook, response.json())
 
     def delete_webhook(self, webhook_id: str) -> ICountResponse:
         """
@@ -72,4 +80,4 @@ class WebhooksResource:
         headers = {"X-API-KEY": self._api_key}
         url = f"/webhooks/{webhook_id}"
         response = self._http.delete(url, headers=headers)
-        return ICountResponse(**response.json())
+        return parse_model(ICountResponse, response.json())
@@ -0,0 +1,209 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from pydantic import BaseModel, Field
+
+
+def content_hash(record: BaseModel, ignore_fields: Sequence[str] = ()) -> str:
+    """
+    Stable hash of a model's content: its JSON dump with sorted keys, so the same data
+    hashes the same across processes and pydantic versions regardless of field order.
+    """
+    data = record.model_dump(mode="json", exclude=set(ignore_fields) or None)
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ChangeSet(BaseModel):
+    """Records of one scope that changed since the last committed snapshot."""
+    scope: str
+    created: List[Any] = Field(default_factory=list, description="Records not seen before")
+    updated: List[Any] = Field(default_factory=list, description="Records whose content hash changed")
+    deleted: List[str] = Field(default_factory=list, description="Ids present in the snapshot but not in this sync")
+    unchanged: int = Field(0, description="Records identical to the snapshot")
+    deletions_checked: bool = Field(
+        False, description="Whether the records were a full listing, so missing ids were reported as deleted"
+    )
+    hashes: Dict[str, Optional[str]] = Field(
+        default_factory=dict, description="Snapshot updates to commit (None deletes the id)"
+    )
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.created or self.updated or self.deleted)
+
+
+class SnapshotStore:
+    """
+    Holds the last committed content hash of every record, grouped by scope
+    (e.g. "transactions:<accountId>"). Subclasses implement load/apply/clear.
+    """
+
+    def load(self, scope: str) -> Dict[str, str]:
+        raise NotImplementedError
+
+    def apply(self, scope: str, hashes: Dict[str, Optional[str]]) -> None:
+        """Sets the hash of each id, removing ids mapped to None."""
+        raise NotImplementedError
+
+    def clear(self, scope: str) -> None:
+        raise NotImplementedError
+
+
+class MemorySnapshotStore(SnapshotStore):
+    """Keeps snapshots in memory; useful for long-running processes and tests."""
+
+    def __init__(self):
+        self._scopes: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, scope: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._scopes.get(scope, {}))
+
+    def apply(self, scope: str, hashes: Dict[str, Optional[str]]) -> None:
+        with self._lock:
+            snapshot = self._scopes.setdefault(scope, {})
+            for record_id, digest in hashes.items():
+                if digest is None:
+                    snapshot.pop(record_id, None)
+                else:
+                    snapshot[record_id] = digest
+
+    def clear(self, scope: str) -> None:
+        with self._lock:
+            self._scopes.pop(scope, None)
+
+
+class SQLiteSnapshotStore(SnapshotStore):
+    """Stores snapshots in a single SQLite table; safe to share between threads."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                " scope TEXT NOT NULL, record_id TEXT NOT NULL, hash TEXT NOT NULL,"
+                " PRIMARY KEY (scope, record_id))"
+            )
+
+    def load(self, scope: str) -> Dict[str, str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT record_id, hash FROM snapshots WHERE scope = ?", (scope,)
+            ).fetchall()
+        return dict(rows)
+
+    def apply(self, scope: str, hashes: Dict[str, Optional[str]]) -> None:
+        upserts = [(scope, record_id, digest) for record_id, digest in hashes.items() if digest is not None]
+        deletes = [(scope, record_id) for record_id, digest in hashes.items() if digest is None]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO snapshots (scope, record_id, hash) VALUES (?, ?, ?)", upserts
+            )
+            self._conn.executemany("DELETE FROM snapshots WHERE scope = ? AND record_id = ?", deletes)
+
+    def clear(self, scope: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM snapshots WHERE scope = ?", (scope,))
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class ChangeDetector:
+    """
+    Turns full re-syncs into a change feed.
+
+    diff() hashes each synced record (see content_hash) and compares it with the
+    snapshot of its scope, returning only created, updated and deleted records, so
+    downstream writes scale with churn rather than with the size of the item.
+    Deletions are only reported for full listings: a PagedResult cut short by a
+    Deadline (complete=False) or continued from a resume token or checkpoint
+    (resumed=True) holds only part of the scope, so missing ids are left alone.
+
+    The snapshot only moves forward on commit(), so a crash between diff() and the
+    downstream write re-emits the same changes on the next sync:
+
+        detector = ChangeDetector(SQLiteSnapshotStore("snapshots.db"))
+        transactions = client.transactions.list_all_transactions(account_id)
+        changes = detector.diff(f"transactions:{account_id}", transactions)
+        write_downstream(changes.created, changes.updated, changes.deleted)
+        detector.commit(changes)
+    """
+
+    def __init__(self, store: Optional[SnapshotStore] = None, ignore_fields: Sequence[str] = ()):
+        """
+        :param store: Where snapshots are kept; an in-memory store by default.
+        :param ignore_fields: Top-level fields left out of the hash, e.g. fields that
+            change on every sync without the record really changing.
+        """
+        self.store = store or MemorySnapshotStore()
+        self.ignore_fields = tuple(ignore_fields)
+
+    def diff(
+        self,
+        scope: str,
+        records: Iterable[BaseModel],
+        id_field: str = "id",
+        complete: Optional[bool] = None,
+    ) -> ChangeSet:
+        """
+        Compares `records` - every record of the scope, as returned by a list_all_* call -
+        with the scope's snapshot. `complete` defaults to the records' own `complete`
+        flag when they are a PagedResult, True otherwise. Records of a resumed walk
+        never count as complete; passing complete=True for them raises ValueError.
+        """
+        resumed = getattr(records, "resumed", False)
+        if complete and resumed:
+            raise ValueError("A resumed listing only holds part of the scope; deletions cannot be computed")
+        if complete is None:
+            complete = getattr(records, "complete", True) and not resumed
+
+        previous = self.store.load(scope)
+        changes = ChangeSet(scope=scope)
+        seen = set()
+        for record in records:
+            record_id = str(getattr(record, id_field))
+            if record_id in seen:
+                continue
+            seen.add(record_id)
+
+            digest = content_hash(record, self.ignore_fields)
+            old_digest = previous.get(record_id)
+            if old_digest is None:
+                changes.created.append(record)
+            elif old_digest != digest:
+                changes.updated.append(record)
+            else:
+                changes.unchanged += 1
+                continue
+            changes.hashes[record_id] = digest
+
+        changes.deletions_checked = complete
+        if complete:
+            for record_id in previous:
+                if record_id not in seen:
+                    changes.deleted.append(record_id)
+                    changes.hashes[record_id] = None
+        return changes
+
+    def commit(self, changes: ChangeSet) -> None:
+        """Records a ChangeSet as applied downstream, advancing the scope's snapshot."""
+        if changes.hashes:
+            self.store.apply(changes.scope, changes.hashes)
+
+    def detect(self, scope: str, records: Iterable[BaseModel], id_field: str = "id") -> ChangeSet:
+        """diff() followed immediately by commit()."""
+        changes = self.diff(scope, records, id_field=id_field)
+        self.commit(changes)
+        return changes
+
+    def forget(self, scope: str) -> None:
+        """Drops a scope's snapshot, e.g. after its item was deleted."""
+        self.store.clear(scope)
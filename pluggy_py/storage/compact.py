@@ -0,0 +1,291 @@
+import math
+import sys
+import threading
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, Generic, Iterable, Iterator, List, Optional, Type, TypeVar, Union
+
+from pydantic import BaseModel
+
+from pluggy_py.models.transactions import CreditCardMetadata, Merchant, PaymentData, Transaction
+
+T = TypeVar("T")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Columns of Transaction by storage kind. Low-cardinality strings are interned, free
+# text (mostly unique per row) is packed into one buffer, numbers live in typed arrays,
+# nested models are kept as (interned) JSON blobs decoded on access.
+INTERNED_FIELDS = (
+    "currencyCode",
+    "type",
+    "status",
+    "category",
+    "categoryId",
+    "operationType",
+    "accountId",
+)
+TEXT_FIELDS = ("description", "descriptionRaw", "providerCode")
+FLOAT_FIELDS = ("amount", "amountInAccountCurrency", "balance")
+BLOB_FIELDS: Dict[str, Type[BaseModel]] = {
+    "paymentData": PaymentData,
+    "creditCardMetadata": CreditCardMetadata,
+    "merchant": Merchant,
+}
+
+
+class _InternTable(Generic[T]):
+    """Stores each distinct value once; rows keep a 4-byte index into it (0 is None)."""
+
+    def __init__(self):
+        self.values: List[Optional[T]] = [None]
+        self._index: Dict[T, int] = {}
+
+    def intern(self, value: Optional[T]) -> int:
+        if value is None:
+            return 0
+        position = self._index.get(value)
+        if position is None:
+            position = len(self.values)
+            self.values.append(value)
+            self._index[value] = position
+        return position
+
+    def __getitem__(self, position: int) -> Optional[T]:
+        return self.values[position]
+
+    def __len__(self) -> int:
+        return len(self.values) - 1
+
+    def nbytes(self) -> int:
+        return (
+            sys.getsizeof(self.values)
+            + sys.getsizeof(self._index)
+            + sum(sys.getsizeof(value) for value in self.values[1:])
+        )
+
+
+class _TextColumn:
+    """
+    Strings stored back to back in one UTF-8 buffer with an offsets array; for fields
+    whose values rarely repeat, where interning would only add a dict entry per row.
+    """
+
+    def __init__(self):
+        self._data = bytearray()
+        self._offsets = array("Q", [0])
+        self._present = array("b")
+
+    def append(self, value: Optional[str]) -> None:
+        if value is not None:
+            self._data += value.encode("utf-8")
+        self._offsets.append(len(self._data))
+        self._present.append(value is not None)
+
+    def __getitem__(self, row: int) -> Optional[str]:
+        if not self._present[row]:
+            return None
+        return self._data[self._offsets[row]:self._offsets[row + 1]].decode("utf-8")
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self._data) + sys.getsizeof(self._offsets) + sys.getsizeof(self._present)
+
+
+def _to_micros(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(micros: int, aware: bool) -> datetime:
+    seconds, micro = divmod(micros, 1_000_000)
+    value = datetime.fromtimestamp(seconds, tz=timezone.utc).replace(microsecond=micro)
+    return value if aware else value.replace(tzinfo=None)
+
+
+class CompactTransaction:
+    """
+    Read-only view of one row of a CompactTransactionStore. Attributes mirror
+    Transaction; nested models are decoded from their blob on each access.
+    """
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: "CompactTransactionStore", row: int):
+        self._store = store
+        self._row = row
+
+    def __getattr__(self, name: str) -> Any:
+        # Private and dunder lookups (copy, pickle) can happen before the slots are set.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._store._value(self._row, name)
+
+    def to_transaction(self) -> Transaction:
+        return self._store._transaction(self._row)
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, CompactTransaction)
+            and other._store is self._store
+            and other._row == self._row
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self._store), self._row))
+
+    def __repr__(self) -> str:
+        return f"CompactTransaction(id={self.id!r}, date={self.date!r}, amount={self.amount!r})"
+
+
+class CompactTransactionStore:
+    """
+    Memory-compact, append-only collection of transactions.
+
+    Instead of one pydantic object graph per transaction (six objects and their dicts
+    when paymentData, creditCardMetadata and merchant are present), rows are spread
+    over columns:
+      - ids in one contiguous buffer with an offsets array,
+      - dates as int64 microseconds, amounts/balances as float64 arrays (NaN for None),
+      - repeated strings (currencyCode, type, status, category, categoryId, accountId,
+        operationType) interned once and referenced by a uint32 index,
+      - free text (descriptions, providerCode) packed into one buffer per field,
+      - paymentData, creditCardMetadata and merchant as JSON blobs, interned as well
+        (a merchant appearing on a thousand rows is stored once) and decoded lazily.
+
+    Rows are read back as CompactTransaction views, or as full Transaction models with
+    to_transaction(). Numeric columns can be read directly with column(). Naive dates
+    are taken as UTC; aware dates come back converted to UTC.
+
+    Usage:
+        store = CompactTransactionStore()
+        client.transactions.process_all_transactions(account_ids, store.extend)
+        total = sum(store.column("amount"))
+    """
+
+    def __init__(self, transactions: Iterable[Transaction] = ()):
+        self._lock = threading.Lock()
+        self._ids = bytearray()
+        self._id_offsets = array("Q", [0])
+        self._id_index: Optional[Dict[str, int]] = None
+        self._dates = array("q")
+        self._date_aware = array("b")
+        self._floats = {name: array("d") for name in FLOAT_FIELDS}
+        self._strings: _InternTable[str] = _InternTable()
+        self._string_columns = {name: array("I") for name in INTERNED_FIELDS}
+        self._text_columns = {name: _TextColumn() for name in TEXT_FIELDS}
+        self._blobs: _InternTable[bytes] = _InternTable()
+        self._blob_columns = {name: array("I") for name in BLOB_FIELDS}
+        self.extend(transactions)
+
+    def __getstate__(self) -> dict:
+        # Pickled and deep-copied without the lock, which cannot be.
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._dates)
+
+    def __iter__(self) -> Iterator[CompactTransaction]:
+        for row in range(len(self)):
+            yield CompactTransaction(self, row)
+
+    def __getitem__(self, row: int) -> CompactTransaction:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("CompactTransactionStore index out of range")
+        return CompactTransaction(self, row)
+
+    def append(self, transaction: Transaction) -> None:
+        self.extend((transaction,))
+
+    def extend(self, transactions: Iterable[Transaction]) -> None:
+        with self._lock:
+            for transaction in transactions:
+                self._append(transaction)
+
+    def get(self, transaction_id: str) -> Optional[CompactTransaction]:
+        """Looks a row up by transaction id (the id index is built on first use)."""
+        with self._lock:
+            if self._id_index is None:
+                self._id_index = {self._id(row): row for row in range(len(self))}
+            row = self._id_index.get(transaction_id)
+        return None if row is None else CompactTransaction(self, row)
+
+    def column(self, name: str) -> Union[array, List[Any]]:
+        """
+        All values of a column. Numeric columns are returned as the underlying array
+        (NaN for None) without copying; other columns as a decoded list.
+        """
+        if name in self._floats:
+            return self._floats[name]
+        return [self._value(row, name) for row in range(len(self))]
+
+    def to_transactions(self) -> List[Transaction]:
+        return [self._transaction(row) for row in range(len(self))]
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the store, in bytes."""
+        arrays = [self._id_offsets, self._dates, self._date_aware]
+        arrays += list(self._floats.values())
+        arrays += list(self._string_columns.values())
+        arrays += list(self._blob_columns.values())
+        total = sys.getsizeof(self._ids) + sum(sys.getsizeof(column) for column in arrays)
+        total += self._strings.nbytes() + self._blobs.nbytes()
+        total += sum(column.nbytes() for column in self._text_columns.values())
+        if self._id_index is not None:
+            total += sys.getsizeof(self._id_index)
+        return total
+
+    def _append(self, transaction: Transaction) -> None:
+        row = len(self)
+        self._ids += transaction.id.encode("utf-8")
+        self._id_offsets.append(len(self._ids))
+        if self._id_index is not None:
+            self._id_index[transaction.id] = row
+
+        self._dates.append(_to_micros(transaction.date))
+        self._date_aware.append(transaction.date.tzinfo is not None)
+        for name, column in self._floats.items():
+            value = getattr(transaction, name)
+            column.append(math.nan if value is None else value)
+        for name, column in self._string_columns.items():
+            column.append(self._strings.intern(getattr(transaction, name)))
+        for name, column in self._text_columns.items():
+            column.append(getattr(transaction, name))
+        for name, column in self._blob_columns.items():
+            value = getattr(transaction, name)
+            blob = None if value is None else value.model_dump_json(exclude_none=True).encode("utf-8")
+            column.append(self._blobs.intern(blob))
+
+    def _id(self, row: int) -> str:
+        return self._ids[self._id_offsets[row]:self._id_offsets[row + 1]].decode("utf-8")
+
+    def _value(self, row: int, name: str) -> Any:
+        if name == "id":
+            return self._id(row)
+        if name == "date":
+            return _from_micros(self._dates[row], bool(self._date_aware[row]))
+        if name in self._floats:
+            value = self._floats[name][row]
+            return None if math.isnan(value) else value
+        if name in self._string_columns:
+            return self._strings[self._string_columns[name][row]]
+        if name in self._text_columns:
+            return self._text_columns[name][row]
+        if name in self._blob_columns:
+            blob = self._blobs[self._blob_columns[name][row]]
+            return None if blob is None else BLOB_FIELDS[name].model_validate_json(blob)
+        raise AttributeError(f"Transaction has no field '{name}'")
+
+    def _transaction(self, row: int) -> Transaction:
+        return Transaction.model_construct(
+            **{name: self._value(row, name) for name in Transaction.model_fields}
+        )
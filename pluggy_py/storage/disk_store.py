@@ -0,0 +1,669 @@
+import heapq
+import json
+import math
+import mmap
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from urllib.parse import quote, unquote
+
+from pluggy_py.models.transactions import Transaction
+
+# Fixed-width columns, one file each, as array typecodes.
+COLUMNS = {
+    "date": "q",      # microseconds since epoch, UTC
+    "amount": "d",
+    "balance": "d",   # NaN for None
+    "type": "B",      # TYPE_CODES
+    "status": "B",    # STATUS_CODES
+    "offset": "Q",    # start of the row's record in strings.bin
+    "length": "I",    # length of that record
+}
+TYPE_CODES = {None: 0, "DEBIT": 1, "CREDIT": 2}
+STATUS_CODES = {None: 0, "POSTED": 1, "PENDING": 2}
+# Code for values outside the tables above; the value itself is kept in strings.bin.
+OTHER = 255
+
+# One sparse index entry (the date of the first row of the block) every INDEX_STRIDE rows.
+INDEX_STRIDE = 1024
+
+# Names the generation of column files (and the strings file) an account is made of.
+MANIFEST = "CURRENT"
+SYNC_STATE = "sync.json"
+# Holds a tail rewrite until it is applied to the column files; replayed on open.
+TAIL_JOURNAL = "tail.journal"
+# Sorted runs spilled by stage(), one directory per key, until commit_staged().
+STAGING = "staging"
+# Runs of one level are merged into a run of the next level once there are this many.
+STAGED_RUNS_FAN_IN = 16
+
+# strings.bin is compacted once it is this many times larger than its live records
+# (and at least COMPACT_MIN_BYTES larger).
+COMPACT_RATIO = 2.0
+COMPACT_MIN_BYTES = 1 << 20
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_FIXED_FIELDS = ("date", "amount", "balance")
+
+DateLike = Union[date, datetime, str]
+
+
+def _to_micros(value: DateLike) -> int:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(micros: int) -> datetime:
+    seconds, micro = divmod(micros, 1_000_000)
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(microsecond=micro)
+
+
+def _encode_row(transaction: Transaction, offset: int) -> tuple:
+    type_code = TYPE_CODES.get(transaction.type, OTHER)
+    status_code = STATUS_CODES.get(transaction.status, OTHER)
+    exclude = set(_FIXED_FIELDS)
+    if type_code != OTHER:
+        exclude.add("type")
+    if status_code != OTHER:
+        exclude.add("status")
+    record = transaction.model_dump_json(exclude=exclude, exclude_none=True).encode("utf-8")
+    balance = math.nan if transaction.balance is None else transaction.balance
+    values = (_to_micros(transaction.date), transaction.amount, balance, type_code, status_code, offset, len(record))
+    return values, record
+
+
+def _sort_key(transaction: Transaction) -> tuple:
+    return _to_micros(transaction.date), transaction.id
+
+
+def _read_run(path: str) -> Iterator[tuple]:
+    """The (sort key, line) pairs of a staged run, in the order they were written."""
+    with open(path, "rb") as f:
+        for line in f:
+            record = json.loads(line)
+            yield (_to_micros(record["date"]), record["id"]), line.rstrip(b"\n")
+
+
+_ID_PREFIX = b'{"id":"'
+
+
+def _record_id(record: bytes) -> str:
+    """The id of a strings.bin record, read without decoding the rest (id is Transaction's first field)."""
+    if record.startswith(_ID_PREFIX):
+        end = record.find(b'"', len(_ID_PREFIX))
+        candidate = record[len(_ID_PREFIX):end]
+        if end > 0 and b"\\" not in candidate:
+            return candidate.decode("utf-8")
+    return json.loads(record)["id"]
+
+
+def _write_durably(path: str, chunks: Iterable[bytes]) -> None:
+    with open(path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _sync_directory(directory: str) -> None:
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _Column:
+    """One fixed-width column file, readable as a zero-copy typed memoryview over an mmap."""
+
+    def __init__(self, path: str, typecode: str):
+        self.path = path
+        self.typecode = typecode
+        self.itemsize = array(typecode).itemsize
+        self._mmap: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+        self._mapped_size = -1
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path) // self.itemsize
+        except FileNotFoundError:
+            return 0
+
+    def view(self, rows: int) -> memoryview:
+        nbytes = rows * self.itemsize
+        if nbytes != self._mapped_size:
+            # Views handed out earlier keep the previous mapping alive; files never shrink
+            # below the rows they map (a tail rewrite only overwrites and extends them).
+            if nbytes == 0:
+                self._mmap, self._view = None, memoryview(array(self.typecode))
+            else:
+                with open(self.path, "rb") as f:
+                    self._mmap = mmap.mmap(f.fileno(), nbytes, access=mmap.ACCESS_READ)
+                self._view = memoryview(self._mmap).cast(self.typecode)
+            self._mapped_size = nbytes
+        return self._view
+
+
+class _Account:
+    """
+    The files of one account. Column files belong to a generation: generation 0 is
+    <name>.col, generation g is <name>.<g>.col. The MANIFEST file names the live
+    generation and strings file; a compaction builds the next generation next to it
+    and commits it by atomically replacing the manifest. Rewritten tails are applied
+    to the live generation in place, through TAIL_JOURNAL.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.generation, self.strings_name = self._read_manifest()
+        self._remove_unreferenced_files()
+        self.columns = self._columns(self.generation)
+        self._replay_tail_journal()
+        self.rows = self._recover()
+        self.index = self._load_index()
+        self.live_bytes = sum(self.view("length"))
+
+    @property
+    def strings_path(self) -> str:
+        return os.path.join(self.directory, self.strings_name)
+
+    @property
+    def index_path(self) -> str:
+        return self._index_path(self.generation)
+
+    def _column_path(self, name: str, generation: int) -> str:
+        suffix = "col" if generation == 0 else f"{generation}.col"
+        return os.path.join(self.directory, f"{name}.{suffix}")
+
+    def _index_path(self, generation: int) -> str:
+        suffix = "idx" if generation == 0 else f"{generation}.idx"
+        return os.path.join(self.directory, f"date.{suffix}")
+
+    def _columns(self, generation: int) -> Dict[str, _Column]:
+        return {name: _Column(self._column_path(name, generation), code) for name, code in COLUMNS.items()}
+
+    def _read_manifest(self) -> tuple:
+        try:
+            with open(os.path.join(self.directory, MANIFEST), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return 0, "strings.bin"
+        return manifest["generation"], manifest["strings"]
+
+    def _remove_unreferenced_files(self) -> None:
+        """Deletes generations left behind by a rewrite that crashed or was superseded."""
+        live = {os.path.basename(self._column_path(name, self.generation)) for name in COLUMNS}
+        live.update((MANIFEST, SYNC_STATE, TAIL_JOURNAL, self.strings_name, os.path.basename(self.index_path)))
+        for name in os.listdir(self.directory):
+            if name not in live and name.endswith((".col", ".idx", ".bin", ".tmp")):
+                os.remove(os.path.join(self.directory, name))
+
+    def commit_generation(self, generation: int, strings_name: str, rows: int, index: array) -> None:
+        """Makes a fully written generation live, then drops the previous one."""
+        manifest_path = os.path.join(self.directory, MANIFEST)
+        payload = json.dumps({"generation": generation, "strings": strings_name}).encode("utf-8")
+        _write_durably(f"{manifest_path}.tmp", [payload])
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+        _sync_directory(self.directory)
+
+        previous = [column.path for column in self.columns.values()] + [self.index_path]
+        if strings_name != self.strings_name:
+            previous.append(self.strings_path)
+        self.generation, self.strings_name = generation, strings_name
+        self.columns = self._columns(generation)
+        self.rows = rows
+        self.index = index
+        # Mappings handed out earlier stay readable after their files are unlinked.
+        for path in previous:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def write_tail(self, start: int, tail: Dict[str, array]) -> None:
+        """
+        Replaces the rows from `start` on with `tail` (at least as many rows). The tail
+        is first made durable in TAIL_JOURNAL, so a crash while the column files are
+        being overwritten is finished by the replay on the next open.
+        """
+        path = os.path.join(self.directory, TAIL_JOURNAL)
+        header = json.dumps({"start": start, "rows": len(tail["date"])}).encode("utf-8") + b"\n"
+        _write_durably(f"{path}.tmp", [header] + [tail[name].tobytes() for name in COLUMNS])
+        os.replace(f"{path}.tmp", path)
+        _sync_directory(self.directory)
+        self.rows, self.index = self._replay_tail_journal()
+
+    def _replay_tail_journal(self) -> Optional[tuple]:
+        """Applies a pending tail rewrite; returns the new row count and index, if there was one."""
+        path = os.path.join(self.directory, TAIL_JOURNAL)
+        try:
+            journal = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        with journal:
+            header = json.loads(journal.readline())
+            start, rows = header["start"], header["start"] + header["rows"]
+            for column in self.columns.values():
+                with open(column.path, "r+b") as f:
+                    f.seek(start * column.itemsize)
+                    f.write(journal.read((rows - start) * column.itemsize))
+                    f.truncate()
+                    f.flush()
+                    os.fsync(f.fileno())
+        dates = self.columns["date"].view(rows)
+        index = array("q", (dates[row] for row in range(0, rows, INDEX_STRIDE)))
+        self._write_index(index)
+        os.remove(path)
+        _sync_directory(self.directory)
+        return rows, index
+
+    def _recover(self) -> int:
+        """Drops a partially written last batch: all columns are cut to the shortest one."""
+        rows = min(column.size() for column in self.columns.values())
+        for column in self.columns.values():
+            if column.size() != rows:
+                with open(column.path, "r+b") as f:
+                    f.truncate(rows * column.itemsize)
+        return rows
+
+    def _load_index(self) -> array:
+        index = array("q")
+        try:
+            with open(self.index_path, "rb") as f:
+                index.frombytes(f.read())
+        except FileNotFoundError:
+            pass
+        expected = (self.rows + INDEX_STRIDE - 1) // INDEX_STRIDE
+        if len(index) != expected:
+            dates = self.columns["date"].view(self.rows)
+            index = array("q", (dates[row] for row in range(0, self.rows, INDEX_STRIDE)))
+            self._write_index(index)
+        return index
+
+    def _write_index(self, index: array) -> None:
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            index.tofile(f)
+        os.replace(tmp_path, self.index_path)
+
+    def view(self, name: str) -> memoryview:
+        return self.columns[name].view(self.rows)
+
+    def strings(self) -> Optional[mmap.mmap]:
+        try:
+            with open(self.strings_path, "rb") as f:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):  # missing or empty
+            return None
+
+    def search(self, micros: int, side: str) -> int:
+        """Row position of `micros` in the date column, narrowed first with the sparse index."""
+        bisect = bisect_left if side == "left" else bisect_right
+        # The answer lies between the first row of the block before the first index
+        # entry past `micros` and the first row of that entry's block.
+        block = bisect(self.index, micros)
+        lo = max(0, (block - 1) * INDEX_STRIDE)
+        hi = min(self.rows, block * INDEX_STRIDE)
+        return bisect(self.view("date"), micros, lo, hi)
+
+
+class DateRange:
+    """
+    Rows of one account between two dates. The column attributes (dates, amounts,
+    balances, types, statuses) are memoryview slices of the memory-mapped files: no
+    data is copied until rows are decoded into Transaction models by iteration.
+
+    The slices are live: a later batch reaching back into the range rewrites those
+    rows in place, so read a range once the writes it depends on are done.
+    """
+
+    def __init__(self, account: _Account, start: int, stop: int):
+        self._account = account
+        self.start = start
+        self.stop = stop
+        self.dates = account.view("date")[start:stop]
+        self.amounts = account.view("amount")[start:stop]
+        self.balances = account.view("balance")[start:stop]
+        self.types = account.view("type")[start:stop]
+        self.statuses = account.view("status")[start:stop]
+        self._offsets = account.view("offset")[start:stop]
+        self._lengths = account.view("length")[start:stop]
+        # Mapped now: a later compaction replaces the strings file these offsets point into.
+        self._strings = account.strings() if stop > start else None
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def total(self) -> float:
+        return math.fsum(self.amounts)
+
+    def __iter__(self) -> Iterator[Transaction]:
+        if not len(self):
+            return
+        strings = self._strings
+        type_names = {code: name for name, code in TYPE_CODES.items()}
+        status_names = {code: name for name, code in STATUS_CODES.items()}
+        for position in range(len(self)):
+            offset = self._offsets[position]
+            record = json.loads(strings[offset:offset + self._lengths[position]])
+            balance = self.balances[position]
+            record.update(
+                date=_from_micros(self.dates[position]),
+                amount=self.amounts[position],
+                balance=None if math.isnan(balance) else balance,
+            )
+            if self.types[position] != OTHER:
+                record["type"] = type_names[self.types[position]]
+            if self.statuses[position] != OTHER:
+                record["status"] = status_names[self.statuses[position]]
+            yield Transaction.model_validate(record)
+
+
+class DiskTransactionStore:
+    """
+    Append-friendly on-disk transaction store for "account X between dates A and B"
+    queries over tens of millions of rows, without a database server.
+
+    Each account gets a directory holding:
+      - one file per fixed-width column (date, amount, balance, type and status codes,
+        and the offset/length of the row's record in strings.bin), read through mmap,
+      - strings.bin, an append-only side file with the variable-length fields of each
+        row (id, descriptions, category, merchant, ...) as compact JSON,
+      - date.idx, a sparse index holding the date of every INDEX_STRIDE-th row.
+
+    Rows of an account are kept in date order. Batches newer than everything stored
+    are appended in place; a batch reaching back in time (a backfill, or re-synced rows
+    that changed) only rewrites the tail from its oldest row on: the merged tail is
+    written to a journal, then over the column files, so a crash at any point is
+    finished on the next open. Rows kept in a rewritten tail are moved as they are -
+    their records in strings.bin are not decoded or written again. Records of replaced
+    rows are left behind in strings.bin until it is compacted (into a new generation
+    committed by atomically replacing the CURRENT manifest), which happens
+    automatically once it is COMPACT_RATIO times larger than its live records (or via
+    compact()).
+
+    Writers that receive rows newest-first (sync_transactions) stage() sorted runs and
+    commit_staged() them: the runs are merged and appended oldest-first, so each row
+    is written to the columns once instead of being rewritten by every later batch.
+
+    range() finds the rows with two binary searches - over the in-memory sparse index,
+    then inside one block of the mapped date column - and returns a DateRange of
+    zero-copy memoryview slices.
+
+    Usage:
+        store = DiskTransactionStore("/var/lib/pluggy/transactions")
+        client.transactions.sync_transactions(account_id, store)
+        rows = store.range(account_id, "2024-01-01", "2024-02-01")
+        spent = rows.total()
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._accounts: Dict[str, _Account] = {}
+        self._lock = threading.Lock()
+
+    def _account(self, account_id: str) -> _Account:
+        with self._lock:
+            account = self._accounts.get(account_id)
+            if account is None:
+                account = _Account(os.path.join(self.directory, quote(account_id, safe="")))
+                self._accounts[account_id] = account
+            return account
+
+    def account_ids(self) -> List[str]:
+        return sorted(unquote(name) for name in os.listdir(self.directory))
+
+    def count(self, account_id: str) -> int:
+        return self._account(account_id).rows
+
+    def synced_through(self, account_id: str) -> Optional[datetime]:
+        """Date of the newest row when the account's last complete sync finished, if any."""
+        try:
+            with open(os.path.join(self._account(account_id).directory, SYNC_STATE), "r", encoding="utf-8") as f:
+                return _from_micros(json.load(f)["through"])
+        except FileNotFoundError:
+            return None
+
+    def mark_synced(self, account_id: str, through: DateLike) -> None:
+        """Records that every transaction up to `through` is stored (see sync_transactions)."""
+        path = os.path.join(self._account(account_id).directory, SYNC_STATE)
+        _write_durably(f"{path}.tmp", [json.dumps({"through": _to_micros(through)}).encode("utf-8")])
+        os.replace(f"{path}.tmp", path)
+
+    def last_date(self, account_id: str) -> Optional[datetime]:
+        account = self._account(account_id)
+        with account.lock:
+            if not account.rows:
+                return None
+            return _from_micros(account.view("date")[account.rows - 1])
+
+    def append(self, transactions: Iterable[Transaction]) -> int:
+        """
+        Writes transactions, grouped by accountId (transactions without one are
+        rejected). Can be used directly as a PagePipeline consumer. Returns the number
+        of rows written.
+        """
+        by_account: Dict[str, List[Transaction]] = {}
+        for transaction in transactions:
+            if not transaction.accountId:
+                raise ValueError(f"Transaction '{transaction.id}' has no accountId")
+            by_account.setdefault(transaction.accountId, []).append(transaction)
+        return sum(self.append_account(account_id, rows) for account_id, rows in by_account.items())
+
+    def append_account(self, account_id: str, transactions: Iterable[Transaction]) -> int:
+        """Writes transactions of one account, whatever their accountId field says."""
+        batch = {transaction.id: transaction for transaction in transactions}
+        if not batch:
+            return 0
+        rows = sorted(batch.values(), key=_sort_key)
+        account = self._account(account_id)
+        with account.lock:
+            oldest = _to_micros(rows[0].date)
+            tail_start = account.search(oldest, "left") if account.rows else 0
+            if tail_start == account.rows:
+                self._append_rows(account, rows)
+            else:
+                self._rewrite_tail(account, tail_start, batch)
+            if self._needs_compaction(account):
+                self._compact(account)
+        return len(rows)
+
+    def stage(self, account_id: str, key: str, transactions: Iterable[Transaction]) -> int:
+        """
+        Durably spills the transactions, sorted, as one run under `key` for a later
+        commit_staged(). Runs survive a restart, so a checkpointed walk can stage its
+        pages and checkpoint them before they reach the columns. Returns the rows staged.
+        """
+        rows = sorted(transactions, key=_sort_key)
+        if not rows:
+            return 0
+        directory = self._staging_directory(account_id, key)
+        os.makedirs(directory, exist_ok=True)
+        self._write_run(directory, 0, (transaction.model_dump_json().encode("utf-8") for transaction in rows))
+        level = 0
+        while True:
+            runs = self._staged_runs(directory, level)
+            if len(runs) < STAGED_RUNS_FAN_IN:
+                return len(rows)
+            # Bounds the number of runs (and files open at commit) without re-merging big runs.
+            self._write_run(directory, level + 1, (line for _, line in heapq.merge(*map(_read_run, runs))))
+            for path in runs:
+                os.remove(path)
+            level += 1
+
+    def commit_staged(self, account_id: str, key: str, batch_rows: int = 10_000) -> int:
+        """Appends every run staged under `key` oldest-first in batches of `batch_rows`, then drops the runs."""
+        directory = self._staging_directory(account_id, key)
+        written = 0
+        batch: List[Transaction] = []
+        for _, line in heapq.merge(*map(_read_run, self._staged_runs(directory))):
+            batch.append(Transaction.model_validate_json(line))
+            if len(batch) >= batch_rows:
+                written += self.append_account(account_id, batch)
+                batch = []
+        written += self.append_account(account_id, batch)
+        self.discard_staged(account_id, key)
+        return written
+
+    def discard_staged(self, account_id: str, key: str) -> None:
+        """Drops the runs staged under `key` without writing them."""
+        directory = self._staging_directory(account_id, key)
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                os.remove(os.path.join(directory, name))
+            os.rmdir(directory)
+
+    def _staging_directory(self, account_id: str, key: str) -> str:
+        return os.path.join(self._account(account_id).directory, STAGING, quote(key, safe=""))
+
+    @staticmethod
+    def _staged_runs(directory: str, level: Optional[int] = None) -> List[str]:
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        return sorted(
+            os.path.join(directory, name) for name in names
+            if name.endswith(".run") and (level is None or name.startswith(f"{level}-"))
+        )
+
+    @staticmethod
+    def _write_run(directory: str, level: int, lines: Iterable[bytes]) -> None:
+        names = [name for name in os.listdir(directory) if name.endswith(".run")]
+        sequence = 1 + max((int(name[name.index("-") + 1:-len(".run")]) for name in names), default=0)
+        path = os.path.join(directory, f"{level}-{sequence:06d}.run")
+        _write_durably(f"{path}.tmp", (line + b"\n" for line in lines))
+        os.replace(f"{path}.tmp", path)
+        _sync_directory(directory)
+
+    def compact(self, account_id: str) -> int:
+        """Rewrites the account's strings file without the records of replaced rows. Returns the bytes reclaimed."""
+        account = self._account(account_id)
+        with account.lock:
+            return self._compact(account)
+
+    def range(
+        self,
+        account_id: str,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+    ) -> DateRange:
+        """Rows of the account with start <= date < end (either bound may be None)."""
+        account = self._account(account_id)
+        with account.lock:
+            lo = 0 if start is None else account.search(_to_micros(start), "left")
+            hi = account.rows if end is None else account.search(_to_micros(end), "left")
+            return DateRange(account, lo, max(lo, hi))
+
+    @staticmethod
+    def _encode_rows(account: _Account, rows: List[Transaction], durable: bool = False) -> Dict[str, array]:
+        """Appends the rows' records to the strings file; returns their column values."""
+        columns = {name: array(code) for name, code in COLUMNS.items()}
+        with open(account.strings_path, "ab") as strings:
+            offset = strings.tell()
+            for transaction in rows:
+                values, record = _encode_row(transaction, offset)
+                strings.write(record)
+                offset += len(record)
+                for column, value in zip(columns.values(), values):
+                    column.append(value)
+            if durable:
+                strings.flush()
+                os.fsync(strings.fileno())
+        account.live_bytes += sum(columns["length"])
+        return columns
+
+    def _append_rows(self, account: _Account, rows: List[Transaction]) -> None:
+        columns = self._encode_rows(account, rows)
+
+        # The date column is written last: a crash before it leaves the batch invisible.
+        for name in [n for n in COLUMNS if n != "date"] + ["date"]:
+            with open(account.columns[name].path, "ab") as f:
+                columns[name].tofile(f)
+
+        first_new = account.rows
+        account.rows += len(rows)
+        dates = columns["date"]
+        for row in range(-(-first_new // INDEX_STRIDE) * INDEX_STRIDE, account.rows, INDEX_STRIDE):
+            account.index.append(dates[row - first_new])
+        account._write_index(account.index)
+
+    def _rewrite_tail(self, account: _Account, tail_start: int, batch: Dict[str, Transaction]) -> None:
+        old = {name: account.view(name) for name in COLUMNS}
+        strings = account.strings()
+        kept = []
+        for position in range(tail_start, account.rows):
+            offset, length = old["offset"][position], old["length"][position]
+            transaction_id = _record_id(strings[offset:offset + length])
+            if transaction_id in batch:
+                account.live_bytes -= length
+            else:
+                kept.append((old["date"][position], transaction_id, position))
+
+        rows = sorted(batch.values(), key=_sort_key)
+        new = self._encode_rows(account, rows, durable=True)
+
+        # Stored rows are already in (date, id) order, so the tail is a two-way merge.
+        # Kept rows are copied column value by column value, records untouched.
+        tail = {name: array(code) for name, code in COLUMNS.items()}
+        for _, _, source, position in heapq.merge(
+            ((date, transaction_id, old, position) for date, transaction_id, position in kept),
+            ((new["date"][k], transaction.id, new, k) for k, transaction in enumerate(rows)),
+            key=lambda entry: (entry[0], entry[1]),
+        ):
+            for name, column in tail.items():
+                column.append(source[name][position])
+
+        account.write_tail(tail_start, tail)
+
+    @staticmethod
+    def _needs_compaction(account: _Account) -> bool:
+        try:
+            size = os.path.getsize(account.strings_path)
+        except FileNotFoundError:
+            return False
+        return size - account.live_bytes > COMPACT_MIN_BYTES and size > COMPACT_RATIO * account.live_bytes
+
+    def _compact(self, account: _Account) -> int:
+        generation = account.generation + 1
+        strings_name = f"strings.{generation}.bin"
+        source = account.strings()
+        try:
+            before = os.path.getsize(account.strings_path)
+        except FileNotFoundError:
+            before = 0
+
+        offsets, lengths = account.view("offset"), account.view("length")
+        new_offsets = array("Q")
+        with open(os.path.join(account.directory, strings_name), "wb") as f:
+            position = 0
+            for row in range(account.rows):
+                offset, length = offsets[row], lengths[row]
+                f.write(source[offset:offset + length])
+                new_offsets.append(position)
+                position += length
+            f.flush()
+            os.fsync(f.fileno())
+
+        for name in COLUMNS:
+            data = new_offsets.tobytes() if name == "offset" else account.view(name).cast("B")
+            _write_durably(account._column_path(name, generation), [data])
+        _write_durably(account._index_path(generation), [account.index.tobytes()])
+        account.commit_generation(generation, strings_name, account.rows, account.index)
+        account.live_bytes = position
+        return before - position
@@ -0,0 +1,209 @@
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from pluggy_py.models.transactions import Transaction
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_NON_DIGITS = re.compile(r"\D+")
+
+
+def normalize(text: str) -> str:
+    """Lowercases and strips accents, so 'Padaria São João' matches 'padaria sao joao'."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return _TOKEN.findall(normalize(text))
+
+
+def _recency(transaction: Transaction) -> Tuple[datetime, str]:
+    date = transaction.date
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date, transaction.id
+
+
+def searchable_text(transaction: Transaction) -> List[str]:
+    """The fields indexed for a transaction."""
+    texts = [transaction.description, transaction.descriptionRaw]
+    merchant = transaction.merchant
+    if merchant is not None:
+        texts += [merchant.name, merchant.businessName]
+        if merchant.cnpj:
+            # Index the CNPJ both as typed ('12.345.678/0001-90') and as bare digits.
+            texts += [merchant.cnpj, _NON_DIGITS.sub("", merchant.cnpj)]
+    payment = transaction.paymentData
+    if payment is not None and payment.receiver is not None:
+        texts.append(payment.receiver.name)
+    return [text for text in texts if text]
+
+
+class TransactionSearchIndex:
+    """
+    In-memory inverted index over transaction descriptions, merchants and payment
+    receivers (see searchable_text), for token and prefix search.
+
+    Every token maps to the set of transactions containing it, and the vocabulary is
+    kept sorted so a prefix resolves to a contiguous run of tokens with one binary
+    search. search("uber tri") returns transactions having a token "uber" and a token
+    starting with "tri"; accents and case are ignored.
+
+    Transactions are also kept in (date, id) order. When the query matches many of
+    them (a short prefix such as "a"), search() walks that order from the newest and
+    stops after `limit` matches instead of collecting and sorting every match.
+
+    The index is updated incrementally: add() indexes new transactions and re-indexes
+    ones it already knows (e.g. after a re-sync), so it can be fed page by page as a
+    PagePipeline consumer:
+
+        index = TransactionSearchIndex()
+        client.transactions.process_all_transactions(account_ids, index.add)
+        index.search("padaria joao")
+    """
+
+    def __init__(self, transactions: Iterable[Transaction] = ()):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Set[int]] = {}
+        self._vocabulary: List[str] = []
+        self._docs: Dict[int, Transaction] = {}
+        self._doc_tokens: Dict[int, Tuple[str, ...]] = {}
+        self._doc_ids: Dict[str, int] = {}
+        # (date, id, doc) of every transaction, oldest first.
+        self._recency: List[Tuple[datetime, str, int]] = []
+        self._next_doc = 0
+        self.add(transactions)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, transaction_id: str) -> bool:
+        return transaction_id in self._doc_ids
+
+    def add(self, transactions: Iterable[Transaction]) -> None:
+        with self._lock:
+            for transaction in transactions:
+                doc = self._doc_ids.get(transaction.id)
+                if doc is None:
+                    doc = self._doc_ids[transaction.id] = self._next_doc
+                    self._next_doc += 1
+                else:
+                    self._unindex(doc)
+
+                tokens = tuple(dict.fromkeys(
+                    token for text in searchable_text(transaction) for token in tokenize(text)
+                ))
+                for token in tokens:
+                    docs = self._postings.get(token)
+                    if docs is None:
+                        docs = self._postings[token] = set()
+                        insort(self._vocabulary, token)
+                    docs.add(doc)
+                self._docs[doc] = transaction
+                self._doc_tokens[doc] = tokens
+                insort(self._recency, (*_recency(transaction), doc))
+
+    def remove(self, transaction_id: str) -> bool:
+        with self._lock:
+            doc = self._doc_ids.pop(transaction_id, None)
+            if doc is None:
+                return False
+            self._unindex(doc)
+            del self._docs[doc]
+            del self._doc_tokens[doc]
+            return True
+
+    def _unindex(self, doc: int) -> None:
+        for token in self._doc_tokens.get(doc, ()):
+            docs = self._postings[token]
+            docs.discard(doc)
+            if not docs:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+        transaction = self._docs.get(doc)
+        if transaction is not None:
+            del self._recency[bisect_left(self._recency, (*_recency(transaction), doc))]
+
+    def search(
+        self,
+        query: str,
+        limit: Optional[int] = 50,
+        prefix: bool = True,
+        account_id: Optional[str] = None,
+    ) -> List[Transaction]:
+        """
+        Transactions matching every token of `query`, most recent first.
+
+        :param prefix: When True (the default) each query token also matches indexed
+            tokens it is a prefix of ('pad' matches 'padaria'); when False tokens must
+            match exactly.
+        :param account_id: Only transactions of this account.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or limit == 0:
+            return []
+        with self._lock:
+            groups = sorted(
+                (self._matching(token, prefix) for token in tokens),
+                key=lambda group: sum(map(len, group)),
+            )
+            candidates = sum(map(len, groups[0]))
+            if not candidates:
+                return []
+            # Walking the recency order finds `limit` matches after about
+            # limit * len(self) / matches rows; collecting the rarest group costs its size.
+            if limit is not None and limit * len(self._docs) < candidates * candidates:
+                return self._newest_matching(tokens, prefix, limit, account_id)
+
+            # Start from the rarest group, then narrow the candidates by probing the
+            # other groups instead of materialising their unions.
+            docs = set().union(*groups[0])
+            for group in groups[1:]:
+                docs = {doc for doc in docs if any(doc in postings for postings in group)}
+                if not docs:
+                    return []
+            results = [self._docs[doc] for doc in docs]
+
+        if account_id is not None:
+            results = [transaction for transaction in results if transaction.accountId == account_id]
+        if limit is None:
+            return sorted(results, key=_recency, reverse=True)
+        return heapq.nlargest(limit, results, key=_recency)
+
+    def _newest_matching(
+        self, tokens: List[str], prefix: bool, limit: int, account_id: Optional[str]
+    ) -> List[Transaction]:
+        """The newest `limit` transactions whose own tokens match every query token."""
+        results = []
+        for _, _, doc in reversed(self._recency):
+            transaction = self._docs[doc]
+            if account_id is not None and transaction.accountId != account_id:
+                continue
+            doc_tokens = self._doc_tokens[doc]
+            if prefix:
+                matched = all(any(token.startswith(query) for token in doc_tokens) for query in tokens)
+            else:
+                matched = all(query in doc_tokens for query in tokens)
+            if matched:
+                results.append(transaction)
+                if len(results) == limit:
+                    break
+        return results
+
+    def _matching(self, token: str, prefix: bool) -> List[Set[int]]:
+        if not prefix:
+            postings = self._postings.get(token)
+            return [postings] if postings else []
+        group = []
+        position = bisect_left(self._vocabulary, token)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(token):
+            group.append(self._postings[self._vocabulary[position]])
+            position += 1
+        return group
@@ -0,0 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, TypeVar
+
+T = TypeVar("T")
+
+# Upper bound for the comma-joined ids of one request, keeping the full URL well
+# below the ~2-8KB limits enforced by common proxies and load balancers.
+MAX_IDS_PARAM_CHARS = 2000
+
+
+def unique_ids(ids: Iterable[str]) -> List[str]:
+    """Drops duplicate ids, preserving the order of first occurrence."""
+    return list(dict.fromkeys(ids))
+
+
+def chunk_ids(ids: List[str], max_count: int = 100, max_chars: int = MAX_IDS_PARAM_CHARS) -> List[List[str]]:
+    """
+    Splits ids into chunks whose comma-joined form stays within max_chars
+    and which hold at most max_count ids each.
+    """
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    current_chars = 0
+
+    for id_ in ids:
+        extra = len(id_) + (1 if current else 0)
+        if current and (len(current) >= max_count or current_chars + extra > max_chars):
+            chunks.append(current)
+            current, current_chars = [], 0
+            extra = len(id_)
+        current.append(id_)
+        current_chars += extra
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def map_concurrently(fn: Callable[[T], List], chunks: List[T], max_workers: int = 4) -> List[List]:
+    """
+    Applies fn to every chunk on a thread pool and returns the results in chunk order.
+    The first exception raised by any chunk is propagated to the caller.
+    """
+    if len(chunks) <= 1 or max_workers <= 1:
+        return [fn(chunk) for chunk in chunks]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        return list(executor.map(fn, chunks))
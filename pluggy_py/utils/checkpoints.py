@@ -0,0 +1,91 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class CheckpointStore:
+    """
+    Where paginated walks persist their progress, keyed by query fingerprint.
+
+    A checkpoint is a small dict such as
+      {"page": 7, "pageSize": 500, "total": 12873, "totalPages": 26}
+    where "page" is the next page to fetch. Subclasses implement load/save/clear.
+    """
+
+    def load(self, key: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def save(self, key: str, state: dict) -> None:
+        raise NotImplementedError
+
+    def clear(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Stores each checkpoint as <directory>/<key>.json, written atomically."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, key: str, state: dict) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def clear(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """Stores checkpoints in a single SQLite table; safe to share between threads."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                " key TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def load(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT state FROM checkpoints WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, key: str, state: dict) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (key, state, updated_at) VALUES (?, ?, ?)",
+                (key, json.dumps(state), time.time()),
+            )
+
+    def clear(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM checkpoints WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        self._conn.close()
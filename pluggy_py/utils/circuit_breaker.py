@@ -0,0 +1,145 @@
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+
+from pluggy_py.exceptions import CircuitOpenError, InternalServerError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class _Circuit:
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+        # How many times the circuit has opened; tells the probes of each opening apart.
+        self.openings = 0
+
+
+class _Family(str):
+    """The endpoint family of an admitted request; `probe_of` is the opening it probes, if any."""
+
+    probe_of: Optional[int] = None
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint-family circuit breaker for HttpClient.
+
+    Requests are grouped by the first segment of their path, so /investments and
+    /investments/{id}/transactions share one circuit while /accounts has its own.
+
+      - closed: requests flow; failure_threshold consecutive failures open the circuit.
+      - open: requests fail fast with CircuitOpenError until recovery_timeout elapses.
+      - half-open: up to half_open_max_calls probe requests are let through; a success
+        closes the circuit again, a failure re-opens it for another recovery_timeout.
+
+    Only signs of an unhealthy upstream count as failures: 5xx responses, connection
+    errors and timeouts. 4xx responses mean the API answered and count as successes.
+    A request that tells nothing either way - a timeout shortened by the caller's
+    Deadline, or one interrupted by KeyboardInterrupt and the like - is released:
+    its half-open probe slot is freed and the state is left as it was.
+
+    While a circuit is open or half-open, only the outcome of its half-open probes
+    counts: requests admitted before it opened may still complete, and their results
+    (or those of probes from an earlier opening) are ignored.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def family(path: str) -> str:
+        """'/investments/123/transactions' -> '/investments'"""
+        return "/" + path.lstrip("/").split("/", 1)[0].split("?", 1)[0]
+
+    @staticmethod
+    def is_failure(exc: BaseException) -> bool:
+        return isinstance(exc, (
+            InternalServerError,
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+        ))
+
+    def state(self, path: str) -> str:
+        with self._lock:
+            circuit = self._circuits.get(self.family(path))
+            return circuit.state if circuit else CLOSED
+
+    def before_request(self, path: str) -> str:
+        """
+        Admits a request for `path` or raises CircuitOpenError.
+        Returns the endpoint family to report the outcome against.
+        """
+        family = _Family(self.family(path))
+        with self._lock:
+            circuit = self._circuits.setdefault(family, _Circuit())
+            if circuit.state == OPEN:
+                waited = time.monotonic() - circuit.opened_at
+                if waited < self.recovery_timeout:
+                    raise CircuitOpenError(family, self.recovery_timeout - waited)
+                circuit.state = HALF_OPEN
+                circuit.probes = 0
+            if circuit.state == HALF_OPEN:
+                if circuit.probes >= self.half_open_max_calls:
+                    raise CircuitOpenError(family, 0.0)
+                circuit.probes += 1
+                family.probe_of = circuit.openings
+        return family
+
+    @staticmethod
+    def _counts(circuit: _Circuit, family: str) -> bool:
+        """Whether the outcome of a request reported against `family` may change the circuit."""
+        if circuit.state == CLOSED:
+            return True
+        return circuit.state == HALF_OPEN and getattr(family, "probe_of", None) == circuit.openings
+
+    def record_success(self, family: str) -> None:
+        with self._lock:
+            circuit = self._circuits.setdefault(family, _Circuit())
+            if not self._counts(circuit, family):
+                return
+            circuit.state = CLOSED
+            circuit.failures = 0
+            circuit.probes = 0
+
+    def record_failure(self, family: str) -> None:
+        with self._lock:
+            circuit = self._circuits.setdefault(family, _Circuit())
+            if not self._counts(circuit, family):
+                return
+            circuit.failures += 1
+            if circuit.state == HALF_OPEN or circuit.failures >= self.failure_threshold:
+                circuit.state = OPEN
+                circuit.opened_at = time.monotonic()
+                circuit.probes = 0
+                circuit.openings += 1
+
+    def release(self, family: str) -> None:
+        """Reports a request admitted by before_request that ended without an outcome."""
+        with self._lock:
+            circuit = self._circuits.get(family)
+            if circuit is not None and circuit.state == HALF_OPEN and self._counts(circuit, family):
+                circuit.probes -= 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._circuits.clear()
+
+    def after_fork(self) -> None:
+        """Recreates the lock in a forked child, where a parent thread may have held it."""
+        self._lock = threading.Lock()
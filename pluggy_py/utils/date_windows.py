@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+from typing import List, Sequence, Tuple, Union
+
+DateWindow = Tuple[date, date]
+
+
+def to_date(value: Union[str, date]) -> date:
+    """Accepts a date or an ISO 'YYYY-MM-DD' string (a time part, if any, is ignored)."""
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value[:10])
+
+
+def month_windows(from_date: Union[str, date], to_date_: Union[str, date]) -> List[DateWindow]:
+    """
+    Splits the inclusive range [from_date, to_date] into calendar-month windows,
+    e.g. 2024-01-15..2024-03-10 -> [01-15..01-31, 02-01..02-29, 03-01..03-10].
+    """
+    start, end = to_date(from_date), to_date(to_date_)
+    windows: List[DateWindow] = []
+
+    while start <= end:
+        if start.month == 12:
+            next_month = date(start.year + 1, 1, 1)
+        else:
+            next_month = date(start.year, start.month + 1, 1)
+        window_end = min(end, next_month - timedelta(days=1))
+        windows.append((start, window_end))
+        start = next_month
+
+    return windows
+
+
+def merge_windows_by_density(
+    windows: Sequence[DateWindow],
+    counts: Sequence[int],
+    target_rows: int,
+) -> List[DateWindow]:
+    """
+    Greedily merges adjacent windows while their combined row count stays within
+    target_rows, so sparse periods are fetched in one go and dense ones keep their
+    own window. Windows known to be empty are dropped.
+    """
+    merged: List[DateWindow] = []
+    current_start = current_end = None
+    current_rows = 0
+
+    for (start, end), rows in zip(windows, counts):
+        if rows == 0:
+            continue
+        if current_start is not None and current_rows + rows <= target_rows:
+            current_end = end
+            current_rows += rows
+            continue
+        if current_start is not None:
+            merged.append((current_start, current_end))
+        current_start, current_end, current_rows = start, end, rows
+
+    if current_start is not None:
+        merged.append((current_start, current_end))
+    return merged
@@ -0,0 +1,56 @@
+import threading
+import time
+from typing import Optional
+
+
+class CancellationToken:
+    """Lets another thread ask a long-running multi-page call to stop at the next page boundary."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class Deadline:
+    """
+    A total time budget (and/or cancellation token) shared by every request of an operation.
+
+    Each request is sent with the smaller of its usual timeout and the time left, and
+    multi-page walks stop cleanly once the budget is spent or the token is cancelled.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, token: Optional[CancellationToken] = None):
+        """
+        :param seconds: Total budget in seconds, starting now. None means no time limit.
+        :param token: Optional CancellationToken checked alongside the time budget.
+        """
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+        self.token = token
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative), or None when there is no time limit."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        if self.token is not None and self.token.cancelled:
+            return True
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def timeout_for(self, default: float) -> float:
+        """
+        The request timeout to use: `default`, capped by the time left. This is 0.0
+        once the budget is spent; check for that instead of sending the request, as
+        requests rejects a timeout of 0.
+        """
+        remaining = self.remaining()
+        return default if remaining is None else min(default, remaining)
@@ -0,0 +1,237 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple, Union
+
+from pluggy_py.models.webhooks import WebhookEvent
+
+CacheKey = Tuple[str, Hashable]
+
+# Webhook events after which data cached for the event's item is considered stale.
+INVALIDATING_EVENTS = ("item/updated", "item/deleted")
+
+
+class EntityCache:
+    """
+    In-process cache for single-entity reads (items, accounts, identity, loans, bills).
+
+    Entries are keyed by (namespace, resource id), expire after a per-namespace TTL and
+    are evicted least-recently-used once max_size is reached. Every entry can be tagged
+    with the item and/or account it belongs to, so that all data of one item can be
+    dropped at once - explicitly via invalidate_item(), or by feeding Pluggy webhook
+    payloads to handle_webhook_event().
+
+    Accounts seen by the cache also record which item they belong to, so entries tagged
+    only with an account id (e.g. bills) are dropped along with that item as well. That
+    link lives as long as some entry is tagged with the account, so it is bounded by
+    max_size like the entries themselves.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        max_size: int = 10_000,
+        ttls: Optional[Dict[str, float]] = None,
+    ):
+        """
+        :param ttl: Default time-to-live of an entry, in seconds.
+        :param max_size: Maximum number of entries kept; the least recently used go first.
+        :param ttls: Optional per-namespace TTL overrides, e.g. {"identity": 3600}.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.ttls = dict(ttls or {})
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._tags: Dict[CacheKey, Tuple[Optional[str], Optional[str]]] = {}
+        self._by_item: Dict[str, Set[CacheKey]] = {}
+        self._by_account: Dict[str, Set[CacheKey]] = {}
+        self._account_items: Dict[str, str] = {}
+        self._item_accounts: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def scoped(self, scope: str) -> "ScopedEntityCache":
+        """
+        A view of this cache whose entries are only visible through views of the same
+        scope (e.g. a client_id), so one cache can be shared by several credentials
+        without one serving another's data. Limits, statistics and invalidation by
+        item, account or webhook are shared.
+        """
+        return ScopedEntityCache(self, scope)
+
+    def get(self, namespace: str, key: Hashable, scope: Optional[str] = None) -> Optional[Any]:
+        """Returns the cached value, or None if it is missing or expired."""
+        cache_key = (namespace, key) if scope is None else (namespace, (scope, key))
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._discard(cache_key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return value
+
+    def set(
+        self,
+        namespace: str,
+        key: Hashable,
+        value: Any,
+        item_id: Optional[str] = None,
+        account_id: Optional[str] = None,
+        scope: Optional[str] = None,
+    ) -> None:
+        """
+        Stores a value, tagging it with the item and/or account it belongs to
+        so it can later be invalidated together with them.
+        """
+        cache_key = (namespace, key) if scope is None else (namespace, (scope, key))
+        if namespace == "accounts" and item_id:
+            account_id = account_id or key
+        expires_at = time.monotonic() + self.ttls.get(namespace, self.ttl)
+        with self._lock:
+            if cache_key in self._entries:
+                self._discard(cache_key)
+            self._entries[cache_key] = (expires_at, value)
+            self._tags[cache_key] = (item_id, account_id)
+            if namespace == "accounts" and item_id:
+                self._link_account(account_id, item_id)
+            if item_id:
+                self._by_item.setdefault(item_id, set()).add(cache_key)
+            if account_id:
+                self._by_account.setdefault(account_id, set()).add(cache_key)
+
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+
+    def invalidate(self, namespace: str, key: Hashable, scope: Optional[str] = None) -> None:
+        with self._lock:
+            self._discard((namespace, key) if scope is None else (namespace, (scope, key)))
+
+    def invalidate_account(self, account_id: str) -> int:
+        """Drops the account and every entry tagged with it. Returns the number of entries removed."""
+        with self._lock:
+            keys = set(self._by_account.get(account_id, ()))
+            keys.add(("accounts", account_id))
+            return self._discard_many(keys)
+
+    def invalidate_item(self, item_id: str) -> int:
+        """
+        Drops the item and everything cached for it, including entries tagged with
+        any account known to belong to the item. Returns the number of entries removed.
+        """
+        with self._lock:
+            # Scoped item entries are tagged with the item; unscoped ones may not be.
+            keys = set(self._by_item.get(item_id, ()))
+            keys.add(("items", item_id))
+            for account_id in self._item_accounts.get(item_id, ()):
+                keys.update(self._by_account.get(account_id, ()))
+            return self._discard_many(keys)
+
+    def handle_webhook_event(self, event: Union[WebhookEvent, Dict[str, Any]]) -> int:
+        """
+        Invalidates cached data for the item referenced by a Pluggy webhook payload
+        (e.g. {"event": "item/updated", "itemId": "..."}). Events that do not change
+        item data are ignored. Returns the number of entries removed.
+        """
+        if not isinstance(event, WebhookEvent):
+            event = WebhookEvent(**event)
+        if event.event not in INVALIDATING_EVENTS or not event.itemId:
+            return 0
+        return self.invalidate_item(event.itemId)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._by_item.clear()
+            self._by_account.clear()
+            self._account_items.clear()
+            self._item_accounts.clear()
+
+    def purge_expired(self) -> int:
+        """Drops every expired entry now rather than when it is next read. Returns the number removed."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+            return self._discard_many(expired)
+
+    def _link_account(self, account_id: str, item_id: str) -> None:
+        previous = self._account_items.get(account_id)
+        if previous == item_id:
+            return
+        if previous is not None:
+            self._unlink_account(account_id)
+        self._account_items[account_id] = item_id
+        self._item_accounts.setdefault(item_id, set()).add(account_id)
+
+    def _unlink_account(self, account_id: str) -> None:
+        item_id = self._account_items.pop(account_id, None)
+        if item_id is not None:
+            accounts = self._item_accounts[item_id]
+            accounts.discard(account_id)
+            if not accounts:
+                del self._item_accounts[item_id]
+
+    def _discard_many(self, keys) -> int:
+        removed = 0
+        for cache_key in keys:
+            if cache_key in self._entries:
+                removed += 1
+            self._discard(cache_key)
+        return removed
+
+    def _discard(self, cache_key: CacheKey) -> None:
+        self._entries.pop(cache_key, None)
+        item_id, account_id = self._tags.pop(cache_key, (None, None))
+        if item_id and item_id in self._by_item:
+            self._by_item[item_id].discard(cache_key)
+            if not self._by_item[item_id]:
+                del self._by_item[item_id]
+        if account_id and account_id in self._by_account:
+            self._by_account[account_id].discard(cache_key)
+            if not self._by_account[account_id]:
+                del self._by_account[account_id]
+                # Nothing cached for the account any more: forget which item it belongs to.
+                self._unlink_account(account_id)
+
+
+class ScopedEntityCache:
+    """
+    EntityCache view keying entries by (scope, key); see EntityCache.scoped(). Item
+    and account invalidation reach every scope, since Pluggy ids are globally unique.
+    """
+
+    def __init__(self, cache: EntityCache, scope: str):
+        self.cache = cache
+        self.scope = scope
+
+    def get(self, namespace: str, key: Hashable) -> Optional[Any]:
+        return self.cache.get(namespace, key, scope=self.scope)
+
+    def set(
+        self,
+        namespace: str,
+        key: Hashable,
+        value: Any,
+        item_id: Optional[str] = None,
+        account_id: Optional[str] = None,
+    ) -> None:
+        self.cache.set(namespace, key, value, item_id=item_id, account_id=account_id, scope=self.scope)
+
+    def invalidate(self, namespace: str, key: Hashable) -> None:
+        self.cache.invalidate(namespace, key, scope=self.scope)
+
+    def __getattr__(self, name: str):
+        # invalidate_item, invalidate_account, handle_webhook_event, hits, ...
+        return getattr(self.cache, name)
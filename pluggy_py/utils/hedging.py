@@ -0,0 +1,113 @@
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional, Sequence
+
+from pydantic import BaseModel
+
+
+class HedgingStats(BaseModel):
+    """Counters of a HedgingPolicy."""
+    requests: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    skipped_over_budget: int = 0
+
+
+def endpoint_key(path: str) -> str:
+    """'/accounts/8f1c...' -> '/accounts/{id}', so latencies are tracked per endpoint shape."""
+    segments = path.split("?", 1)[0].strip("/").split("/")
+    return "/" + "/".join([segments[0]] + ["{id}" if i % 2 == 1 else s for i, s in enumerate(segments[1:], 1)])
+
+
+class HedgingPolicy:
+    """
+    Opt-in request hedging for idempotent GETs, passed as HttpClient(hedging=...).
+
+    The client keeps a sliding window of observed latencies per endpoint shape (e.g.
+    /accounts/{id}). When a GET has been pending for longer than the `percentile` of
+    that window, an identical request is sent and whichever succeeds first is used; the
+    slower one is discarded when it completes.
+
+    Extra load is capped: a hedge is only sent while hedges stay within
+    max_extra_load of all hedgeable requests (0.05 = at most 5% more requests), and
+    never before min_samples latencies were seen for the endpoint.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        max_extra_load: float = 0.05,
+        min_samples: int = 20,
+        window: int = 500,
+        min_delay: float = 0.01,
+        paths: Optional[Sequence[str]] = None,
+    ):
+        """
+        :param percentile: Latency percentile (0-1) after which a hedge is sent.
+        :param max_extra_load: Cap on hedges as a fraction of hedgeable requests.
+        :param min_samples: Latencies needed for an endpoint before it is hedged.
+        :param window: Latencies kept per endpoint.
+        :param min_delay: Lower bound of the hedge delay, in seconds.
+        :param paths: Path prefixes to hedge (e.g. ["/accounts/", "/items/"]); all GETs if None.
+        """
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be between 0 and 1")
+        self.percentile = percentile
+        self.max_extra_load = max_extra_load
+        self.min_samples = min_samples
+        self.window = window
+        self.min_delay = min_delay
+        self.paths = tuple(paths) if paths is not None else None
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._stats = HedgingStats()
+        self._lock = threading.Lock()
+
+    def applies_to(self, path: str) -> bool:
+        if self.paths is None:
+            return True
+        path = "/" + path.lstrip("/")
+        return any(path.startswith(prefix) for prefix in self.paths)
+
+    def record(self, key: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._latencies.get(key)
+            if samples is None:
+                samples = self._latencies[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def delay_for(self, key: str, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        Seconds to wait before hedging a request to `key`, or None if it is not hedgeable:
+        while samples are too few, or when the delay would not be shorter than `timeout`.
+        Only hedgeable requests count towards the extra-load budget.
+        """
+        with self._lock:
+            samples = self._latencies.get(key)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        position = min(len(ordered) - 1, math.ceil(self.percentile * len(ordered)) - 1)
+        delay = max(self.min_delay, ordered[position])
+        if timeout is not None and delay >= timeout:
+            return None
+        with self._lock:
+            self._stats.requests += 1
+        return delay
+
+    def try_hedge(self) -> bool:
+        """Reserves a hedge within the extra-load budget."""
+        with self._lock:
+            if self._stats.hedged + 1 > self.max_extra_load * self._stats.requests:
+                self._stats.skipped_over_budget += 1
+                return False
+            self._stats.hedged += 1
+            return True
+
+    def record_win(self) -> None:
+        with self._lock:
+            self._stats.hedge_wins += 1
+
+    def stats(self) -> HedgingStats:
+        with self._lock:
+            return self._stats.model_copy()
@@ -1,4 +1,11 @@
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 import requests
+from requests.adapters import HTTPAdapter
+from typing import Optional
 from urllib.parse import urljoin
 from pluggy_py.exceptions import (
     GlobalErrorResponse,
@@ -9,12 +16,209 @@ from pluggy_py.exceptions import (
     InternalServerError,
     PluggyAPIError,
 )
+from pluggy_py.utils.single_flight import SingleFlight
+from pluggy_py.utils.circuit_breaker import CircuitBreaker
+from pluggy_py.utils.hedging import HedgingPolicy, endpoint_key
+from pluggy_py.utils.metrics import ClientMetrics
+from pluggy_py.utils.profiling import active_profiler, attributed_to, current_operation
+
+
+def _memoize_json(response: requests.Response) -> requests.Response:
+    """
+    Make response.json() decode the body only once per set of decoding options, so
+    that every caller sharing a coalesced response also shares the same parsed payload
+    (and a caller passing e.g. parse_float still gets its own decoding).
+    """
+    lock = threading.Lock()
+    parsed = {}
+    decode = response.json
+
+    def json(**kwargs):
+        key = tuple(sorted(kwargs.items()))
+        with lock:
+            if key not in parsed:
+                parsed[key] = decode(**kwargs)
+            return parsed[key]
+
+    response.json = json
+    return response
+
+
+def _run_in_thread(fn, *args) -> Future:
+    """Runs fn(*args) on a new daemon thread; a Future for when a pool could make it queue."""
+    future: Future = Future()
+
+    def run() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    threading.Thread(target=run, name="pluggy-hedge-primary", daemon=True).start()
+    return future
+
+
+def _close_response(future) -> None:
+    """Releases the connection of a hedged attempt that lost the race."""
+    if future.exception() is None:
+        future.result().close()
+
+
+# Every live HttpClient, so that a forked child can drop the connections it inherited.
+_instances: "weakref.WeakSet[HttpClient]" = weakref.WeakSet()
+
+
+def _reset_all_after_fork() -> None:
+    for client in list(_instances):
+        client._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_all_after_fork)
+
 
 class HttpClient:
-    def __init__(self, base_url: str, timeout: int = 30):
+    def __init__(
+        self,
+        base_url: str,
+        timeout: int = 30,
+        coalesce_gets: bool = False,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        pool_maxsize: int = 10,
+        thread_safe: bool = False,
+        hedging: Optional[HedgingPolicy] = None,
+        metrics: Optional[ClientMetrics] = None,
+    ):
+        """
+        :param base_url: Root URL of the Pluggy API.
+        :param timeout: Default per-request timeout, in seconds; every verb also accepts
+            a `timeout` override (used to propagate a Deadline's remaining budget).
+        :param coalesce_gets: When True, identical GETs (same path, params and headers,
+            which includes the API key) issued concurrently share one in-flight request
+            and one parsed result instead of each hitting the network.
+        :param circuit_breaker: Optional CircuitBreaker; while an endpoint family is failing,
+            its requests raise CircuitOpenError immediately instead of waiting on timeouts.
+        :param pool_maxsize: Connections kept alive per host; raise it when many threads
+            (or tenants, see PluggyClientPool) share this client.
+        :param thread_safe: When True, each thread gets its own requests.Session (and
+            connection pool), so one HttpClient can be shared freely by a thread pool.
+        :param hedging: Optional HedgingPolicy; slow GETs are then duplicated after a
+            latency percentile and the first response wins (see HedgingPolicy).
+        :param metrics: Optional ClientMetrics recording requests, latencies and errors
+            by exception class (plus pages fetched by paginated listings).
+
+        The client is fork-safe either way: a child process (gunicorn/celery prefork
+        workers, multiprocessing) never reuses sockets inherited from its parent - its
+        sessions are rebuilt on fork, or on first use if the fork hook did not run.
+        """
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
-        self.session = requests.Session()
+        self.pool_maxsize = pool_maxsize
+        self.thread_safe = thread_safe
+        self.circuit_breaker = circuit_breaker
+        self._single_flight = SingleFlight() if coalesce_gets else None
+        self.hedging = hedging
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_executor_lock = threading.Lock()
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.track_http_client(self)
+
+        self._pid = os.getpid()
+        self._sessions_lock = threading.Lock()
+        self._sessions = []
+        self._local = threading.local()
+        self._session = None if thread_safe else self._new_session()
+        _instances.add(self)
+
+    @property
+    def session(self) -> requests.Session:
+        """The session to use from the calling thread (and process)."""
+        if self._pid != os.getpid():
+            self._reset_after_fork()
+        if not self.thread_safe:
+            return self._session
+
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._new_session()
+            self._local.session = session
+        return session
+
+    @session.setter
+    def session(self, session: requests.Session) -> None:
+        """Replaces the session; in thread_safe mode, only the calling thread's."""
+        if self.thread_safe:
+            self._local.session = session
+        else:
+            self._session = session
+
+    def close(self) -> None:
+        """Closes every session (and pooled connection) created by this client."""
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
+        if not self.thread_safe:
+            self._session = self._new_session()
+
+    def _reset_after_fork(self) -> None:
+        """
+        Runs in a freshly forked child: forget (without closing, since the parent still
+        owns them) the sessions and sockets inherited from the parent, and recreate
+        locks that another parent thread may have been holding at fork time.
+        """
+        self._pid = os.getpid()
+        self._sessions_lock = threading.Lock()
+        self._sessions = []
+        self._local = threading.local()
+        self._session = None if self.thread_safe else self._new_session()
+        if self._single_flight is not None:
+            self._single_flight = SingleFlight()
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.after_fork()
+        self._hedge_executor_lock = threading.Lock()
+        self._hedge_executor = None
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        with self._sessions_lock:
+            self._sessions.append(session)
+        return session
+
+    def preconnect(self, connections: int = 4, timeout: Optional[float] = None) -> int:
+        """
+        Opens up to `connections` keep-alive connections to base_url ahead of time
+        (DNS, TCP and TLS included) by sending that many HEAD requests at once; they
+        stay in the calling thread's connection pool for the requests that follow.
+        Capped at pool_maxsize. Returns the number of requests that got a response.
+        Failures are swallowed: warming up must never break startup.
+        """
+        connections = max(1, min(connections, self.pool_maxsize))
+        session = self.session
+        barrier = threading.Barrier(connections)
+        opened = []
+
+        def connect() -> None:
+            try:
+                barrier.wait(timeout=self.timeout)
+                session.head(self.base_url + "/", timeout=self.timeout if timeout is None else timeout).close()
+                opened.append(True)
+            except (requests.RequestException, threading.BrokenBarrierError):
+                pass
+
+        threads = [threading.Thread(target=connect, daemon=True) for _ in range(connections)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return len(opened)
 
     def _get_full_url(self, path: str) -> str:
         return urljoin(self.base_url + "/", path.lstrip("/"))
@@ -52,27 +256,157 @@ class HttpClient:
             # If we want to handle other codes or if it’s an unrecognized code, just raise a generic error
             raise GlobalErrorResponse(code, code_description, message)
 
-    def get(self, path: str, params: dict = None, headers: dict = None) -> requests.Response:
+    def _request(
+        self,
+        method: str,
+        path: str,
+        timeout: Optional[float] = None,
+        session: Optional[requests.Session] = None,
+        **kwargs,
+    ) -> requests.Response:
         url = self._get_full_url(path)
-        resp = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
-        return self._handle_response(resp)
+        breaker = self.circuit_breaker
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.in_flight.inc()
+            started = time.monotonic()
+        resp = None
 
-    def post(self, path: str, json: dict = None, headers: dict = None) -> requests.Response:
-        url = self._get_full_url(path)
-        resp = self.session.post(url, json=json, headers=headers, timeout=self.timeout)
-        return self._handle_response(resp)
+        try:
+            family = breaker.before_request(path) if breaker is not None else None
+            healthy = None
+            try:
+                profiler = active_profiler()
+                sent = time.perf_counter()
+                resp = (session or self.session).request(
+                    method, url, timeout=self.timeout if timeout is None else timeout, **kwargs
+                )
+                if profiler is not None:
+                    profiler.instrument_response(resp, time.perf_counter() - sent)
+                response = self._handle_response(resp)
+                healthy = True
+            except Exception as exc:
+                # A timeout shortened below the default (by a Deadline) says nothing about the upstream.
+                shortened = timeout is not None and timeout < self.timeout
+                if not (shortened and isinstance(exc, requests.exceptions.Timeout)):
+                    healthy = breaker is None or not breaker.is_failure(exc)
+                raise
+            finally:
+                if breaker is not None:
+                    if healthy is None:
+                        breaker.release(family)
+                    elif healthy:
+                        breaker.record_success(family)
+                    else:
+                        breaker.record_failure(family)
+        except Exception as exc:
+            if metrics is not None:
+                status = resp.status_code if resp is not None else None
+                metrics.observe_request(method, path, time.monotonic() - started, status, error=exc)
+            raise
+        finally:
+            if metrics is not None:
+                metrics.in_flight.dec()
 
-    def put(self, path: str, json: dict = None, headers: dict = None) -> requests.Response:
-        url = self._get_full_url(path)
-        resp = self.session.put(url, json=json, headers=headers, timeout=self.timeout)
-        return self._handle_response(resp)
+        if metrics is not None:
+            metrics.observe_request(method, path, time.monotonic() - started, response.status_code)
+        return response
 
-    def delete(self, path: str, headers: dict = None) -> requests.Response:
-        url = self._get_full_url(path)
-        resp = self.session.delete(url, headers=headers, timeout=self.timeout)
-        return self._handle_response(resp)
+    def _hedged_get(self, path: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        """
+        GET that is sent a second time if the first attempt is slower than the policy's
+        latency percentile; returns the first successful response and closes the other.
 
-    def patch(self, path: str, json: dict = None, headers: dict = None) -> requests.Response:
-        url = self._get_full_url(path)
-        resp = self.session.patch(url, json=json, headers=headers, timeout=self.timeout)
-        return self._handle_response(resp)
+        The primary runs on a thread of its own (with the calling thread's session), so
+        it never queues behind other callers' work; only hedges go to the hedge executor.
+        """
+        policy = self.hedging
+        key = endpoint_key(path)
+        delay = policy.delay_for(key, timeout)
+
+        def attempt(session: Optional[requests.Session] = None) -> requests.Response:
+            started = time.monotonic()
+            response = self._request("GET", path, timeout=timeout, session=session, **kwargs)
+            policy.record(key, time.monotonic() - started)
+            return response
+
+        if delay is None:
+            return attempt()
+
+        # Attempts run on other threads, whose stacks have no resource method on them.
+        operation = current_operation() if active_profiler() is not None else None
+        session = self.session
+
+        def attributed_attempt(session: Optional[requests.Session] = None) -> requests.Response:
+            with attributed_to(operation):
+                return attempt(session)
+
+        primary = _run_in_thread(attributed_attempt, session)
+        done, _ = wait([primary], timeout=delay)
+        if done or not policy.try_hedge():
+            return primary.result()
+
+        if self.metrics is not None:
+            self.metrics.observe_retry(path, "hedge")
+        hedge = self._hedge_pool().submit(attributed_attempt)
+        pending = {primary, hedge}
+        first_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        policy.record_win()
+                    for loser in (pending | done) - {future}:
+                        loser.add_done_callback(_close_response)
+                    return future.result()
+                first_error = first_error or future.exception()
+        raise first_error
+
+    def _hedge_pool(self) -> ThreadPoolExecutor:
+        with self._hedge_executor_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=max(2, self.pool_maxsize), thread_name_prefix="pluggy-hedge"
+                )
+            return self._hedge_executor
+
+    def _get(self, path: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        if self.hedging is not None and self.hedging.applies_to(path):
+            return self._hedged_get(path, timeout=timeout, **kwargs)
+        return self._request("GET", path, timeout=timeout, **kwargs)
+
+    def get(
+        self, path: str, params: dict = None, headers: dict = None, timeout: Optional[float] = None
+    ) -> requests.Response:
+        if self._single_flight is None:
+            return self._get(path, timeout=timeout, params=params, headers=headers)
+
+        key = (
+            self._get_full_url(path),
+            tuple(sorted((k, str(v)) for k, v in (params or {}).items())),
+            tuple(sorted((k, str(v)) for k, v in (headers or {}).items())),
+        )
+
+        def fetch() -> requests.Response:
+            return _memoize_json(self._get(path, timeout=timeout, params=params, headers=headers))
+
+        return self._single_flight.do(key, fetch)
+
+    def post(
+        self, path: str, json: dict = None, headers: dict = None, timeout: Optional[float] = None
+    ) -> requests.Response:
+        return self._request("POST", path, timeout=timeout, json=json, headers=headers)
+
+    def put(
+        self, path: str, json: dict = None, headers: dict = None, timeout: Optional[float] = None
+    ) -> requests.Response:
+        return self._request("PUT", path, timeout=timeout, json=json, headers=headers)
+
+    def delete(self, path: str, headers: dict = None, timeout: Optional[float] = None) -> requests.Response:
+        return self._request("DELETE", path, timeout=timeout, headers=headers)
+
+    def patch(
+        self, path: str, json: dict = None, headers: dict = None, timeout: Optional[float] = None
+    ) -> requests.Response:
+        return self._request("PATCH", path, timeout=timeout, json=json, headers=headers)
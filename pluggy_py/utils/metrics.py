@@ -0,0 +1,332 @@
+import math
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pluggy_py.utils.hedging import endpoint_key
+
+# Prometheus' default latency buckets, in seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    # The exposition format spells these NaN, +Inf and -Inf (Python: nan, inf, -inf).
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_sample(name: str, labels: Dict[str, str], value: float) -> str:
+    if not labels:
+        return f"{name} {_format_value(value)}"
+    rendered = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+    return f"{name}{{{rendered}}} {_format_value(value)}"
+
+
+Collector = Callable[[], Iterable[Tuple[Dict[str, str], float]]]
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), callback: Optional[Collector] = None):
+        """
+        :param callback: Optional function returning (labels, value) pairs; when given,
+            it is called on every render instead of tracking values on the metric, to
+            export counts kept elsewhere (e.g. EntityCache.hits).
+        """
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._callback = callback
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        if self._callback is not None:
+            return [
+                (self.name, {name: str(labels[name]) for name in self.labelnames}, value)
+                for labels, value in self._callback()
+            ]
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in items]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(_format_sample(*sample) for sample in self.samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonic counter, one series per label combination."""
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, one series per label combination."""
+    type = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets, one series per label combination."""
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label combination: [count per bucket (the last one is +Inf)..., sum]
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            series[position] += 1
+            series[-1] += value
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return int(sum(series[:-1])) if series else 0
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        samples = []
+        for key, series in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (math.inf,), series[:-1]):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_sum", labels, series[-1]))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """A set of metrics rendered together in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = (), callback=None) -> Counter:
+        return self.register(Counter(name, help, labelnames, callback))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = (), callback=None) -> Gauge:
+        return self.register(Gauge(name, help, labelnames, callback))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Exposes render() at http://host:port/metrics from a daemon thread. Returns the
+        server; call server.shutdown() to stop it.
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="pluggy-metrics", daemon=True).start()
+        return server
+
+
+class ClientMetrics:
+    """
+    Client-side health metrics of the SDK, in Prometheus format and with no dependency
+    beyond the standard library.
+
+    Pass it as HttpClient(metrics=...) to count requests, latencies, errors by exception
+    class (BadRequestError, NotFoundError, ..., Timeout), hedged retries, requests in
+    flight, pages fetched by list_all_* calls per endpoint and, for a PluggyClientPool
+    built on that HttpClient, rate-quota waits. Entity caches and client pools are read
+    at scrape time once tracked:
+
+        metrics = ClientMetrics()
+        client = PluggyClient(id, secret, http_client=HttpClient(BASE_URL, metrics=metrics),
+                              entity_cache=cache)
+        metrics.track_cache(cache)
+        metrics.serve(9464)          # or metrics.render() from an existing web app
+
+    Endpoints are labelled by shape (/accounts/{id}) to keep series bounded.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None, namespace: str = "pluggy"):
+        self.registry = registry or MetricsRegistry()
+        self._caches: Dict[str, object] = {}
+        self._pools: Dict[str, object] = {}
+        self._http_clients: List[object] = []
+        self._lock = threading.Lock()
+
+        r, ns = self.registry, namespace
+        self.requests = r.counter(f"{ns}_requests_total", "HTTP requests sent", ("method", "endpoint", "status"))
+        self.request_seconds = r.histogram(
+            f"{ns}_request_duration_seconds", "HTTP request latency", ("method", "endpoint")
+        )
+        self.errors = r.counter(f"{ns}_errors_total", "Failed requests by exception class", ("endpoint", "error"))
+        self.retries = r.counter(f"{ns}_retries_total", "Requests sent again", ("endpoint", "reason"))
+        self.in_flight = r.gauge(f"{ns}_requests_in_flight", "Requests awaiting a response")
+        self.pages = r.counter(f"{ns}_pages_fetched_total", "Pages fetched by paginated listings", ("endpoint",))
+        self.page_rows = r.counter(f"{ns}_page_rows_total", "Rows received in paginated listings", ("endpoint",))
+        self.rate_limit_wait = r.histogram(
+            f"{ns}_rate_limit_wait_seconds", "Time spent waiting on a tenant's rate quota", ("tenant",)
+        )
+        r.gauge(f"{ns}_connection_pool_size", "Keep-alive connections allowed per host", callback=self._pool_size)
+        r.counter(f"{ns}_cache_hits_total", "Entity cache hits", ("cache",), callback=self._cache_stat("hits"))
+        r.counter(f"{ns}_cache_misses_total", "Entity cache misses", ("cache",), callback=self._cache_stat("misses"))
+        r.gauge(f"{ns}_cache_entries", "Entries held by the entity cache", ("cache",), callback=self._cache_stat(None))
+        r.gauge(
+            f"{ns}_pool_in_flight", "Requests in flight per client pool tenant", ("pool", "tenant"),
+            callback=self._tenant_stat("in_flight"),
+        )
+        r.gauge(
+            f"{ns}_pool_waiting", "Requests queued for a concurrency slot per tenant", ("pool", "tenant"),
+            callback=self._tenant_stat("waiting"),
+        )
+        r.counter(
+            f"{ns}_pool_queue_wait_seconds_total", "Time spent waiting for a concurrency slot per tenant",
+            ("pool", "tenant"), callback=self._tenant_stat("queue_wait_seconds"),
+        )
+
+    def observe_request(self, method: str, path: str, seconds: float, status: Optional[int] = None,
+                        error: Optional[BaseException] = None) -> None:
+        endpoint = endpoint_key(path)
+        self.requests.inc(method=method, endpoint=endpoint, status=status if status is not None else "error")
+        self.request_seconds.observe(seconds, method=method, endpoint=endpoint)
+        if error is not None:
+            self.errors.inc(endpoint=endpoint, error=type(error).__name__)
+
+    def observe_retry(self, path: str, reason: str) -> None:
+        self.retries.inc(endpoint=endpoint_key(path), reason=reason)
+
+    def observe_page(self, endpoint: str, rows: int) -> None:
+        endpoint = endpoint_key(endpoint)
+        self.pages.inc(endpoint=endpoint)
+        self.page_rows.inc(rows, endpoint=endpoint)
+
+    def observe_rate_limit_wait(self, tenant: str, seconds: float) -> None:
+        self.rate_limit_wait.observe(seconds, tenant=tenant)
+
+    def track_http_client(self, http_client) -> None:
+        with self._lock:
+            self._http_clients.append(http_client)
+
+    def track_cache(self, cache, name: str = "default") -> None:
+        """Reports an EntityCache's hits, misses and size at scrape time."""
+        with self._lock:
+            self._caches[name] = cache
+
+    def track_pool(self, pool, name: str = "default") -> None:
+        """Reports a PluggyClientPool's per-tenant usage at scrape time."""
+        with self._lock:
+            self._pools[name] = pool
+
+    def render(self) -> str:
+        return self.registry.render()
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        return self.registry.serve(port, host)
+
+    def _pool_size(self):
+        with self._lock:
+            clients = list(self._http_clients)
+        return [({}, sum(client.pool_maxsize for client in clients))] if clients else []
+
+    def _cache_stat(self, attribute: Optional[str]):
+        def collect():
+            with self._lock:
+                caches = list(self._caches.items())
+            return [
+                ({"cache": name}, len(cache) if attribute is None else getattr(cache, attribute))
+                for name, cache in caches
+            ]
+        return collect
+
+    def _tenant_stat(self, field: str):
+        def collect():
+            with self._lock:
+                pools = list(self._pools.items())
+            return [
+                ({"pool": name, "tenant": tenant}, getattr(usage, field))
+                for name, pool in pools
+                for tenant, usage in pool.stats().items()
+            ]
+        return collect
@@ -0,0 +1,326 @@
+import base64
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Type, TypeVar
+
+import requests
+from pydantic import BaseModel
+
+from pluggy_py.config import MAX_PAGE_SIZE
+from pluggy_py.utils.deadline import Deadline
+from pluggy_py.utils.checkpoints import CheckpointStore
+from pluggy_py.utils.profiling import parse_model
+
+PageModel = TypeVar("PageModel", bound=BaseModel)
+T = TypeVar("T")
+
+# Page sizes the adaptive pager moves between. Every size divides the one before it,
+# so after any number of pages at one size the rows already walked always line up with
+# a page boundary of the next smaller size - and often of the next bigger one.
+PAGE_SIZE_LADDER = (MAX_PAGE_SIZE, 250, 125, 25, 5)
+
+
+class AdaptivePageSizer:
+    """
+    Tunes `pageSize` per endpoint from observed page latency and body size.
+
+    Walks start at the API maximum (or at the size previously tuned for the endpoint)
+    and move one rung down PAGE_SIZE_LADDER whenever a page takes longer than
+    target_seconds or exceeds max_body_bytes, and one rung up when a page comes back
+    in under half the target. The last size chosen for an endpoint is remembered for
+    the rest of the process.
+    """
+
+    def __init__(
+        self,
+        target_seconds: float = 2.0,
+        max_body_bytes: int = 4 * 1024 * 1024,
+        ladder: Sequence[int] = PAGE_SIZE_LADDER,
+    ):
+        self.target_seconds = target_seconds
+        self.max_body_bytes = max_body_bytes
+        self.ladder = tuple(sorted(ladder, reverse=True))
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def initial_size(self, endpoint: str) -> int:
+        with self._lock:
+            return self._sizes.get(endpoint, self.ladder[0])
+
+    def next_size(self, endpoint: str, current: int, elapsed: float, body_bytes: int, offset: int) -> int:
+        """
+        Returns the page size to use for the page starting at row `offset`, given that
+        the page just fetched at size `current` took `elapsed` seconds and `body_bytes`.
+        """
+        rung = self.ladder.index(current) if current in self.ladder else len(self.ladder) - 1
+        if elapsed > self.target_seconds or body_bytes > self.max_body_bytes:
+            rung = min(rung + 1, len(self.ladder) - 1)
+        elif elapsed < self.target_seconds / 2 and body_bytes * 2 <= self.max_body_bytes:
+            rung = max(rung - 1, 0)
+
+        tuned = self.ladder[rung]
+        with self._lock:
+            self._sizes[endpoint] = tuned
+
+        # Page numbers are relative to the page size, so only switch to a size whose
+        # page boundaries include the current offset.
+        for size in self.ladder[rung:]:
+            if offset % size == 0:
+                return size
+        return current
+
+    def reset(self, endpoint: Optional[str] = None) -> None:
+        with self._lock:
+            if endpoint is None:
+                self._sizes.clear()
+            else:
+                self._sizes.pop(endpoint, None)
+
+
+# Shared by every resource so tuned sizes persist for the whole process.
+default_page_sizer = AdaptivePageSizer()
+
+
+class PagedResult(List[T]):
+    """
+    The rows collected by a list_all_* call. It behaves as a plain list. Every
+    list_all_* call accepts a `deadline`: once it expires or is cancelled, the walk
+    stops (see PageWalk) and the rows fetched so far are returned with `complete`
+    False and a `resume_token` that can be passed back to the same call to continue
+    where it stopped.
+
+    `resumed` is True when the walk did not start at page 1 (it continued from a
+    resume token or checkpoint): the rows are then only the tail of the listing, even
+    once `complete` is True.
+    """
+
+    def __init__(
+        self, rows=(), complete: bool = True, resume_token: Optional[str] = None, resumed: bool = False
+    ):
+        super().__init__(rows)
+        self.complete = complete
+        self.resume_token = resume_token
+        self.resumed = resumed
+
+
+def query_fingerprint(path: str, params: dict) -> str:
+    """Stable identifier of a listing query (path + filters, excluding paging)."""
+    canonical = json.dumps([path, sorted((k, str(v)) for k, v in params.items())])
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_resume_token(fingerprint: str, **state) -> str:
+    payload = json.dumps({"q": fingerprint, **state}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_resume_token(token: str, fingerprint: str) -> dict:
+    """Decodes a resume token, refusing tokens issued for a different query."""
+    try:
+        state = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Malformed resume token") from exc
+    if state.pop("q", None) != fingerprint:
+        raise ValueError("Resume token was issued for a different query")
+    return state
+
+
+class PageWalk:
+    """
+    Walks a paginated GET endpoint, yielding each parsed page until totalPages is reached.
+
+    The walk stops early, without raising, once `deadline` expires: requests are sent
+    with the remaining budget as their timeout, and a request cut short by that budget
+    is simply not counted. Afterwards `complete` tells whether the last page was reached
+    and `resume_token` (if not) encodes the next page for a later call. `resumed` tells
+    whether the walk started past page 1, i.e. earlier pages were not yielded by it.
+
+    With a checkpoint_store, progress is saved under the query fingerprint after each
+    page has been consumed, and a new walk of the same query starts from the page after
+    the last saved one. Only use it where each page is persisted as it is consumed:
+    pages consumed before a crash are not yielded again. A consumer that persists
+    pages in batches (e.g. sync_transactions) passes checkpoint_each_page=False and
+    calls checkpoint() once a batch is persisted.
+
+    If the listing's `total` changed since the checkpoint was written, rows may have
+    shifted between pages: by default ("restart") the walk starts over from page 1;
+    with on_total_change="continue" it carries on from the checkpoint. Either way
+    `total_changed` is set. The checkpoint is cleared once the walk completes.
+    """
+
+    def __init__(
+        self,
+        http,
+        path: str,
+        params: dict,
+        headers: dict,
+        page_model: Type[PageModel],
+        page_size: Optional[int] = None,
+        sizer: Optional[AdaptivePageSizer] = None,
+        endpoint: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        resume_token: Optional[str] = None,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        on_total_change: str = "restart",
+        checkpoint_each_page: bool = True,
+    ):
+        """
+        :param params: Query parameters of the listing, without page/pageSize.
+        :param page_size: Fixed page size. When None, the size is tuned adaptively by `sizer`
+            (the process-wide default_page_sizer unless given).
+        :param endpoint: Key under which the tuned size is remembered; defaults to `path`.
+            Pass a template (e.g. "/investments/{id}/transactions") for per-id paths.
+        :param deadline: Optional Deadline bounding the whole walk.
+        :param resume_token: Token from an earlier, incomplete walk of the same query.
+        :param checkpoint_store: Optional CheckpointStore persisting progress after each page.
+        :param on_total_change: "restart" or "continue"; see the class docstring.
+        :param checkpoint_each_page: When False, progress is only saved by checkpoint().
+        """
+        if on_total_change not in ("restart", "continue"):
+            raise ValueError("on_total_change must be 'restart' or 'continue'")
+
+        self.http = http
+        self.path = path
+        self.params = params
+        self.headers = headers
+        self.page_model = page_model
+        self.endpoint = endpoint or path
+        self.deadline = deadline
+        self.fingerprint = query_fingerprint(path, params)
+
+        self.adaptive = page_size is None
+        self.sizer = (sizer or default_page_sizer) if self.adaptive else None
+        self.page_size = page_size if page_size is not None else self.sizer.initial_size(self.endpoint)
+        self.page = 1
+        self.complete = False
+        self.checkpoint_store = checkpoint_store
+        self.on_total_change = on_total_change
+        self.checkpoint_each_page = checkpoint_each_page
+        self.total_changed = False
+        self.resumed = False
+        self._checkpoint_total: Optional[int] = None
+        self._last_page = None
+
+        if resume_token:
+            state = decode_resume_token(resume_token, self.fingerprint)
+            self.page, self.page_size = state["page"], state["pageSize"]
+        elif checkpoint_store is not None:
+            state = checkpoint_store.load(self.fingerprint)
+            if state:
+                self.page, self.page_size = state["page"], state["pageSize"]
+                self._checkpoint_total = state.get("total")
+        self.resumed = self.page != 1
+
+    @property
+    def resume_token(self) -> Optional[str]:
+        if self.complete:
+            return None
+        return encode_resume_token(self.fingerprint, page=self.page, pageSize=self.page_size)
+
+    def result(self, rows) -> PagedResult:
+        """Wraps the rows collected from this walk together with its completion state."""
+        return PagedResult(rows, complete=self.complete, resume_token=self.resume_token, resumed=self.resumed)
+
+    def __iter__(self) -> Iterator[PageModel]:
+        while not self.complete:
+            if self.deadline is not None and self.deadline.expired:
+                return
+
+            started = time.monotonic()
+            try:
+                response = self._fetch()
+            except requests.exceptions.Timeout:
+                if self.deadline is not None and self.deadline.expired:
+                    return
+                raise
+            if response is None:
+                return
+            page_response = parse_model(self.page_model, response.json())
+            elapsed = time.monotonic() - started
+
+            if self._checkpoint_total is not None:
+                expected_total, self._checkpoint_total = self._checkpoint_total, None
+                if page_response.total != expected_total:
+                    self.total_changed = True
+                    if self.on_total_change == "restart" and self.page != 1:
+                        self.page = 1
+                        self.resumed = False
+                        continue
+
+            if self.page >= page_response.totalPages:
+                self.complete = True
+            else:
+                offset = self.page * self.page_size
+                if self.adaptive:
+                    self.page_size = self.sizer.next_size(
+                        self.endpoint, self.page_size, elapsed, len(response.content), offset
+                    )
+                self.page = offset // self.page_size + 1
+
+            metrics = getattr(self.http, "metrics", None)
+            if metrics is not None:
+                metrics.observe_page(self.endpoint, len(getattr(page_response, "results", None) or ()))
+
+            self._last_page = page_response
+            yield page_response
+            if self.checkpoint_each_page:
+                self._save_checkpoint(page_response)
+
+    def checkpoint(self) -> None:
+        """Saves progress up to the last page yielded (see checkpoint_each_page)."""
+        if self._last_page is not None:
+            self._save_checkpoint(self._last_page)
+
+    def _save_checkpoint(self, page_response) -> None:
+        if self.checkpoint_store is None:
+            return
+        if self.complete:
+            self.checkpoint_store.clear(self.fingerprint)
+            return
+        self.checkpoint_store.save(self.fingerprint, {
+            "page": self.page,
+            "pageSize": self.page_size,
+            "total": page_response.total,
+            "totalPages": page_response.totalPages,
+        })
+
+    def _fetch(self):
+        params = {**self.params, "page": self.page, "pageSize": self.page_size}
+        if self.deadline is None:
+            return self.http.get(self.path, params=params, headers=self.headers)
+        timeout = self.deadline.timeout_for(self.http.timeout)
+        if timeout <= 0:
+            # The budget ran out since the expiry check; stop as if it had expired.
+            return None
+        return self.http.get(self.path, params=params, headers=self.headers, timeout=timeout)
+
+
+def iter_pages(
+    http,
+    path: str,
+    params: dict,
+    headers: dict,
+    page_model: Type[PageModel],
+    page_size: Optional[int] = None,
+    sizer: Optional[AdaptivePageSizer] = None,
+    endpoint: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
+    resume_token: Optional[str] = None,
+    checkpoint_store: Optional[CheckpointStore] = None,
+    on_total_change: str = "restart",
+    checkpoint_each_page: bool = True,
+) -> PageWalk:
+    """Iterates the pages of a listing; see PageWalk for the parameters."""
+    return PageWalk(
+        http, path, params, headers, page_model,
+        page_size=page_size,
+        sizer=sizer,
+        endpoint=endpoint,
+        deadline=deadline,
+        resume_token=resume_token,
+        checkpoint_store=checkpoint_store,
+        on_total_change=on_total_change,
+        checkpoint_each_page=checkpoint_each_page,
+    )
@@ -0,0 +1,199 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, TypeVar, Union
+
+from pydantic import BaseModel, Field
+
+from pluggy_py.exceptions import PipelineError
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class PipelineStats(BaseModel):
+    """Summary of a PagePipeline run."""
+    pages: int = 0
+    rows: int = 0
+    fetch_seconds: float = Field(0.0, description="Time fetchers spent producing pages")
+    consume_seconds: float = Field(0.0, description="Time consumers spent in the callback")
+    backpressure_seconds: float = Field(0.0, description="Time fetchers waited for room in the queue")
+    starved_seconds: float = Field(0.0, description="Time consumers waited for a page")
+    complete: bool = Field(True, description="False if a source stopped early (e.g. on a Deadline)")
+    resume_token: Optional[str] = Field(None, description="Resume token of the source, when there is exactly one")
+    resume_tokens: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Resume token of every source that stopped early, keyed by source name (or position)",
+    )
+
+
+class PagePipeline:
+    """
+    Overlaps fetching pages with processing them.
+
+    Each source (a PageWalk, whose pages are unwrapped to their `results`, or any
+    iterable of row batches) is drained on a background fetcher thread - at most
+    `fetchers` at a time - into a queue holding at most `max_pending` batches.
+    `consumers` threads take batches off the queue and pass them to the callback. When
+    consumers fall behind the queue fills up and fetchers block, so memory stays
+    bounded by max_pending batches however long the listing is.
+
+    The first exception raised on either side stops the whole pipeline: fetchers stop
+    before their next page, consumers stop before their next batch, and run() raises a
+    PipelineError carrying the original exception and the stage ("fetch" or "consume")
+    it came from.
+
+    Usage:
+        walk = iter_pages(http, "/transactions", {"accountId": account_id}, headers,
+                          PageResponseTransactions)
+        stats = PagePipeline(save_to_db, consumers=2).run([walk])
+    """
+
+    def __init__(
+        self,
+        consumer: Callable[[List[T]], None],
+        consumers: int = 1,
+        max_pending: int = 4,
+        fetchers: int = 4,
+    ):
+        """
+        :param consumer: Called with each batch of rows; may be called from several threads
+            at once when consumers > 1.
+        :param consumers: Number of consumer threads.
+        :param max_pending: Batches allowed to wait in the queue before fetchers block.
+        :param fetchers: Sources drained concurrently.
+        """
+        if consumers < 1 or max_pending < 1 or fetchers < 1:
+            raise ValueError("consumers, max_pending and fetchers must be at least 1")
+        self.consumer = consumer
+        self.consumers = consumers
+        self.max_pending = max_pending
+        self.fetchers = fetchers
+
+    def run(self, sources: Union[Sequence[Iterable[List[T]]], Mapping[str, Iterable[List[T]]]]) -> PipelineStats:
+        """
+        Drains every source through the consumers; blocks until done or until something fails.
+        Sources may be given as a mapping of name to source, in which case
+        stats.resume_tokens is keyed by those names instead of by position.
+        """
+        if isinstance(sources, Mapping):
+            names, sources = list(sources.keys()), list(sources.values())
+        else:
+            sources = list(sources)
+            names = [str(i) for i in range(len(sources))]
+        batches: "queue.Queue" = queue.Queue(maxsize=self.max_pending)
+        stop = threading.Event()
+        stats = PipelineStats()
+        stats_lock = threading.Lock()
+        errors: List[PipelineError] = []
+        source_queue: "queue.Queue" = queue.Queue()
+        for source in sources:
+            source_queue.put(source)
+
+        def fail(stage: str, exc: BaseException) -> None:
+            with stats_lock:
+                errors.append(PipelineError(stage, exc))
+            stop.set()
+
+        def put(item) -> bool:
+            """Blocks until there is room in the queue; False if the pipeline was stopped meanwhile."""
+            started = time.monotonic()
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.05)
+                    break
+                except queue.Full:
+                    continue
+            with stats_lock:
+                stats.backpressure_seconds += time.monotonic() - started
+            return not stop.is_set()
+
+        def fetch() -> None:
+            while not stop.is_set():
+                try:
+                    source = source_queue.get_nowait()
+                except queue.Empty:
+                    return
+                iterator = iter(source)
+                try:
+                    while not stop.is_set():
+                        started = time.monotonic()
+                        batch = next(iterator, _DONE)
+                        with stats_lock:
+                            stats.fetch_seconds += time.monotonic() - started
+                        if batch is _DONE or not put(getattr(batch, "results", batch)):
+                            break
+                except Exception as exc:
+                    fail("fetch", exc)
+                    return
+                finally:
+                    close = getattr(iterator, "close", None)
+                    if close is not None:
+                        close()
+
+        alive = [self.consumers]
+
+        def consume() -> None:
+            try:
+                drain()
+            finally:
+                with stats_lock:
+                    alive[0] -= 1
+                    last = alive[0] == 0
+                if last:
+                    # Nobody is left to take batches off the queue: unblock the fetchers.
+                    stop.set()
+
+        def drain() -> None:
+            while True:
+                started = time.monotonic()
+                while True:
+                    try:
+                        batch = batches.get(timeout=0.05)
+                        break
+                    except queue.Empty:
+                        if stop.is_set():
+                            return
+                with stats_lock:
+                    stats.starved_seconds += time.monotonic() - started
+                if batch is _DONE or stop.is_set():
+                    return
+                started = time.monotonic()
+                try:
+                    self.consumer(batch)
+                except BaseException as exc:
+                    fail("consume", exc)
+                    return
+                with stats_lock:
+                    stats.pages += 1
+                    stats.rows += len(batch)
+                    stats.consume_seconds += time.monotonic() - started
+
+        fetcher_threads = [
+            threading.Thread(target=fetch, name=f"pluggy-pipeline-fetch-{i}", daemon=True)
+            for i in range(max(1, min(self.fetchers, len(sources))))
+        ]
+        consumer_threads = [
+            threading.Thread(target=consume, name=f"pluggy-pipeline-consume-{i}", daemon=True)
+            for i in range(self.consumers)
+        ]
+        for thread in fetcher_threads + consumer_threads:
+            thread.start()
+        for thread in fetcher_threads:
+            thread.join()
+        for _ in consumer_threads:
+            if not put(_DONE):
+                break
+        for thread in consumer_threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+
+        walks = [(name, s) for name, s in zip(names, sources) if hasattr(s, "complete")]
+        stats.complete = all(walk.complete for _, walk in walks)
+        stats.resume_tokens = {name: walk.resume_token for name, walk in walks if not walk.complete}
+        if len(sources) == 1 and walks:
+            stats.resume_token = walks[0][1].resume_token
+        return stats
@@ -0,0 +1,266 @@
+import cProfile
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple, Type, TypeVar
+
+import requests
+from pydantic import BaseModel, Field
+
+NETWORK = "network"
+JSON = "json"
+VALIDATION = "validation"
+
+_RESOURCES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources") + os.sep
+UNATTRIBUTED = "(other)"
+
+# The Profiler currently running, if any; HttpClient and parse_model check it.
+_active: Optional["Profiler"] = None
+_activation_lock = threading.Lock()
+_local = threading.local()
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class OperationProfile(BaseModel):
+    """Time one resource method spent in each phase."""
+    operation: str = Field(..., description="Resource method, e.g. TransactionsResource.list_all_transactions")
+    requests: int = 0
+    response_bytes: int = 0
+    network_seconds: float = 0.0
+    json_seconds: float = Field(0.0, description="Time spent decoding response bodies")
+    validation_seconds: float = Field(0.0, description="Time spent building models from decoded payloads")
+
+    @property
+    def total_seconds(self) -> float:
+        return self.network_seconds + self.json_seconds + self.validation_seconds
+
+
+class ModelProfile(BaseModel):
+    """Validation cost of one model class."""
+    model: str
+    validations: int = 0
+    seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.seconds / self.validations if self.validations else 0.0
+
+
+class ProfileReport(BaseModel):
+    """Per-operation and per-model breakdown collected by a Profiler."""
+    wall_seconds: float = 0.0
+    operations: List[OperationProfile] = Field(default_factory=list)
+    models: List[ModelProfile] = Field(default_factory=list)
+
+    def table(self) -> str:
+        """The report as two plain-text tables, slowest first."""
+        lines = [
+            f"{'operation':<52} {'reqs':>6} {'MiB':>8} {'network s':>10} {'json s':>9} {'validate s':>10}",
+        ]
+        for op in self.operations:
+            lines.append(
+                f"{op.operation:<52} {op.requests:>6} {op.response_bytes / 2 ** 20:>8.2f} "
+                f"{op.network_seconds:>10.3f} {op.json_seconds:>9.3f} {op.validation_seconds:>10.3f}"
+            )
+        lines.append("")
+        lines.append(f"{'model':<52} {'count':>8} {'total s':>10} {'mean ms':>9}")
+        for model in self.models:
+            lines.append(
+                f"{model.model:<52} {model.validations:>8} {model.seconds:>10.3f} {model.mean_seconds * 1000:>9.3f}"
+            )
+        lines.append("")
+        lines.append(f"wall time: {self.wall_seconds:.3f}s")
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.table()
+
+
+def current_operation() -> str:
+    """
+    The outermost resource method on the calling thread's stack, e.g.
+    'LoansResource.list_all_loans'. Helpers a resource method runs on worker threads
+    are attributed to that method too (on Python 3.11+, through their qualified name).
+    """
+    operation = UNATTRIBUTED
+    frame = sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename.startswith(_RESOURCES_DIR):
+            qualname = getattr(code, "co_qualname", None)
+            if qualname is not None:
+                operation = ".".join(qualname.split(".<locals>.")[0].split(".")[:2])
+            elif "self" in frame.f_locals:
+                operation = f"{type(frame.f_locals['self']).__name__}.{code.co_name}"
+            else:
+                operation = code.co_name
+        frame = frame.f_back
+    return operation
+
+
+def active_profiler() -> Optional["Profiler"]:
+    return _active
+
+
+def parse_model(model: Type[M], data: dict) -> M:
+    """
+    model(**data), timed as validation of `model` while a Profiler is running. Used
+    wherever the SDK builds models from API payloads.
+    """
+    profiler = _active
+    if profiler is None:
+        return model(**data)
+    started = time.perf_counter()
+    try:
+        return model(**data)
+    finally:
+        profiler.record(VALIDATION, time.perf_counter() - started, model=model.__name__)
+
+
+@contextmanager
+def attributed_to(operation: Optional[str]):
+    """
+    Attributes what the calling thread records to `operation` (from current_operation()
+    on the thread that handed it work) instead of to its own stack.
+    """
+    previous = getattr(_local, "operation", None)
+    _local.operation = operation
+    try:
+        yield
+    finally:
+        _local.operation = previous
+
+
+class Profiler:
+    """
+    Opt-in profiling mode separating network I/O, JSON decoding and pydantic
+    validation, per resource method and per model class:
+
+        with Profiler(cprofile=True) as profiler:
+            client.loans.list_all_loans(item_id)
+            client.identity.find_by_item(item_id)
+        print(profiler.report().table())
+        profiler.dump_stats("sdk.prof")        # snakeviz / pstats
+        profiler.write_folded("sdk.folded")    # flamegraph.pl / speedscope
+
+    While running, every HttpClient times its requests (body download included) and
+    wraps response.json(), and the SDK times building each model from an API payload
+    (see parse_model), attributed to the model built (the page model for listings, e.g.
+    PageResponseTransactions). Other pydantic code in the process is left alone. Time is
+    attributed to the outermost resource method on the stack (see current_operation).
+
+    One Profiler runs at a time and it adds overhead of its own, so keep it out of
+    normal production traffic. cProfile only covers the thread that started profiling.
+    """
+
+    def __init__(self, cprofile: bool = False):
+        """
+        :param cprofile: Also run cProfile on the starting thread, for dump_stats().
+        """
+        self._lock = threading.Lock()
+        # (operation, phase, model) -> [count, seconds, bytes]
+        self._entries: Dict[Tuple[str, str, str], List[float]] = {}
+        self._cprofile = cProfile.Profile() if cprofile else None
+        self._started: Optional[float] = None
+        self._wall = 0.0
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        global _active
+        with _activation_lock:
+            if _active is not None:
+                raise RuntimeError("Another Profiler is already running")
+            _active = self
+        self._started = time.perf_counter()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def stop(self) -> None:
+        global _active
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        with _activation_lock:
+            if _active is not self:
+                return
+            _active = None
+        self._wall += time.perf_counter() - self._started
+
+    def record(self, phase: str, seconds: float, model: str = "", nbytes: int = 0) -> None:
+        key = (getattr(_local, "operation", None) or current_operation(), phase, model)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = [0, 0.0, 0]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] += nbytes
+
+    def instrument_response(self, response: requests.Response, seconds: float) -> requests.Response:
+        """Records a request's network time and times its response.json()."""
+        self.record(NETWORK, seconds, nbytes=len(response.content))
+        decode = response.json
+
+        def json(**kwargs):
+            started = time.perf_counter()
+            try:
+                return decode(**kwargs)
+            finally:
+                self.record(JSON, time.perf_counter() - started)
+
+        response.json = json
+        return response
+
+    def report(self) -> ProfileReport:
+        operations: Dict[str, OperationProfile] = {}
+        models: Dict[str, ModelProfile] = {}
+        with self._lock:
+            entries = list(self._entries.items())
+        for (operation, phase, model), (count, seconds, nbytes) in entries:
+            op = operations.setdefault(operation, OperationProfile(operation=operation))
+            if phase == NETWORK:
+                op.requests += count
+                op.response_bytes += nbytes
+                op.network_seconds += seconds
+            elif phase == JSON:
+                op.json_seconds += seconds
+            else:
+                op.validation_seconds += seconds
+                profile = models.setdefault(model, ModelProfile(model=model))
+                profile.validations += count
+                profile.seconds += seconds
+
+        wall = self._wall
+        if _active is self:
+            wall += time.perf_counter() - self._started
+        return ProfileReport(
+            wall_seconds=wall,
+            operations=sorted(operations.values(), key=lambda op: op.total_seconds, reverse=True),
+            models=sorted(models.values(), key=lambda profile: profile.seconds, reverse=True),
+        )
+
+    def dump_stats(self, path: str) -> None:
+        """Writes the cProfile data (pstats format); requires Profiler(cprofile=True)."""
+        if self._cprofile is None:
+            raise ValueError("cProfile was not enabled; use Profiler(cprofile=True)")
+        self._cprofile.dump_stats(path)
+
+    def write_folded(self, path: str) -> None:
+        """
+        Writes the breakdown as folded stacks ('operation;phase;model microseconds'),
+        the input format of flamegraph.pl, speedscope and inferno.
+        """
+        with self._lock:
+            entries = sorted(self._entries.items())
+        with open(path, "w", encoding="utf-8") as f:
+            for (operation, phase, model), (_, seconds, _) in entries:
+                stack = ";".join(part.replace(";", ":").replace(" ", "_") for part in (operation, phase, model) if part)
+                f.write(f"{stack} {max(1, round(seconds * 1e6))}\n")
@@ -0,0 +1,57 @@
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class _InFlightCall:
+    """State shared between the caller executing a request and the callers waiting on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls that share the same key into a single execution.
+
+    The first caller for a key runs the function; every caller that arrives while
+    that call is still in flight blocks until it finishes and receives the very same
+    result (or the very same exception). Once the call completes the key is released,
+    so later calls run again - nothing is cached beyond the lifetime of the request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _InFlightCall] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _InFlightCall()
+                self._calls[key] = call
+                self.executed += 1
+                is_leader = True
+            else:
+                self.shared += 1
+                is_leader = False
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
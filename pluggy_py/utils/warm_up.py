@@ -0,0 +1,49 @@
+from typing import Iterable, List, Type
+
+from pydantic import BaseModel, Field, ValidationError
+
+
+class WarmUpReport(BaseModel):
+    """What PluggyClient.warm_up() prepared, and how long it took."""
+    connections: int = Field(0, description="Pooled connections opened to base_url")
+    models: List[str] = Field(default_factory=list, description="Models whose validators were built")
+    seconds: float = 0.0
+
+
+def _with_nested(model: Type[BaseModel]) -> Iterable[Type[BaseModel]]:
+    """The model and every model reachable through its fields (e.g. Transaction -> Merchant)."""
+    seen = set()
+    stack = [model]
+    while stack:
+        current = stack.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        yield current
+        for field in current.model_fields.values():
+            pending = [field.annotation]
+            while pending:
+                annotation = pending.pop()
+                if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+                    stack.append(annotation)
+                pending.extend(getattr(annotation, "__args__", ()))
+
+
+def warm_up_models(models: Iterable[Type[BaseModel]]) -> List[str]:
+    """
+    Finishes building the validators of the given models (and their nested models)
+    so the first real response does not pay for it: models with unresolved forward
+    references are rebuilt, and each validator is run once on an empty payload to
+    load its code paths. Returns the names of the models prepared.
+    """
+    warmed = []
+    for model in models:
+        for current in _with_nested(model):
+            if not current.__pydantic_complete__:
+                current.model_rebuild()
+            try:
+                current.model_validate({})
+            except ValidationError:
+                pass
+            warmed.append(current.__name__)
+    return list(dict.fromkeys(warmed))
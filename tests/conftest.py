@@ -0,0 +1,80 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode("utf-8")
+
+    def json(self, **kwargs):
+        return self._payload
+
+
+class FakeHttp:
+    """Serves paginated listings from memory; `fail_on_page` raises once for that page."""
+
+    timeout = 30
+
+    def __init__(self, rows, fail_on_page=None):
+        self.rows = rows
+        self.fail_on_page = fail_on_page
+        self.calls = []
+
+    def get(self, path, params=None, headers=None, timeout=None):
+        params = params or {}
+        page, size = int(params.get("page", 1)), int(params.get("pageSize", 20))
+        self.calls.append((path, page, size))
+        if page == self.fail_on_page:
+            self.fail_on_page = None
+            raise ConnectionError(f"page {page} failed")
+        total = len(self.rows)
+        return FakeResponse({
+            "page": page,
+            "total": total,
+            "totalPages": max(1, -(-total // size)),
+            "results": self.rows[(page - 1) * size: page * size],
+        })
+
+
+class FilteringHttp(FakeHttp):
+    """A FakeHttp applying the ids/from/to filters of GET /transactions before paging."""
+
+    def get(self, path, params=None, headers=None, timeout=None):
+        params = params or {}
+        rows = self.rows
+        if "ids" in params:
+            wanted = set(params["ids"].split(","))
+            rows = [row for row in rows if row["id"] in wanted]
+        if "from" in params:
+            rows = [row for row in rows if row["date"][:10] >= params["from"]]
+        if "to" in params:
+            rows = [row for row in rows if row["date"][:10] <= params["to"]]
+        filtered = FakeHttp(rows)
+        response = filtered.get(path, params, headers, timeout)
+        self.calls.extend(filtered.calls)
+        return response
+
+
+def make_transaction(i, account_id="acc1", base=datetime(2024, 1, 1), **overrides):
+    row = {
+        "id": f"tx{i}",
+        "description": f"Purchase {i}",
+        "currencyCode": "BRL",
+        "amount": -10.0 - i % 7,
+        "date": (base + timedelta(hours=6 * i)).isoformat() + "Z",
+        "type": "DEBIT",
+        "accountId": account_id,
+        "category": "Food",
+        "categoryId": "01000000",
+    }
+    row.update(overrides)
+    return row
+
+
+@pytest.fixture
+def transaction_rows():
+    return [make_transaction(i) for i in range(1000)]
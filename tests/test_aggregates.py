@@ -0,0 +1,41 @@
+from pluggy_py.analytics.aggregates import MonthlyAggregates
+from pluggy_py.resources.transactions import TransactionsResource
+
+from conftest import FakeHttp, FakeResponse, make_transaction
+
+
+class TransactionHttp(FakeHttp):
+    """FakeHttp that also serves GET /transactions/{id}."""
+
+    def get(self, path, params=None, headers=None, timeout=None):
+        if path.startswith("/transactions/"):
+            transaction_id = path.rsplit("/", 1)[1]
+            return FakeResponse(next(row for row in self.rows if row["id"] == transaction_id))
+        return super().get(path, params, headers, timeout)
+
+
+def totals(aggregates):
+    return sum(row.count for row in aggregates.query()), round(sum(row.total for row in aggregates.query()), 2)
+
+
+def test_every_ingestion_path_applies_the_aggregates(transaction_rows):
+    expected = (len(transaction_rows), round(sum(row["amount"] for row in transaction_rows), 2))
+
+    listed = MonthlyAggregates()
+    TransactionsResource(FakeHttp(transaction_rows), "key", listed).list_all_transactions("acc1", page_size=100)
+    processed = MonthlyAggregates()
+    TransactionsResource(FakeHttp(transaction_rows), "key", processed).process_all_transactions(
+        ["acc1"], lambda page: None, page_size=100,
+    )
+    assert totals(listed) == totals(processed) == expected
+
+
+def test_retrieved_transactions_are_applied():
+    rows = [make_transaction(1), make_transaction(2, category="Travel", categoryId="02000000")]
+    aggregates = MonthlyAggregates()
+    resource = TransactionsResource(TransactionHttp(rows), "key", aggregates)
+    resource.retrieve_transaction("tx1")
+    resource.retrieve_transaction("tx1")
+    resource.retrieve_transaction("tx2")
+
+    assert [(row.category_id, row.count) for row in aggregates.query()] == [("01000000", 1), ("02000000", 1)]
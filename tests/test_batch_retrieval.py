@@ -0,0 +1,35 @@
+from pluggy_py.resources.transactions import TransactionsResource
+
+from conftest import FilteringHttp, make_transaction
+
+
+def resource(rows):
+    http = FilteringHttp(rows)
+    return TransactionsResource(http, "key"), http
+
+
+def test_results_follow_the_order_of_the_requested_ids():
+    transactions, http = resource([make_transaction(i) for i in range(50)])
+    wanted = ["tx42", "tx3", "tx17", "tx0"]
+
+    result = transactions.retrieve_transactions("acc1", wanted)
+    assert [t.id for t in result.results] == wanted
+    assert result.missing == []
+
+
+def test_ids_the_api_did_not_return_are_missing():
+    transactions, _ = resource([make_transaction(i) for i in range(10)])
+
+    result = transactions.retrieve_transactions("acc1", ["tx1", "gone", "tx2", "tx1", "also-gone"])
+    assert [t.id for t in result.results] == ["tx1", "tx2"]
+    assert result.missing == ["gone", "also-gone"]
+
+
+def test_ids_are_fetched_in_chunks():
+    transactions, http = resource([make_transaction(i) for i in range(250)])
+    wanted = [f"tx{i}" for i in range(249, -1, -1)]
+
+    result = transactions.retrieve_transactions("acc1", wanted, chunk_size=100, max_workers=2)
+    assert [t.id for t in result.results] == wanted
+    # One single-page request per chunk of at most 100 ids.
+    assert sorted(size for _, _, size in http.calls) == [50, 100, 100]
@@ -0,0 +1,38 @@
+import pytest
+
+from pluggy_py.models.transactions import Transaction
+from pluggy_py.storage.change_feed import ChangeDetector
+from pluggy_py.utils.pagination import PagedResult
+
+from conftest import make_transaction
+
+
+def transactions(ids):
+    return [Transaction(**make_transaction(i)) for i in ids]
+
+
+def test_full_listing_reports_deletions():
+    detector = ChangeDetector()
+    detector.detect("acc1", transactions(range(5)))
+    changes = detector.diff("acc1", PagedResult(transactions(range(1, 5))))
+    assert changes.deleted == ["tx0"]
+    assert changes.deletions_checked
+
+
+def test_resumed_listing_never_reports_deletions():
+    detector = ChangeDetector()
+    detector.detect("acc1", transactions(range(5)))
+    tail = PagedResult(transactions(range(3, 5)), complete=True, resumed=True)
+
+    changes = detector.diff("acc1", tail)
+    assert changes.deleted == []
+    assert not changes.deletions_checked
+    with pytest.raises(ValueError):
+        detector.diff("acc1", tail, complete=True)
+
+
+def test_incomplete_listing_keeps_missing_ids():
+    detector = ChangeDetector()
+    detector.detect("acc1", transactions(range(5)))
+    changes = detector.diff("acc1", PagedResult(transactions(range(2)), complete=False, resume_token="t"))
+    assert changes.deleted == []
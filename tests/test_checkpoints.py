@@ -0,0 +1,106 @@
+import os
+
+import pytest
+
+from pluggy_py.models.transactions import PageResponseTransactions
+from pluggy_py.resources.transactions import TransactionsResource
+from pluggy_py.storage.disk_store import DiskTransactionStore
+from pluggy_py.utils.checkpoints import FileCheckpointStore
+from pluggy_py.utils.pagination import iter_pages
+
+from conftest import FakeHttp
+
+
+def walk(http, store):
+    return iter_pages(
+        http, "/transactions", {"accountId": "acc1"}, {}, PageResponseTransactions, 100,
+        checkpoint_store=store,
+    )
+
+
+def test_resumed_walk_is_marked_resumed(tmp_path, transaction_rows):
+    store = FileCheckpointStore(str(tmp_path))
+    http = FakeHttp(transaction_rows, fail_on_page=3)
+
+    consumed = []
+    pages = walk(http, store)
+    with pytest.raises(ConnectionError):
+        for page in pages:
+            consumed.extend(page.results)
+    assert len(consumed) == 200
+    assert not pages.resumed
+
+    rows = []
+    pages = walk(http, store)
+    for page in pages:
+        rows.extend(page.results)
+    result = pages.result(rows)
+
+    assert len(result) == 800
+    assert result.complete and result.resumed
+    assert [t.id for t in consumed + rows] == [r["id"] for r in transaction_rows]
+    # The checkpoint is cleared once the walk completes.
+    assert not walk(http, store).resumed
+
+
+def test_list_all_transactions_has_no_checkpointing():
+    import inspect
+    assert "checkpoint_store" not in inspect.signature(TransactionsResource.list_all_transactions).parameters
+
+
+def test_sync_transactions_resumes_after_crash_without_losing_rows(tmp_path, transaction_rows):
+    checkpoints = FileCheckpointStore(str(tmp_path / "checkpoints"))
+    store = DiskTransactionStore(str(tmp_path / "store"))
+    http = FakeHttp(transaction_rows, fail_on_page=3)
+    resource = TransactionsResource(http, "key")
+
+    with pytest.raises(ConnectionError):
+        resource.sync_transactions(
+            "acc1", store, from_date="2024-01-01", page_size=100, checkpoint_store=checkpoints, buffer_rows=200
+        )
+    assert store.count("acc1") == 200
+
+    result = resource.sync_transactions(
+        "acc1", store, from_date="2024-01-01", page_size=100, checkpoint_store=checkpoints, buffer_rows=200
+    )
+    assert result.complete and result.resumed
+    assert store.count("acc1") == 1000
+
+
+def test_sync_transactions_accepts_newest_first_pages(tmp_path, transaction_rows):
+    store = DiskTransactionStore(str(tmp_path))
+    http = FakeHttp(transaction_rows[::-1])
+
+    TransactionsResource(http, "key").sync_transactions("acc1", store, page_size=100, buffer_rows=250)
+    assert [t.id for t in store.range("acc1")] == [r["id"] for r in transaction_rows]
+    assert store.synced_through("acc1") == store.last_date("acc1")
+
+
+def test_checkpointed_newest_first_sync_appends_in_date_order(tmp_path, transaction_rows, monkeypatch):
+    checkpoints = FileCheckpointStore(str(tmp_path / "checkpoints"))
+    store = DiskTransactionStore(str(tmp_path / "store"))
+    rewrites = []
+    monkeypatch.setattr(store, "_rewrite_tail", lambda *args: rewrites.append(args))
+
+    TransactionsResource(FakeHttp(transaction_rows[::-1]), "key").sync_transactions(
+        "acc1", store, page_size=100, buffer_rows=200, checkpoint_store=checkpoints
+    )
+    assert [t.id for t in store.range("acc1")] == [r["id"] for r in transaction_rows]
+    # Every buffer was older than the previous one, yet no stored row was rewritten.
+    assert rewrites == []
+    assert not os.listdir(tmp_path / "store" / "acc1" / "staging")
+
+
+def test_interrupted_sync_does_not_advance_the_sync_mark(tmp_path, transaction_rows):
+    store = DiskTransactionStore(str(tmp_path))
+    http = FakeHttp(transaction_rows[::-1], fail_on_page=5)
+    resource = TransactionsResource(http, "key")
+
+    with pytest.raises(ConnectionError):
+        resource.sync_transactions("acc1", store, page_size=100, buffer_rows=200)
+    assert store.count("acc1") == 400
+    assert store.synced_through("acc1") is None
+
+    # The next sync starts from scratch instead of from the newest stored row.
+    resource.sync_transactions("acc1", store, page_size=100)
+    assert store.count("acc1") == 1000
@@ -0,0 +1,161 @@
+import json
+
+import pytest
+import requests
+
+from pluggy_py.exceptions import CircuitOpenError, InternalServerError, NotFoundError
+from pluggy_py.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from pluggy_py.utils.http_client import HttpClient
+
+
+def response(status_code, payload=None):
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp._content = json.dumps(payload or {}).encode("utf-8")
+    resp._content_consumed = True
+    return resp
+
+
+class ScriptedSession:
+    """Answers each request with the next outcome: a status code or an exception to raise."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.requests = 0
+
+    def request(self, method, url, timeout=None, **kwargs):
+        self.requests += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return response(outcome)
+
+
+def make_client(*outcomes, **breaker_kwargs):
+    breaker = CircuitBreaker(**{"failure_threshold": 2, "recovery_timeout": 60.0, **breaker_kwargs})
+    client = HttpClient("https://api.example.com", timeout=30, circuit_breaker=breaker)
+    client.session = ScriptedSession(*outcomes)
+    return client, breaker
+
+
+def open_circuit(client):
+    for _ in range(2):
+        with pytest.raises(InternalServerError):
+            client.get("/accounts")
+
+
+def recover(breaker, monkeypatch):
+    import pluggy_py.utils.circuit_breaker as module
+    later = module.time.monotonic() + breaker.recovery_timeout
+    monkeypatch.setattr(module.time, "monotonic", lambda: later)
+
+
+def test_consecutive_failures_open_the_circuit_for_that_family_only():
+    client, breaker = make_client(500, 500, 200)
+    open_circuit(client)
+    assert breaker.state("/accounts/abc") == OPEN
+
+    with pytest.raises(CircuitOpenError):
+        client.get("/accounts")
+    assert client.session.requests == 2
+    assert client.get("/items").status_code == 200
+    assert breaker.state("/items") == CLOSED
+
+
+def test_client_errors_count_as_successes():
+    client, breaker = make_client(500, 404, 500)
+    with pytest.raises(InternalServerError):
+        client.get("/accounts")
+    with pytest.raises(NotFoundError):
+        client.get("/accounts")
+    with pytest.raises(InternalServerError):
+        client.get("/accounts")
+    assert breaker.state("/accounts") == CLOSED
+
+
+def test_half_open_probe_closes_or_reopens_the_circuit(monkeypatch):
+    client, breaker = make_client(500, 500, 500, 200)
+    open_circuit(client)
+    recover(breaker, monkeypatch)
+
+    with pytest.raises(InternalServerError):
+        client.get("/accounts")
+    assert breaker.state("/accounts") == OPEN
+
+    recover(breaker, monkeypatch)
+    assert client.get("/accounts").status_code == 200
+    assert breaker.state("/accounts") == CLOSED
+
+
+def test_half_open_admits_only_max_calls_probes(monkeypatch):
+    client, breaker = make_client(500, 500)
+    open_circuit(client)
+    recover(breaker, monkeypatch)
+
+    family = breaker.before_request("/accounts")
+    assert breaker.state("/accounts") == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("/accounts")
+    breaker.record_success(family)
+    assert breaker.state("/accounts") == CLOSED
+
+
+def test_timeouts_shortened_by_a_deadline_are_not_failures():
+    timeout = requests.exceptions.ReadTimeout()
+    client, breaker = make_client(timeout, timeout, timeout, timeout)
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.Timeout):
+            client.get("/accounts", timeout=0.5)
+    assert breaker.state("/accounts") == CLOSED
+
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.Timeout):
+            client.get("/accounts")
+    assert breaker.state("/accounts") == OPEN
+
+
+def test_interrupted_probe_does_not_leave_the_circuit_stuck_half_open(monkeypatch):
+    client, breaker = make_client(500, 500, KeyboardInterrupt(), 200)
+    open_circuit(client)
+    recover(breaker, monkeypatch)
+
+    with pytest.raises(KeyboardInterrupt):
+        client.get("/accounts")
+    assert breaker.state("/accounts") == HALF_OPEN
+    assert client.get("/accounts").status_code == 200
+    assert breaker.state("/accounts") == CLOSED
+
+
+def test_requests_admitted_before_the_circuit_opened_do_not_change_it(monkeypatch):
+    client, breaker = make_client(500, 500)
+    slow_success = breaker.before_request("/accounts")
+    slow_failure = breaker.before_request("/accounts")
+    open_circuit(client)
+
+    # Requests sent while the circuit was closed complete after it opened.
+    breaker.record_success(slow_success)
+    assert breaker.state("/accounts") == OPEN
+
+    recover(breaker, monkeypatch)
+    probe = breaker.before_request("/accounts")
+    breaker.record_failure(slow_failure)
+    breaker.release(slow_failure)
+    assert breaker.state("/accounts") == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("/accounts")
+
+    breaker.record_success(probe)
+    assert breaker.state("/accounts") == CLOSED
+
+
+def test_probes_of_an_earlier_opening_are_ignored(monkeypatch):
+    client, breaker = make_client(500, 500, half_open_max_calls=2)
+    open_circuit(client)
+    recover(breaker, monkeypatch)
+
+    first, second = breaker.before_request("/accounts"), breaker.before_request("/accounts")
+    breaker.record_failure(first)
+    assert breaker.state("/accounts") == OPEN
+    # The other probe of that opening answers late: the circuit stays open.
+    breaker.record_success(second)
+    assert breaker.state("/accounts") == OPEN
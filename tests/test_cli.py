@@ -0,0 +1,78 @@
+import csv
+import json
+from types import SimpleNamespace
+
+from pluggy_py.cli import MODELS, _export_item, _RecordWriter
+from pluggy_py.models.transactions import Transaction
+from pluggy_py.resources.transactions import TransactionsResource
+
+from conftest import FakeHttp, make_transaction
+
+
+def test_csv_keeps_nested_values_as_json(tmp_path):
+    path = tmp_path / "transactions.csv"
+    writer = _RecordWriter(str(path), "csv", MODELS["transactions"])
+    transaction = Transaction(**make_transaction(1, merchant={"name": "Shop", "cnpj": "1"}))
+    writer.write_page("item1", [transaction])
+    writer.close()
+
+    with open(path, encoding="utf-8", newline="") as f:
+        (row,) = list(csv.DictReader(f))
+    assert row["_itemId"] == "item1"
+    assert row["id"] == "tx1"
+    assert json.loads(row["merchant"]) == transaction.merchant.model_dump(mode="json")
+
+
+class RoutedHttp:
+    """One FakeHttp per listing path; `before_get` runs before every request."""
+
+    timeout = 30
+
+    def __init__(self, routes, before_get=None):
+        self.routes = routes
+        self.before_get = before_get or (lambda path, params: None)
+
+    def get(self, path, params=None, headers=None, timeout=None):
+        self.before_get(path, params)
+        return self.routes.get(path, FakeHttp([])).get(path, params, headers, timeout)
+
+
+def account_row(i, type="BANK"):
+    return {"id": f"acc{i}", "itemId": "item1", "type": type, "name": f"Account {i}", "balance": 0.0, "number": str(i)}
+
+
+def make_writers(tmp_path, names):
+    return {name: _RecordWriter(str(tmp_path / f"{name}.ndjson"), "ndjson", MODELS[name]) for name in names}
+
+
+def test_export_item_goes_through_the_resources(tmp_path, transaction_rows):
+    routes = {"/accounts": FakeHttp([account_row(1, type="CREDIT")]), "/bills": FakeHttp([])}
+    http = RoutedHttp({**routes, "/transactions": FakeHttp(transaction_rows)})
+    client = SimpleNamespace(api_key="key", transactions=TransactionsResource(http, "key"))
+    writers = make_writers(tmp_path, ("accounts", "transactions", "bills"))
+    _export_item(client, http, "item1", ["accounts", "transactions", "bills"], writers, None, None)
+    for writer in writers.values():
+        writer.close()
+
+    assert writers["accounts"].count == 1
+    assert writers["transactions"].count == len(transaction_rows)
+    assert [call[0] for call in routes["/bills"].calls] == ["/bills"]
+
+
+def test_listings_are_written_before_their_last_page_is_fetched(tmp_path):
+    accounts = FakeHttp([account_row(i) for i in range(1200)])
+    written_before = []
+    writers = make_writers(tmp_path, ("accounts",))
+
+    def before_get(path, params):
+        written_before.append((params["page"], writers["accounts"].count))
+
+    http = RoutedHttp({"/accounts": accounts}, before_get)
+    _export_item(SimpleNamespace(api_key="key"), http, "item1", ["accounts"], writers, None, None)
+    writers["accounts"].close()
+
+    assert writers["accounts"].count == 1200
+    assert len(written_before) > 1
+    # Every page was on disk before the next one was requested.
+    sizes = [size for _, _, size in accounts.calls]
+    assert [count for _, count in written_before] == [sum(sizes[:k]) for k in range(len(sizes))]
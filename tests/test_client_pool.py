@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+from pluggy_py.client_pool import PluggyClientPool, TenantQuota
+from pluggy_py.exceptions import TenantRemovedError
+
+
+class BlockingHttp:
+    """Shared HttpClient stand-in whose GETs block until released."""
+
+    timeout = 30
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = []
+        self.preconnected = 0
+
+    def get(self, path, **kwargs):
+        self.started.append(path)
+        self.release.wait(5)
+        return path
+
+    def preconnect(self, connections=4, timeout=None):
+        self.preconnected += connections
+        return connections
+
+
+def run(fn, *args):
+    outcome = {}
+
+    def target():
+        try:
+            outcome["value"] = fn(*args)
+        except Exception as exc:
+            outcome["error"] = exc
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread, outcome
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met")
+        time.sleep(0.005)
+
+
+def test_removing_a_tenant_fails_its_queued_requests():
+    shared = BlockingHttp()
+    pool = PluggyClientPool("http://api", max_concurrency=4, http_client=shared)
+    http = pool.add_tenant("t1", "id", "secret", TenantQuota(max_concurrency=1))._http
+
+    first, first_outcome = run(http.get, "/first")
+    wait_until(lambda: shared.started == ["/first"])
+    queued, queued_outcome = run(http.get, "/queued")
+    wait_until(lambda: pool.stats()["t1"].waiting == 1)
+
+    pool.remove_tenant("t1")
+    queued.join(1)
+    assert not queued.is_alive()
+    assert isinstance(queued_outcome["error"], TenantRemovedError)
+
+    shared.release.set()
+    first.join(1)
+    assert first_outcome["value"] == "/first"
+    with pytest.raises(TenantRemovedError):
+        http.get("/after")
+
+
+def test_slots_rotate_between_tenants():
+    shared = BlockingHttp()
+    pool = PluggyClientPool("http://api", max_concurrency=1, http_client=shared)
+    busy = pool.add_tenant("busy", "id", "secret", TenantQuota(max_concurrency=4))._http
+    quiet = pool.add_tenant("quiet", "id", "secret", TenantQuota(max_concurrency=4))._http
+
+    threads = [run(busy.get, "/busy0")[0]]
+    wait_until(lambda: len(shared.started) == 1)
+    threads += [run(busy.get, f"/busy{i}")[0] for i in range(1, 4)]
+    wait_until(lambda: pool.stats()["busy"].waiting == 3)
+    threads.append(run(quiet.get, "/quiet")[0])
+    wait_until(lambda: pool.stats()["quiet"].waiting == 1)
+
+    shared.release.set()
+    for thread in threads:
+        thread.join(1)
+    # The quiet tenant is served right after the request in flight, ahead of the busy backlog.
+    assert shared.started[1] == "/quiet"
+
+
+def test_remaining_tenants_keep_being_served_after_a_removal():
+    shared = BlockingHttp()
+    shared.release.set()
+    pool = PluggyClientPool("http://api", max_concurrency=2, http_client=shared)
+    pool.add_tenant("t1", "id", "secret")
+    http = pool.add_tenant("t2", "id", "secret")._http
+    pool.remove_tenant("t1")
+    assert http.get("/ok") == "/ok"
+    assert pool.tenant_ids == ["t2"]
+
+
+def test_preconnect_reaches_the_shared_client():
+    shared = BlockingHttp()
+    pool = PluggyClientPool("http://api", http_client=shared)
+    client = pool.add_tenant("t1", "id", "secret")
+    assert client._http.preconnect(3) == 3
+    assert shared.preconnected == 3
+
+
+def test_default_shared_client_is_thread_safe():
+    assert PluggyClientPool("http://api")._http.thread_safe
@@ -0,0 +1,34 @@
+import copy
+import pickle
+
+from pluggy_py.models.transactions import Transaction
+from pluggy_py.storage.compact import CompactTransactionStore
+
+from conftest import make_transaction
+
+
+def make_store():
+    rows = [make_transaction(i, merchant={"name": "Shop"}) for i in range(3)]
+    rows.append(make_transaction(3, description=None, descriptionRaw="RAW 3"))
+    return rows, CompactTransactionStore(Transaction(**row) for row in rows)
+
+
+def test_rows_round_trip():
+    rows, store = make_store()
+    assert [t.to_transaction() for t in store] == [Transaction(**row) for row in rows]
+    assert store[3].description is None and store[3].descriptionRaw == "RAW 3"
+    assert store.get("tx1").description == "Purchase 1"
+
+
+def test_views_can_be_copied_and_pickled():
+    _, store = make_store()
+    view = store[1]
+    assert copy.copy(view) == view
+    assert copy.deepcopy(view).id == "tx1"
+    assert pickle.loads(pickle.dumps(view)).amount == view.amount
+
+
+def test_descriptions_are_not_interned():
+    _, store = make_store()
+    assert "Purchase 1" not in store._strings.values
+    assert "Food" in store._strings.values
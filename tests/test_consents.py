@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+
+from pluggy_py.analytics.consents import ConsentExpiryIndex
+from pluggy_py.models.consents import Consent
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def consent(consent_id, item_id, days):
+    return Consent(id=consent_id, itemId=item_id, expiresAt=NOW + timedelta(days=days))
+
+
+class FakeConsents:
+    def __init__(self, by_item):
+        self.by_item = by_item
+        self.on_fetch = None
+        self.fetched = []
+
+    def list_all_consents(self, item_id):
+        self.fetched.append(item_id)
+        if self.on_fetch is not None:
+            self.on_fetch(item_id)
+        return list(self.by_item[item_id])
+
+
+def test_item_marked_during_its_fetch_stays_stale():
+    resource = FakeConsents({"item1": [consent("c1", "item1", 5)]})
+    index = ConsentExpiryIndex(resource)
+    index.scan(["item1"])
+
+    index.mark_changed("item1")
+    resource.on_fetch = index.mark_changed
+    assert index.refresh() == 1
+
+    resource.on_fetch = None
+    resource.by_item["item1"] = [consent("c1", "item1", 40)]
+    assert index.refresh() == 1
+    assert index.refresh() == 0
+    assert [c.id for c in index.expiring_between(NOW, NOW + timedelta(days=60))] == ["c1"]
+    assert index.expiring_within(10, now=NOW) == []
+
+
+def test_duplicate_consent_ids_are_indexed_once():
+    duplicate = consent("c1", "item1", 5)
+    resource = FakeConsents({"item1": [duplicate, duplicate, consent("c2", "item1", 7)]})
+    index = ConsentExpiryIndex(resource)
+    index.scan(["item1"])
+    assert len(index) == 2
+
+    index.mark_changed("item1")
+    resource.by_item["item1"] = [consent("c2", "item1", 7)]
+    index.refresh()
+    assert [c.id for c in index.expiring_within(30, now=NOW)] == ["c2"]
+
+
+def test_consent_listed_under_two_items_is_indexed_once():
+    shared = consent("c1", "item1", 5)
+    resource = FakeConsents({"item1": [shared], "item2": [shared]})
+    index = ConsentExpiryIndex(resource)
+    index.scan(["item1", "item2"])
+    assert len(index) == 1
+
+    index.remove_item("item1")
+    assert len(index) == 0
+    # item2 still lists c1 but it is no longer indexed; refreshing it must not fail.
+    index.mark_changed("item2")
+    assert index.refresh() == 1
+    assert [c.id for c in index.expiring_within(30, now=NOW)] == ["c1"]
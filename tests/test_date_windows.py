@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+
+from pluggy_py.resources.transactions import TransactionsResource
+from pluggy_py.utils.date_windows import merge_windows_by_density, month_windows
+
+from conftest import FilteringHttp, make_transaction
+
+
+def test_month_windows_split_on_calendar_months():
+    assert month_windows("2024-01-15", "2024-03-10") == [
+        (date(2024, 1, 15), date(2024, 1, 31)),
+        (date(2024, 2, 1), date(2024, 2, 29)),
+        (date(2024, 3, 1), date(2024, 3, 10)),
+    ]
+
+
+def test_month_windows_boundaries():
+    # Across a year end, and ending on the last day of a month.
+    assert month_windows("2023-12-31", "2024-01-31") == [
+        (date(2023, 12, 31), date(2023, 12, 31)),
+        (date(2024, 1, 1), date(2024, 1, 31)),
+    ]
+    assert month_windows("2023-02-01", "2023-02-28") == [(date(2023, 2, 1), date(2023, 2, 28))]
+    assert month_windows(date(2024, 5, 5), "2024-05-05T23:59:59Z") == [(date(2024, 5, 5), date(2024, 5, 5))]
+    assert month_windows("2024-02-01", "2024-01-31") == []
+
+
+def test_merge_windows_by_density():
+    windows = month_windows("2024-01-01", "2024-06-30")
+    counts = [10, 0, 30, 2500, 5, 5]
+
+    assert merge_windows_by_density(windows, counts, target_rows=100) == [
+        # January and March merge across the empty February, which is dropped.
+        (date(2024, 1, 1), date(2024, 3, 31)),
+        # A window above the target keeps its own window.
+        (date(2024, 4, 1), date(2024, 4, 30)),
+        (date(2024, 5, 1), date(2024, 6, 30)),
+    ]
+    assert merge_windows_by_density(windows, counts, target_rows=40) == [
+        (date(2024, 1, 1), date(2024, 3, 31)),
+        (date(2024, 4, 1), date(2024, 4, 30)),
+        (date(2024, 5, 1), date(2024, 6, 30)),
+    ]
+    assert merge_windows_by_density(windows, counts, target_rows=39) == [
+        (date(2024, 1, 1), date(2024, 1, 31)),
+        (date(2024, 3, 1), date(2024, 3, 31)),
+        (date(2024, 4, 1), date(2024, 4, 30)),
+        (date(2024, 5, 1), date(2024, 6, 30)),
+    ]
+    assert merge_windows_by_density(windows, [0] * 6, target_rows=100) == []
+
+
+class OverlappingHttp(FilteringHttp):
+    """Starts every date window a day early, so rows at window edges are returned twice."""
+
+    def get(self, path, params=None, headers=None, timeout=None):
+        params = dict(params or {})
+        if "from" in params:
+            params["from"] = (date.fromisoformat(params["from"]) - timedelta(days=1)).isoformat()
+        return super().get(path, params, headers, timeout)
+
+
+def test_backfill_yields_rows_repeated_across_windows_once():
+    # Four rows a day from 2024-01-01 to early March.
+    rows = [make_transaction(i) for i in range(250)]
+    transactions = TransactionsResource(OverlappingHttp(rows), "key")
+
+    for window in ("month", "adaptive"):
+        result = transactions.backfill_transactions(
+            "acc1", "2024-01-01", "2024-03-31", window=window, target_rows_per_window=150, max_workers=2
+        )
+        assert [t.id for t in result] == [row["id"] for row in rows]
+        assert result.complete
@@ -0,0 +1,58 @@
+from pluggy_py.models.transactions import PageResponseTransactions
+from pluggy_py.resources.transactions import TransactionsResource
+from pluggy_py.utils.deadline import CancellationToken, Deadline
+from pluggy_py.utils.pagination import iter_pages
+
+from conftest import FakeHttp
+
+
+class CancellingHttp(FakeHttp):
+    """Cancels `token` once `calls` pages have been served."""
+
+    def __init__(self, rows, token, calls):
+        super().__init__(rows)
+        self.token = token
+        self.cancel_after = calls
+
+    def get(self, path, params=None, headers=None, timeout=None):
+        response = super().get(path, params, headers, timeout)
+        if len(self.calls) >= self.cancel_after:
+            self.token.cancel()
+        return response
+
+
+def test_budget_spent_after_expiry_check_returns_partial_result(transaction_rows):
+    class RacyDeadline(Deadline):
+        # Still reports time left when checked, but has none by the time the request is sent.
+        expired = False
+
+    http = FakeHttp(transaction_rows)
+    deadline = RacyDeadline(0)
+    pages = iter_pages(http, "/transactions", {"accountId": "acc1"}, {}, PageResponseTransactions, 100,
+                       deadline=deadline)
+    rows = [row for page in pages for row in page.results]
+    result = pages.result(rows)
+
+    assert http.calls == []
+    assert not result.complete
+    assert result.resume_token is not None
+
+
+def test_process_all_transactions_returns_a_resume_token_per_account(transaction_rows):
+    token = CancellationToken()
+    http = CancellingHttp(transaction_rows, token, calls=3)
+    resource = TransactionsResource(http, "key")
+    seen = []
+
+    stats = resource.process_all_transactions(
+        ["acc1", "acc2"], seen.extend, fetchers=1, page_size=100, deadline=Deadline(token=token),
+    )
+    assert not stats.complete
+    assert set(stats.resume_tokens) == {"acc1", "acc2"}
+    assert stats.resume_token is None
+
+    stats = resource.process_all_transactions(
+        list(stats.resume_tokens), seen.extend, page_size=100, resume_tokens=stats.resume_tokens,
+    )
+    assert stats.complete and stats.resume_tokens == {}
+    assert len(seen) == 2 * len(transaction_rows)
@@ -0,0 +1,183 @@
+import os
+from array import array
+
+import pytest
+
+from pluggy_py.models.transactions import Transaction
+from pluggy_py.storage import disk_store
+from pluggy_py.storage.disk_store import DiskTransactionStore
+
+from conftest import make_transaction
+
+
+def transactions(ids, **overrides):
+    return [Transaction(**make_transaction(i, **overrides)) for i in ids]
+
+
+def stored_ids(store, account_id="acc1"):
+    return [t.id for t in store.range(account_id)]
+
+
+def test_batches_in_any_order_are_kept_in_date_order(tmp_path):
+    store = DiskTransactionStore(str(tmp_path))
+    for start in (300, 0, 200, 100):
+        store.append_account("acc1", transactions(range(start, start + 100)))
+
+    rows = list(store.range("acc1"))
+    assert [t.id for t in rows] == [f"tx{i}" for i in range(400)]
+    assert [t.date for t in rows] == sorted(t.date for t in rows)
+
+
+def test_resynced_rows_replace_stored_ones(tmp_path):
+    store = DiskTransactionStore(str(tmp_path))
+    store.append_account("acc1", transactions(range(100)))
+    store.append_account("acc1", transactions(range(40, 60), description="changed"))
+
+    assert store.count("acc1") == 100
+    changed = [t for t in store.range("acc1") if t.description == "changed"]
+    assert [t.id for t in changed] == [f"tx{i}" for i in range(40, 60)]
+
+
+def test_range_bounds(tmp_path):
+    store = DiskTransactionStore(str(tmp_path))
+    store.append_account("acc1", transactions(range(3000)))
+    # make_transaction spaces rows 6 hours apart from 2024-01-01.
+    rows = store.range("acc1", "2024-01-02", "2024-01-03")
+    assert [t.id for t in rows] == ["tx4", "tx5", "tx6", "tx7"]
+    assert store.range("acc1", "2030-01-01").dates.tolist() == []
+
+
+def test_crash_before_the_tail_journal_keeps_previous_rows(tmp_path, monkeypatch):
+    store = DiskTransactionStore(str(tmp_path))
+    store.append_account("acc1", transactions(range(100)))
+
+    def crash(path, chunks):
+        raise OSError("crash while writing the journal")
+
+    monkeypatch.setattr(disk_store, "_write_durably", crash)
+    with pytest.raises(OSError):
+        store.append_account("acc1", transactions(range(10, 20), description="changed"))
+    monkeypatch.undo()
+
+    reopened = DiskTransactionStore(str(tmp_path))
+    assert stored_ids(reopened) == [f"tx{i}" for i in range(100)]
+    assert all(t.description != "changed" for t in reopened.range("acc1"))
+
+
+def test_tail_journal_is_replayed_on_reopen(tmp_path, monkeypatch):
+    store = DiskTransactionStore(str(tmp_path))
+    store.append_account("acc1", transactions(range(100)))
+
+    def crash(self):
+        raise OSError("crash before the columns were overwritten")
+
+    monkeypatch.setattr(disk_store._Account, "_replay_tail_journal", crash)
+    with pytest.raises(OSError):
+        store.append_account("acc1", transactions(range(10, 20), description="changed"))
+    monkeypatch.undo()
+
+    reopened = DiskTransactionStore(str(tmp_path))
+    assert stored_ids(reopened) == [f"tx{i}" for i in range(100)]
+    changed = [t.id for t in reopened.range("acc1") if t.description == "changed"]
+    assert changed == [f"tx{i}" for i in range(10, 20)]
+    assert disk_store.TAIL_JOURNAL not in os.listdir(tmp_path / "acc1")
+
+
+def test_partial_in_place_append_is_dropped_on_reopen(tmp_path):
+    store = DiskTransactionStore(str(tmp_path))
+    store.append_account("acc1", transactions(range(100)))
+    # Simulate a crash after some columns of a later batch were written: the date
+    # column is written last, so the extra amount rows must be discarded.
+    with open(tmp_path / "acc1" / "amount.col", "ab") as f:
+        f.write(bytes(8 * 5))
+
+    reopened = DiskTransactionStore(str(tmp_path))
+    assert reopened.count("acc1") == 100
+    assert stored_ids(reopened) == [f"tx{i}" for i in range(100)]
+
+
+def test_views_survive_a_rewrite(tmp_path):
+    store = DiskTransactionStore(str(tmp_path))
+    store.append_account("acc1", transactions(range(100)))
+    before = store.range("acc1")
+    amounts = before.amounts.tolist()
+
+    store.append_account("acc1", transactions(range(50, 150), amount=-1.0))
+    # The head is untouched; the rewritten tail is visible through the same mapping.
+    assert before.amounts.tolist() == amounts[:50] + [-1.0] * 50
+    assert store.range("acc1").amounts.tolist() == amounts[:50] + [-1.0] * 100
+
+
+def test_overlapping_append_only_writes_the_tail(tmp_path, monkeypatch):
+    store = DiskTransactionStore(str(tmp_path))
+    store.append_account("acc1", transactions(range(20_000)))
+
+    written = []
+
+    class CountingFile:
+        def __init__(self, f):
+            self._f = f
+
+        def write(self, data):
+            written.append(memoryview(data).nbytes)
+            return self._f.write(data)
+
+        def __getattr__(self, name):
+            return getattr(self._f, name)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return self._f.__exit__(*exc)
+
+    monkeypatch.setattr(disk_store, "open", lambda *args, **kwargs: CountingFile(open(*args, **kwargs)), raising=False)
+    store.append_account("acc1", transactions([19_999], description="changed"))
+
+    assert store.count("acc1") == 20_000
+    assert list(store.range("acc1"))[-1].description == "changed"
+    # The journal and the overwritten row, the new record and the sparse index - not
+    # the 20 000 rows of every column (about 760 kB).
+    row_bytes = sum(array(code).itemsize for code in disk_store.COLUMNS.values())
+    assert sum(written) < 2 * row_bytes + 1024 + 20_000 // disk_store.INDEX_STRIDE * 8
+
+
+def strings_size(tmp_path, account_id="acc1"):
+    directory = tmp_path / account_id
+    return sum(os.path.getsize(directory / name) for name in os.listdir(directory) if name.startswith("strings"))
+
+
+def test_backfill_does_not_rewrite_kept_records(tmp_path):
+    store = DiskTransactionStore(str(tmp_path))
+    store.append_account("acc1", transactions(range(500, 1000)))
+    size = strings_size(tmp_path)
+    store.append_account("acc1", transactions(range(0, 10)))
+    older = strings_size(tmp_path) - size
+
+    store.append_account("acc1", transactions(range(10, 20)))
+    # Only the ten new records were added (ids one digit longer), not the 500 kept tail rows.
+    assert strings_size(tmp_path) - size - older < 1.1 * older
+
+
+def test_compact_drops_records_of_replaced_rows(tmp_path):
+    store = DiskTransactionStore(str(tmp_path))
+    store.append_account("acc1", transactions(range(200)))
+    size = strings_size(tmp_path)
+    for _ in range(3):
+        store.append_account("acc1", transactions(range(200)))
+    assert strings_size(tmp_path) > 3 * size
+
+    assert store.compact("acc1") > 0
+    assert strings_size(tmp_path) == size
+    assert stored_ids(store) == [f"tx{i}" for i in range(200)]
+    assert stored_ids(DiskTransactionStore(str(tmp_path))) == [f"tx{i}" for i in range(200)]
+
+
+def test_strings_file_is_compacted_automatically(tmp_path, monkeypatch):
+    monkeypatch.setattr(disk_store, "COMPACT_MIN_BYTES", 0)
+    store = DiskTransactionStore(str(tmp_path))
+    store.append_account("acc1", transactions(range(200)))
+    size = strings_size(tmp_path)
+    for _ in range(5):
+        store.append_account("acc1", transactions(range(200)))
+    assert strings_size(tmp_path) <= disk_store.COMPACT_RATIO * size
@@ -0,0 +1,61 @@
+from pluggy_py.utils.entity_cache import EntityCache
+
+
+def test_invalidate_item_drops_entries_of_its_accounts():
+    cache = EntityCache()
+    cache.set("items", "item1", "item")
+    cache.set("accounts", "acc1", "account", item_id="item1", account_id="acc1")
+    cache.set("bills", "bill1", "bill", account_id="acc1")
+    cache.set("bills", "bill2", "bill", account_id="acc2")
+
+    assert cache.invalidate_item("item1") == 3
+    assert cache.get("bills", "bill1") is None
+    assert cache.get("bills", "bill2") == "bill"
+
+
+def test_account_links_are_bounded_by_max_size():
+    cache = EntityCache(max_size=10)
+    for i in range(1000):
+        cache.set("accounts", f"acc{i}", "account", item_id=f"item{i}", account_id=f"acc{i}")
+    assert len(cache) == 10
+    assert len(cache._account_items) == 10
+    assert len(cache._item_accounts) == 10
+
+
+def test_expired_entries_release_account_links():
+    cache = EntityCache(ttl=0)
+    cache.set("accounts", "acc1", "account", item_id="item1", account_id="acc1")
+    assert cache.purge_expired() == 1
+    assert cache._account_items == {} and cache._item_accounts == {}
+
+
+def test_account_link_survives_while_entries_are_tagged_with_it():
+    cache = EntityCache()
+    cache.set("accounts", "acc1", "account", item_id="item1", account_id="acc1")
+    cache.set("bills", "bill1", "bill", account_id="acc1")
+    cache.invalidate("accounts", "acc1")
+
+    assert cache.invalidate_item("item1") == 1
+    assert cache.get("bills", "bill1") is None
+
+
+def test_scopes_do_not_share_entries():
+    cache = EntityCache()
+    tenant_a, tenant_b = cache.scoped("client-a"), cache.scoped("client-b")
+    tenant_a.set("accounts", "acc1", "a's account", item_id="item1", account_id="acc1")
+
+    assert tenant_a.get("accounts", "acc1") == "a's account"
+    assert tenant_b.get("accounts", "acc1") is None
+    assert cache.get("accounts", "acc1") is None
+
+
+def test_webhooks_invalidate_every_scope():
+    cache = EntityCache()
+    tenant_a, tenant_b = cache.scoped("client-a"), cache.scoped("client-b")
+    tenant_a.set("items", "item1", "a", item_id="item1")
+    tenant_b.set("items", "item1", "b", item_id="item1")
+    tenant_b.set("bills", "bill1", "bill", account_id="acc1")
+    tenant_b.set("accounts", "acc1", "account", item_id="item1", account_id="acc1")
+
+    assert tenant_a.handle_webhook_event({"event": "item/updated", "itemId": "item1"}) == 4
+    assert len(cache) == 0
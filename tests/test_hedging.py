@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+from pluggy_py.exceptions import InternalServerError
+from pluggy_py.utils.hedging import HedgingPolicy
+from pluggy_py.utils.http_client import HttpClient
+
+from test_circuit_breaker import response
+
+
+class SlowSession:
+    """Sleeps `delays[n]` seconds before answering the n-th request with `statuses[n]`."""
+
+    def __init__(self, delays, statuses):
+        self.delays = list(delays)
+        self.statuses = list(statuses)
+        self.threads = []
+        self.lock = threading.Lock()
+
+    def request(self, method, url, timeout=None, **kwargs):
+        with self.lock:
+            self.threads.append(threading.current_thread().name)
+            attempt = len(self.threads)
+            delay, status = self.delays.pop(0), self.statuses.pop(0)
+        time.sleep(delay)
+        return response(status, {"attempt": attempt})
+
+
+def make_client(session, **policy_kwargs):
+    policy = HedgingPolicy(**{"min_samples": 1, "max_extra_load": 1.0, **policy_kwargs})
+    policy.record("/accounts/{id}", 0.01)
+    client = HttpClient("https://api.example.com", hedging=policy)
+    client.session = session
+    return client, policy
+
+
+def test_delay_for_counts_only_hedgeable_requests():
+    policy = HedgingPolicy(min_samples=2)
+    assert policy.delay_for("/accounts") is None
+    policy.record("/accounts", 0.2)
+    policy.record("/accounts", 0.2)
+    assert policy.delay_for("/accounts", timeout=0.1) is None
+    assert policy.delay_for("/accounts") == 0.2
+    assert policy.stats().requests == 1
+
+
+def test_primary_does_not_go_through_the_hedge_executor():
+    session = SlowSession([0.0], [200])
+    client, policy = make_client(session)
+    assert client.get("/accounts/abc").json() == {"attempt": 1}
+    assert session.threads == ["pluggy-hedge-primary"]
+    assert client._hedge_executor is None
+    assert policy.stats().hedged == 0
+
+
+def test_fast_hedge_beats_a_slow_successful_primary():
+    session = SlowSession([1.0, 0.0], [200, 200])
+    client, policy = make_client(session)
+    started = time.monotonic()
+    resp = client.get("/accounts/abc")
+
+    assert time.monotonic() - started < 0.5
+    assert resp.json() == {"attempt": 2}
+    assert session.threads[1].startswith("pluggy-hedge_")
+    assert policy.stats().hedged == 1 and policy.stats().hedge_wins == 1
+
+
+def test_primary_answering_first_is_not_a_hedge_win():
+    session = SlowSession([0.1, 0.5], [200, 200])
+    client, policy = make_client(session)
+    assert client.get("/accounts/abc").json() == {"attempt": 1}
+    assert policy.stats().hedged == 1 and policy.stats().hedge_wins == 0
+
+
+def test_failed_primary_falls_back_to_the_hedge():
+    session = SlowSession([0.2, 0.0], [500, 200])
+    client, policy = make_client(session)
+    resp = client.get("/accounts/abc")
+
+    assert resp.status_code == 200
+    assert policy.stats().hedged == 1 and policy.stats().hedge_wins == 1
+
+
+def test_primary_error_is_raised_when_the_hedge_fails_too():
+    session = SlowSession([0.2, 0.0], [500, 500])
+    client, _ = make_client(session)
+    with pytest.raises(InternalServerError):
+        client.get("/accounts/abc")
+
+
+def test_hedge_executor_is_created_once():
+    client = HttpClient("https://api.example.com")
+    barrier = threading.Barrier(8)
+    pools = []
+
+    def create():
+        barrier.wait()
+        pools.append(client._hedge_pool())
+
+    threads = [threading.Thread(target=create) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(pool) for pool in pools}) == 1
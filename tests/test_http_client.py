@@ -0,0 +1,92 @@
+import threading
+import time
+from decimal import Decimal
+
+from pluggy_py.utils.http_client import HttpClient
+
+from test_circuit_breaker import response
+
+
+def test_session_setter_replaces_the_calling_threads_session_in_thread_safe_mode():
+    client = HttpClient("https://api.example.com", thread_safe=True)
+    replacement = object()
+    client.session = replacement
+    assert client.session is replacement
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(client.session))
+    thread.start()
+    thread.join()
+    assert other[0] is not replacement
+
+
+def test_session_setter_replaces_the_shared_session():
+    client = HttpClient("https://api.example.com")
+    replacement = object()
+    client.session = replacement
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(client.session))
+    thread.start()
+    thread.join()
+    assert client.session is replacement and seen == [replacement]
+
+
+class CountingSession:
+    """Answers every GET with {"n": <call number>} once `release` is set."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+
+    def request(self, method, url, timeout=None, params=None, headers=None, **kwargs):
+        self.calls.append((url, params, headers))
+        self.release.wait(5)
+        return response(200, {"n": len(self.calls), "amount": 1.5})
+
+
+def coalescing_client(session):
+    client = HttpClient("https://api.example.com", coalesce_gets=True)
+    client.session = session
+    return client
+
+
+def test_concurrent_identical_gets_send_one_request():
+    session = CountingSession()
+    client = coalescing_client(session)
+    threads = 8
+    results = []
+
+    def get():
+        results.append(client.get("/accounts", params={"itemId": "i1"}, headers={"X-API-KEY": "k"}))
+
+    workers = [threading.Thread(target=get) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    deadline = time.monotonic() + 5
+    while client._single_flight.shared < threads - 1 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    session.release.set()
+    for worker in workers:
+        worker.join()
+
+    assert len(session.calls) == 1
+    assert len(results) == threads and all(r.json() is results[0].json() for r in results)
+
+
+def test_gets_differing_in_params_or_headers_are_not_coalesced():
+    session = CountingSession()
+    session.release.set()
+    client = coalescing_client(session)
+    client.get("/accounts", params={"itemId": "i1"}, headers={"X-API-KEY": "k"})
+    client.get("/accounts", params={"itemId": "i2"}, headers={"X-API-KEY": "k"})
+    client.get("/accounts", params={"itemId": "i1"}, headers={"X-API-KEY": "other"})
+    assert len(session.calls) == 3
+
+
+def test_shared_response_decodes_each_set_of_json_options_separately():
+    session = CountingSession()
+    session.release.set()
+    resp = coalescing_client(session).get("/accounts")
+    assert resp.json()["amount"] == 1.5
+    assert resp.json(parse_float=Decimal)["amount"] == Decimal("1.5")
+    assert resp.json() is resp.json()
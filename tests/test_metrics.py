@@ -0,0 +1,27 @@
+import math
+
+from pluggy_py.utils.metrics import MetricsRegistry
+
+
+def test_special_values_use_the_exposition_format_spelling():
+    registry = MetricsRegistry()
+    gauge = registry.gauge("pluggy_value", "Test gauge", ["kind"])
+    gauge.set(math.nan, kind="nan")
+    gauge.set(math.inf, kind="pos")
+    gauge.set(-math.inf, kind="neg")
+    gauge.set(1.5, kind="float")
+    gauge.set(3.0, kind="int")
+    lines = registry.render().splitlines()
+
+    assert 'pluggy_value{kind="nan"} NaN' in lines
+    assert 'pluggy_value{kind="pos"} +Inf' in lines
+    assert 'pluggy_value{kind="neg"} -Inf' in lines
+    assert 'pluggy_value{kind="float"} 1.5' in lines
+    assert 'pluggy_value{kind="int"} 3' in lines
+
+
+def test_histogram_last_bucket_is_plus_inf():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("pluggy_latency_seconds", "Test histogram", buckets=(0.1, 1.0))
+    histogram.observe(0.5)
+    assert 'pluggy_latency_seconds_bucket{le="+Inf"} 1' in registry.render().splitlines()
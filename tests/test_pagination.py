@@ -0,0 +1,50 @@
+from pluggy_py.utils.pagination import AdaptivePageSizer
+
+FAST, SLOW, TARGET = 0.1, 3.0, 2.0
+
+
+def test_slow_pages_step_down_the_ladder_to_the_bottom():
+    sizer = AdaptivePageSizer(target_seconds=TARGET)
+    sizes = [sizer.initial_size("/transactions")]
+    for _ in range(6):
+        # Offset 0 lines up with every size, so each step is taken as is.
+        sizes.append(sizer.next_size("/transactions", sizes[-1], SLOW, 1_000, 0))
+    assert sizes == [500, 250, 125, 25, 5, 5, 5]
+
+
+def test_fast_pages_step_up_the_ladder_to_the_top():
+    sizer = AdaptivePageSizer(target_seconds=TARGET)
+    sizes = [5]
+    for _ in range(6):
+        sizes.append(sizer.next_size("/transactions", sizes[-1], FAST, 1_000, 0))
+    assert sizes == [5, 25, 125, 250, 500, 500, 500]
+
+
+def test_pages_within_the_target_keep_their_size():
+    sizer = AdaptivePageSizer(target_seconds=TARGET)
+    assert sizer.next_size("/transactions", 125, 1.5, 1_000, 0) == 125
+
+
+def test_large_bodies_step_down_even_when_fast():
+    sizer = AdaptivePageSizer(target_seconds=TARGET, max_body_bytes=10_000)
+    assert sizer.next_size("/transactions", 500, FAST, 20_000, 0) == 250
+    # Over half the limit: fast, but not small enough to grow.
+    assert sizer.next_size("/transactions", 250, FAST, 6_000, 0) == 250
+
+
+def test_a_step_up_waits_for_an_aligned_offset():
+    sizer = AdaptivePageSizer(target_seconds=TARGET)
+    # 375 rows in, 250-row pages would not line up with the rows already walked.
+    assert sizer.next_size("/transactions", 125, FAST, 1_000, 375) == 125
+    assert sizer.next_size("/transactions", 125, FAST, 1_000, 250) == 250
+    # The tuned size is remembered for the next walk of the endpoint all the same.
+    assert sizer.initial_size("/transactions") == 250
+
+
+def test_tuned_sizes_are_remembered_per_endpoint():
+    sizer = AdaptivePageSizer(target_seconds=TARGET)
+    sizer.next_size("/transactions", 500, SLOW, 1_000, 0)
+    assert sizer.initial_size("/transactions") == 250
+    assert sizer.initial_size("/accounts") == 500
+    sizer.reset("/transactions")
+    assert sizer.initial_size("/transactions") == 500
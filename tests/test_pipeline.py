@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+
+from pluggy_py.exceptions import PipelineError
+from pluggy_py.utils.pipeline import PagePipeline
+
+
+class Abort(BaseException):
+    pass
+
+
+def batches(count):
+    for i in range(count):
+        yield [i]
+
+
+def run_with_timeout(pipeline, sources, seconds=5):
+    outcome = []
+
+    def run():
+        try:
+            outcome.append(pipeline.run(sources))
+        except PipelineError as exc:
+            outcome.append(exc)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(seconds)
+    assert not thread.is_alive(), "pipeline did not stop"
+    return outcome[0]
+
+
+def test_fetchers_stop_when_every_consumer_died():
+    def consumer(batch):
+        raise Abort()
+
+    error = run_with_timeout(PagePipeline(consumer, consumers=2, max_pending=1), [batches(1000)])
+    assert isinstance(error, PipelineError)
+    assert error.stage == "consume" and isinstance(error.error, Abort)
+
+
+def test_named_sources_report_resume_tokens_by_name():
+    class Walk:
+        def __init__(self, complete):
+            self.complete = complete
+            self.resume_token = None if complete else "token"
+
+        def __iter__(self):
+            return iter([[1], [2]])
+
+    seen = []
+    stats = PagePipeline(seen.extend).run({"a": Walk(True), "b": Walk(False)})
+    assert sorted(seen) == [1, 1, 2, 2]
+    assert not stats.complete
+    assert stats.resume_tokens == {"b": "token"}
+
+
+def test_rows_are_counted():
+    stats = PagePipeline(lambda batch: None, consumers=3).run([batches(10), batches(5)])
+    assert (stats.pages, stats.rows, stats.complete) == (15, 15, True)
+
+
+def test_consumer_errors_are_wrapped():
+    def consumer(batch):
+        raise ValueError("bad row")
+
+    with pytest.raises(PipelineError) as info:
+        PagePipeline(consumer).run([batches(3)])
+    assert isinstance(info.value.error, ValueError)
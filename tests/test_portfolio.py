@@ -0,0 +1,32 @@
+from datetime import datetime
+
+import pytest
+
+from pluggy_py.analytics.portfolio import aggregate_flows, aggregate_positions
+from pluggy_py.models.investments import Investment, InvestmentTransaction
+
+
+def investment(investment_id, kind, balance, currency="BRL"):
+    return Investment(
+        id=investment_id, itemId="item1", type=kind, balance=balance, currencyCode=currency,
+        date=datetime(2024, 1, 1),
+    )
+
+
+def test_positions_and_flows_are_grouped():
+    investments = [
+        investment("i1", "FIXED_INCOME", 100.1),
+        investment("i2", "FIXED_INCOME", 200.2),
+        investment("i3", "SECURITY", 50.0, currency="USD"),
+    ]
+    by_type, by_currency = aggregate_positions(investments)
+    assert by_type["FIXED_INCOME"].count == 2
+    assert by_type["FIXED_INCOME"].balance == pytest.approx(300.3)
+    assert by_currency["USD"].balance == 50.0
+
+    flows = aggregate_flows(investments, {
+        "i1": [InvestmentTransaction(type="BUY", amount=100.0), InvestmentTransaction(type="SELL", netAmount=-30.0)],
+        "i3": [InvestmentTransaction(movementType="CREDIT", amount=10.0), InvestmentTransaction(type="TAX", amount=1.0)],
+    })
+    assert (flows["BRL"].contributions, flows["BRL"].withdrawals, flows["BRL"].net) == (100.0, 30.0, 70.0)
+    assert (flows["USD"].contributions, flows["USD"].transactions) == (10.0, 2)
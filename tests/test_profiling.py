@@ -0,0 +1,66 @@
+import threading
+import time
+
+from pydantic import BaseModel
+
+from pluggy_py.resources.accounts import AccountsResource
+from pluggy_py.resources.transactions import TransactionsResource
+from pluggy_py.utils.hedging import HedgingPolicy
+from pluggy_py.utils.http_client import HttpClient
+from pluggy_py.utils.profiling import UNATTRIBUTED, Profiler
+
+from conftest import FakeHttp
+from test_circuit_breaker import response
+
+ACCOUNT = {"id": "abc", "itemId": "item1", "type": "BANK", "name": "Checking", "balance": 1.0, "number": "1"}
+
+
+def test_validation_is_timed_without_patching_pydantic(transaction_rows):
+    class Unrelated(BaseModel):
+        value: int
+
+    init = BaseModel.__init__
+    resource = TransactionsResource(FakeHttp(transaction_rows), "key")
+    with Profiler() as profiler:
+        assert BaseModel.__init__ is init
+        Unrelated(value=1)
+        resource.list_all_transactions("acc1", page_size=100)
+    report = profiler.report()
+
+    assert [m.model for m in report.models] == ["PageResponseTransactions"]
+    assert report.models[0].validations == 10
+    assert [op.operation for op in report.operations] == ["TransactionsResource.list_all_transactions"]
+
+
+class HedgedSession:
+    """The first request fails slowly with a 500, every later one answers at once."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def request(self, method, url, timeout=None, **kwargs):
+        with self.lock:
+            self.calls += 1
+            first = self.calls == 1
+        if first:
+            time.sleep(0.2)
+            return response(500)
+        return response(200, ACCOUNT)
+
+
+def test_hedges_are_attributed_to_the_calling_operation():
+    policy = HedgingPolicy(min_samples=1, max_extra_load=1.0)
+    policy.record("/accounts/{id}", 0.01)
+    client = HttpClient("https://api.example.com", hedging=policy)
+    client.session = HedgedSession()
+    accounts = AccountsResource(client, "key")
+
+    with Profiler() as profiler:
+        assert accounts.retrieve_account("abc").id == "abc"
+        # The hedge answered first; let the slow primary finish before reporting.
+        time.sleep(0.3)
+    operations = {op.operation: op for op in profiler.report().operations}
+
+    assert UNATTRIBUTED not in operations
+    assert operations["AccountsResource.retrieve_account"].requests == 2
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+
+from pluggy_py.analytics.projections import project_cash_flows
+from pluggy_py.models.loans import Loan
+from pluggy_py.models.transactions import Transaction
+
+NOW = datetime.now(timezone.utc)
+
+
+def test_only_future_balloons_are_netted_out_of_the_principal():
+    loan = Loan(
+        id="loan1",
+        itemId="item1",
+        installmentPeriodicity="MONTHLY",
+        payments={"contractOutstandingBalance": 10_000.0},
+        installments={
+            "dueInstallments": 10,
+            "paidInstallments": 0,
+            "balloonPayments": [
+                {"dueDate": NOW - timedelta(days=400), "amount": {"value": 2_000.0}},
+                {"dueDate": NOW + timedelta(days=900), "amount": {"value": 3_000.0}},
+            ],
+        },
+    )
+    projection = project_cash_flows(loans=[loan], months=12)
+    assert projection.by_source["loan_installments"][:10] == [700.0] * 10
+    assert projection.outside_horizon == 3_000.0
+
+
+def card_installment(transaction_id, description, amount, number=1, total=3, posted=datetime(2024, 1, 10)):
+    return Transaction(
+        id=transaction_id,
+        description=description,
+        amount=amount,
+        date=posted,
+        accountId="card1",
+        creditCardMetadata={
+            "installmentNumber": number,
+            "totalInstallments": total,
+            "totalAmount": abs(amount) * total,
+            "purchaseDate": datetime(2024, 1, 10),
+        },
+    )
+
+
+def test_purchases_on_the_same_day_are_not_merged():
+    transactions = [
+        card_installment("t1", "Store A", -100.0),
+        card_installment("t2", "Store B", -40.0),
+        card_installment("t3", "Store B", -40.0, number=2),
+    ]
+    projection = project_cash_flows(transactions, months=3, start=datetime(2024, 2, 1))
+    assert projection.by_source["card_installments"] == [140.0, 100.0, 0.0]
+
+
+def test_installments_of_one_purchase_are_merged_despite_their_descriptions():
+    transactions = [
+        card_installment("t1", "LOJA X PARC 01/10", -50.0, number=1, total=10),
+        card_installment("t2", "LOJA X PARC 02/10", -50.0, number=2, total=10, posted=datetime(2024, 2, 10)),
+    ]
+    projection = project_cash_flows(transactions, months=10, start=datetime(2024, 3, 1))
+    assert projection.by_source["card_installments"] == [50.0] * 8 + [0.0] * 2
+    assert projection.by_account == {"card1": [50.0] * 8 + [0.0] * 2}
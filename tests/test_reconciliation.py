@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from pluggy_py.analytics.reconciliation import reconcile
+from pluggy_py.models.bills import Bill
+from pluggy_py.models.transactions import Transaction
+
+
+def bill(bill_id, due, total, charges=()):
+    return Bill(
+        id=bill_id, accountId="card1", dueDate=due, totalAmount=total,
+        financeCharges=[{"amount": amount} for amount in charges],
+    )
+
+
+def purchase(transaction_id, date, amount, bill_id=None):
+    metadata = {"billId": bill_id} if bill_id else None
+    return Transaction(
+        id=transaction_id, date=date, amount=amount, accountId="card1", creditCardMetadata=metadata,
+    )
+
+
+def test_finance_charges_are_part_of_the_difference():
+    report = reconcile(
+        [bill("b1", datetime(2024, 2, 10), 112.5, charges=[12.5])],
+        [purchase("t1", datetime(2024, 1, 20), -100.0, "b1")],
+    )
+    assert report.bills[0].finance_charges_total == 12.5
+    assert report.bills[0].difference == 0.0
+    assert report.bills[0].matched
+
+
+def test_transactions_without_bill_id_are_assigned_by_due_date():
+    bills = [bill("b1", datetime(2024, 2, 10), 100.0), bill("b2", datetime(2024, 3, 10), 50.0)]
+    transactions = [
+        purchase("t1", datetime(2024, 1, 20), -60.0),
+        purchase("t2", datetime(2024, 2, 10), -40.0),
+        purchase("t3", datetime(2024, 2, 11), -50.0),
+        purchase("open", datetime(2024, 3, 15), -5.0),
+        purchase("old", datetime(2023, 11, 1), -5.0),
+    ]
+    report = reconcile(bills, transactions)
+
+    assert [(b.bill_id, b.transaction_count, b.dated_count, b.matched) for b in report.bills] == [
+        ("b1", 2, 2, True),
+        ("b2", 1, 1, True),
+    ]
+    assert [t.id for t in report.unmatched_transactions] == ["open", "old"]
@@ -0,0 +1,66 @@
+from pluggy_py.models.transactions import Transaction
+from pluggy_py.storage.search import TransactionSearchIndex
+
+from conftest import make_transaction
+
+
+def transaction(i, description, **overrides):
+    return Transaction(**make_transaction(i, description=description, **overrides))
+
+
+def ids(results):
+    return [t.id for t in results]
+
+
+def test_short_prefix_returns_the_newest_matches(monkeypatch):
+    rows = [transaction(i, f"Padaria {i}" if i % 2 else f"Posto {i}") for i in range(2000)]
+    index = TransactionSearchIndex(rows)
+    probes = []
+    original = index._newest_matching
+    monkeypatch.setattr(index, "_newest_matching", lambda *args: probes.append(args) or original(*args))
+
+    # Prefixes matching a large share of the index are answered from the recency order.
+    assert ids(index.search("p", limit=3)) == ["tx1999", "tx1998", "tx1997"]
+    assert ids(index.search("pad", limit=3)) == ["tx1999", "tx1997", "tx1995"]
+    assert len(probes) == 2
+    # A rare token is answered from its postings, with the same ordering.
+    assert ids(index.search("padaria 1301", limit=3)) == ["tx1301"]
+    assert ids(index.search("p 1998", limit=None)) == ["tx1998"]
+    assert len(probes) == 2
+
+
+def test_exact_and_account_filters_on_both_paths():
+    rows = [transaction(i, "Uber trip", accountId=f"acc{i % 2}") for i in range(500)]
+    index = TransactionSearchIndex(rows)
+
+    assert ids(index.search("uber", limit=2, account_id="acc0")) == ["tx498", "tx496"]
+    assert index.search("ube", prefix=False, limit=2) == []
+    assert ids(index.search("uber", prefix=False, limit=2)) == ["tx499", "tx498"]
+    assert len(index.search("trip", limit=None, account_id="acc1")) == 250
+    assert index.search("uber", limit=0) == []
+
+
+def test_reindexed_transactions_move_in_text_and_time():
+    index = TransactionSearchIndex([transaction(i, "Mercado") for i in range(100)])
+    index.add([transaction(5, "Farmacia", date="2030-01-01T00:00:00Z")])
+
+    assert "tx5" not in ids(index.search("mercado", limit=None))
+    assert ids(index.search("farm")) == ["tx5"]
+    assert ids(index.search("mercado farmacia")) == []
+
+    # A re-synced date moves the transaction to its new place in the recency order.
+    index.add([transaction(6, "Mercado", date="2031-01-01T00:00:00Z")])
+    assert ids(index.search("m", limit=2)) == ["tx6", "tx99"]
+    assert len(index) == 100
+
+
+def test_removed_transactions_are_not_found():
+    index = TransactionSearchIndex([transaction(i, "Cinema") for i in range(100)])
+    assert index.remove("tx99")
+    assert not index.remove("tx99")
+
+    assert "tx99" not in index
+    assert ids(index.search("cin", limit=2)) == ["tx98", "tx97"]
+    assert len(index.search("cinema", limit=None)) == 99
+    index.remove("tx98")
+    assert ids(index.search("c", limit=1)) == ["tx97"]
@@ -0,0 +1,79 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pluggy_py.client import PluggyClient
+from pluggy_py.models.transactions import PageResponseTransactions
+from pluggy_py.utils.http_client import HttpClient
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = []
+
+    def setup(self):
+        super().setup()
+        self.connections.append(self.client_address)
+
+    def _respond(self, body=b""):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        return body
+
+    def do_HEAD(self):
+        self._respond()
+
+    def do_GET(self):
+        self.wfile.write(self._respond(b"{}"))
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    CountingHandler.connections = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", CountingHandler.connections
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_preconnect_opens_the_requested_connections_for_later_requests(server):
+    base_url, connections = server
+    http = HttpClient(base_url, pool_maxsize=8)
+
+    assert http.preconnect(3) == 3
+    assert len(connections) == 3
+    # The next requests reuse the pooled connections instead of opening new ones.
+    for _ in range(3):
+        http.get("/accounts")
+    assert len(connections) == 3
+
+
+def test_preconnect_is_capped_at_the_pool_size(server):
+    base_url, connections = server
+    assert HttpClient(base_url, pool_maxsize=2).preconnect(5) == 2
+    assert len(connections) == 2
+
+
+def test_warm_up_connects_and_builds_model_validators(server):
+    base_url, connections = server
+    client = PluggyClient("id", "secret", base_url=base_url, http_client=HttpClient(base_url))
+
+    report = client.warm_up(2, models=[PageResponseTransactions])
+    assert report.connections == 2 and len(connections) == 2
+    # Nested models are prepared along with the page model.
+    assert {"PageResponseTransactions", "Transaction", "CreditCardMetadata"} <= set(report.models)
+    assert report.seconds >= 0
+
+
+def test_warm_up_without_connections_only_builds_models():
+    client = PluggyClient("id", "secret", base_url="http://127.0.0.1:9", http_client=HttpClient("http://127.0.0.1:9"))
+    report = client.warm_up(0, models=[PageResponseTransactions])
+    assert report.connections == 0 and "Transaction" in report.models